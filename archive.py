@@ -0,0 +1,534 @@
+# LeadLab LIMS - Cold-row archiver
+#
+# Moves records that are done with (report released, payment completed, and
+# not touched for --days) out of the hot sheet tables, so list scans and
+# backups only see live work:
+#
+#   - gzip JSONL segments under archive/<table>/ (default), and/or
+#   - a <table>_archive table (CREATE TABLE ... LIKE, ROW_FORMAT=COMPRESSED)
+#
+# Every archived row is recorded in archive_index (table, primary key,
+# unique_id, location), which is all restore needs to find it again.
+#
+# Rows move in keyset-ordered chunks. Candidate keys come from a plain,
+# non-locking read; each chunk is then one short transaction: only those rows
+# are locked by key (FOR UPDATE) and re-checked, written to their
+# segment/archive table, indexed and deleted, then committed. A failed commit
+# leaves at most an unindexed copy in a segment, which restore ignores.
+#
+# process_master_sheet goes first (paid per finance_sheet, report released,
+# untouched); every other sheet only follows once its process master row is
+# archived, because GET /api/process-master reads its statuses from them.
+#
+# Rows that reference an archived row through a cascading foreign key
+# (CHILDREN, e.g. finance_sheet_attachments) move in the same transaction and
+# are indexed under the parent's unique_id; a table with any other inbound
+# foreign key is skipped rather than cascade-deleted.
+#
+# Restored rows go back unchanged; unless they are edited (which moves
+# modified_at forward) the next archive run will pick them up again.
+#
+# Usage:
+#   python archive.py status
+#   python archive.py archive --dry-run                 # eligible rows per table
+#   python archive.py archive --days 365
+#   python archive.py archive --table finance_sheet --to both --chunk-size 200
+#   python archive.py restore PG-2024-0012 PG-2024-0013 # back into the hot tables
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from database_config import get_pool
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(ROOT_DIR, 'archive')
+INDEX_TABLE = 'archive_index'
+DEFAULT_DAYS = 365
+DEFAULT_CHUNK_SIZE = 500
+
+# Cross-table unique_id comparisons; on MySQL both sides are pinned to
+# utf8mb4_unicode_ci, as in routes.ts, because report_management carries the
+# server default collation ({collate} is filled in by _policy_sql).
+def _same_uid(alias, other):
+    return f"{alias}.unique_id{{collate}} = {other}.unique_id{{collate}}"
+
+
+def _archived(source, alias):
+    return (f"EXISTS (SELECT 1 FROM {INDEX_TABLE} a WHERE a.source_table = '{source}' "
+            f"AND {_same_uid('a', alias)})")
+
+
+def _cold(alias):
+    return f"COALESCE({alias}.modified_at, {alias}.created_at) < {{cutoff}}"
+
+
+# Report released before the cutoff (report_management may be archived already)
+def _released(alias):
+    return (f"(EXISTS (SELECT 1 FROM report_management r WHERE {_same_uid('r', alias)} "
+            f"AND r.report_release_date < {{cutoff}}) OR {_archived('report_management', alias)})")
+
+
+# Paid in full. GET /api/process-master derives finance_status from
+# finance_sheet at read time; the stored column is never 'Completed'.
+def _paid(alias):
+    return (f"(EXISTS (SELECT 1 FROM finance_sheet f WHERE {_same_uid('f', alias)} "
+            f"AND f.total_amount_received_status = 1) OR {_archived('finance_sheet', alias)})")
+
+
+def _process_master_rule(alias):
+    return f"{_cold(alias)} AND {_released(alias)} AND {_paid(alias)}"
+
+
+# GET /api/process-master builds its status columns from the downstream
+# sheets, so a sheet row only leaves once its process master row has: the
+# stored fallback values would otherwise show for a row still on the list.
+# A dry run counts rows whose process master row would go in the same run.
+PM_ARCHIVED = _archived('process_master_sheet', 't')
+PM_ARCHIVED_OR_COLD = (f"({PM_ARCHIVED} OR EXISTS (SELECT 1 FROM process_master_sheet p "
+                       f"WHERE {_same_uid('p', 't')} AND {_process_master_rule('p')}))")
+
+SHEET_RULE = f"{_cold('t')} AND {_released('t')} AND {{pm_archived}}"
+
+# Table -> primary key and the condition that makes a row cold. Listed in
+# archive order: process_master_sheet first, since every other rule requires
+# its archive_index entry; report_management last so the sheets that depend
+# on it see it in the hot table first.
+POLICIES = {
+    'process_master_sheet': {'key': 'id', 'where': _process_master_rule('t')},
+    'labprocess_discovery_sheet': {'key': 'id', 'where': SHEET_RULE},
+    'labprocess_clinical_sheet': {'key': 'id', 'where': SHEET_RULE},
+    'bioinformatics_sheet_discovery': {'key': 'id', 'where': SHEET_RULE},
+    'bioinformatics_sheet_clinical': {'key': 'id', 'where': SHEET_RULE},
+    'nutritional_management': {'key': 'id', 'where': SHEET_RULE},
+    'genetic_counselling_records': {'key': 'id', 'where': SHEET_RULE},
+    'sample_tracking': {'key': 'id', 'where': f"t.created_at < {{cutoff}} AND {_released('t')} AND {{pm_archived}}"},
+    'finance_sheet': {
+        'key': 'id',
+        'where': f"t.total_amount_received_status = 1 AND {_cold('t')} AND {{pm_archived}}",
+    },
+    'report_management': {'key': 'unique_id', 'where': "t.report_release_date < {cutoff} AND {pm_archived}"},
+}
+
+# Tables whose rows reference a policy table with ON DELETE CASCADE. They move
+# (and restore) together with their parent rows; archive_index records them
+# under the parent's unique_id.
+CHILDREN = {
+    'finance_sheet': [{'table': 'finance_sheet_attachments', 'key': 'id', 'parent_column': 'finance_id'}],
+}
+CHILD_KEYS = {c['table']: c['key'] for children in CHILDREN.values() for c in children}
+
+INDEX_DDL = {
+    'mysql': [
+        f"""CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+  source_table VARCHAR(64) NOT NULL,
+  row_key VARCHAR(255) NOT NULL,
+  unique_id VARCHAR(255) NULL,
+  location VARCHAR(512) NOT NULL,
+  archived_at DATETIME NOT NULL,
+  PRIMARY KEY (source_table, row_key),
+  KEY idx_archive_unique_id (unique_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+    ],
+    'sqlite': [
+        f"""CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+  source_table VARCHAR(64) NOT NULL,
+  row_key VARCHAR(255) NOT NULL,
+  unique_id VARCHAR(255) NULL,
+  location VARCHAR(512) NOT NULL,
+  archived_at DATETIME NOT NULL,
+  PRIMARY KEY (source_table, row_key)
+)""",
+        f"CREATE INDEX IF NOT EXISTS idx_archive_unique_id ON {INDEX_TABLE}(unique_id)",
+    ],
+}
+
+
+def archive_table(table):
+    return f'{table}_archive'
+
+
+def _key(table):
+    return POLICIES[table]['key'] if table in POLICIES else CHILD_KEYS[table]
+
+
+def inbound_foreign_keys(conn, dialect, table):
+    """{(child table, column)} of foreign keys that reference `table`."""
+    cur = conn.cursor()
+    try:
+        if dialect == 'sqlite':
+            cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            found = set()
+            for (name,) in cur.fetchall():
+                cur.execute(f"PRAGMA foreign_key_list({name})")
+                found |= {(name, fk[3]) for fk in cur.fetchall() if fk[2] == table}
+            return found
+        cur.execute("SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE "
+                    "WHERE REFERENCED_TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = %s", [table])
+        return set(cur.fetchall())
+    finally:
+        cur.close()
+
+
+def unhandled_foreign_keys(conn, dialect, table):
+    """Inbound foreign keys that deleting rows of `table` would cascade into or fail on."""
+    handled = {(c['table'], c['parent_column']) for c in CHILDREN.get(table, ())}
+    return sorted(inbound_foreign_keys(conn, dialect, table) - handled)
+
+
+def _begin(cur, dialect):
+    # IMMEDIATE takes SQLite's write lock up front, like FOR UPDATE does on MySQL
+    cur.execute('BEGIN IMMEDIATE' if dialect == 'sqlite' else 'START TRANSACTION')
+
+
+def _policy_sql(table, pool, dry_run=False):
+    """(WHERE clause for `table`, number of cutoff placeholders)."""
+    where = POLICIES[table]['where']
+    where = where.replace('{pm_archived}', PM_ARCHIVED_OR_COLD if dry_run else PM_ARCHIVED)
+    where = where.replace('{collate}', '' if pool.dialect == 'sqlite' else ' COLLATE utf8mb4_unicode_ci')
+    return where.replace('{cutoff}', pool.placeholder), where.count('{cutoff}')
+
+
+def ensure_index(pool):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            for statement in INDEX_DDL[pool.dialect]:
+                cur.execute(statement)
+        finally:
+            cur.close()
+
+
+def ensure_archive_table(conn, dialect, table):
+    cur = conn.cursor()
+    try:
+        if dialect == 'sqlite':
+            cur.execute(f"CREATE TABLE IF NOT EXISTS {archive_table(table)} AS SELECT * FROM {table} WHERE 0")
+            return
+        cur.execute("SHOW TABLES LIKE %s", [archive_table(table)])
+        if cur.fetchone():
+            return
+        cur.execute(f"CREATE TABLE {archive_table(table)} LIKE {table}")
+        try:
+            cur.execute(f"ALTER TABLE {archive_table(table)} ROW_FORMAT=COMPRESSED")
+        except Exception as e:  # e.g. innodb_file_per_table off; the table still works uncompressed
+            print(f"warning: {archive_table(table)} left uncompressed: {e}", file=sys.stderr)
+    finally:
+        cur.close()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time, datetime.timedelta)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return str(value)  # Decimal
+
+
+class Segment:
+    """One gzip JSONL segment per table per run; each chunk is appended as its own gzip member."""
+
+    def __init__(self, archive_dir, table, stamp):
+        self.location = os.path.join(table, f'{stamp}.jsonl.gz')
+        self.path = os.path.join(archive_dir, self.location)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def append(self, columns, rows):
+        with open(self.path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                for row in rows:
+                    f.write(json.dumps(dict(zip(columns, row)), default=_json_default).encode('utf-8'))
+                    f.write(b'\n')
+            raw.flush()
+            # The chunk must be on disk before its rows are deleted
+            os.fsync(raw.fileno())
+
+
+def count_eligible(conn, pool, table, cutoff):
+    where, n = _policy_sql(table, pool, dry_run=True)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT COUNT(*) FROM {table} t WHERE {where}", [cutoff] * n)
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def _move_rows(cur, placeholder, table, columns, rows, unique_ids, segment, to_table, now):
+    """Copy `rows` of `table` to the segment / archive table and index them (no delete)."""
+    key_pos = columns.index(_key(table))
+    keys = [row[key_pos] for row in rows]
+    if segment:
+        segment.append(columns, rows)
+        location = segment.location
+    if to_table:
+        cur.execute(f"INSERT INTO {archive_table(table)} ({', '.join(columns)}) "
+                    f"SELECT {', '.join(columns)} FROM {table} "
+                    f"WHERE {_key(table)} IN ({', '.join([placeholder] * len(keys))})", keys)
+        # With --to both, restore reads the table; the segment is the compressed copy
+        location = archive_table(table)
+    row_sql = '(' + ', '.join([placeholder] * 5) + ')'
+    index_params = []
+    for row, unique_id in zip(rows, unique_ids):
+        index_params += [table, str(row[key_pos]), unique_id, location, now]
+    cur.execute(f"INSERT INTO {INDEX_TABLE} (source_table, row_key, unique_id, location, archived_at) "
+                f"VALUES {', '.join([row_sql] * len(rows))}", index_params)
+    return keys
+
+
+def archive_chunk(conn, pool, table, cutoff, after, chunk_size, segments, to_table):
+    """Move one chunk (and its CHILDREN rows).
+
+    Returns (rows moved, last key scanned, {child table: rows moved}); the
+    last key is None once no candidates are left.
+    """
+    key = POLICIES[table]['key']
+    placeholder = pool.placeholder
+    where, n = _policy_sql(table, pool)
+    params = [cutoff] * n
+    scan_where, scan_params = where, params
+    if after is not None:
+        scan_where = f"t.{key} > {placeholder} AND {where}"
+        scan_params = [after] + params
+    lock = '' if pool.dialect == 'sqlite' else ' FOR UPDATE'
+    now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    cur = conn.cursor()
+    in_transaction = False
+    try:
+        # Candidates come from a plain, non-locking read: a locking scan over
+        # the unindexed rule would lock every row (and gap) it passes,
+        # including the recent rows users are editing
+        cur.execute(f"SELECT t.{key} FROM {table} t WHERE {scan_where} ORDER BY t.{key} LIMIT {int(chunk_size)}",
+                    scan_params)
+        candidates = [row[0] for row in cur.fetchall()]
+        if not candidates:
+            return 0, None, {}
+        last = candidates[-1]
+
+        # Lock just those rows by key and re-check the rule; only rows that
+        # still qualify move
+        _begin(cur, pool.dialect)
+        in_transaction = True
+        cur.execute(f"SELECT t.* FROM {table} t WHERE t.{key} IN ({', '.join([placeholder] * len(candidates))}) "
+                    f"AND {where} ORDER BY t.{key}{lock}", candidates + params)
+        columns = [d[0] for d in cur.description]
+        rows = cur.fetchall()
+        if not rows:
+            cur.execute('COMMIT')
+            return 0, last, {}
+        key_pos = columns.index(key)
+        uid_pos = columns.index('unique_id') if 'unique_id' in columns else None
+        keys = [row[key_pos] for row in rows]
+        key_list = ', '.join([placeholder] * len(keys))
+        unique_ids = {row[key_pos]: row[uid_pos] if uid_pos is not None else None for row in rows}
+
+        # Children first: deleting the parents would otherwise cascade them away
+        moved_children = {}
+        for child in CHILDREN.get(table, ()):
+            cur.execute(f"SELECT * FROM {child['table']} WHERE {child['parent_column']} IN ({key_list}){lock}", keys)
+            child_columns = [d[0] for d in cur.description]
+            child_rows = cur.fetchall()
+            if not child_rows:
+                continue
+            parent_pos = child_columns.index(child['parent_column'])
+            child_keys = _move_rows(cur, placeholder, child['table'], child_columns, child_rows,
+                                    [unique_ids.get(r[parent_pos]) for r in child_rows],
+                                    segments.get(child['table']), to_table, now)
+            cur.execute(f"DELETE FROM {child['table']} WHERE {child['key']} IN "
+                        f"({', '.join([placeholder] * len(child_keys))})", child_keys)
+            moved_children[child['table']] = len(child_rows)
+
+        _move_rows(cur, placeholder, table, columns, rows, [unique_ids[k] for k in keys],
+                   segments.get(table), to_table, now)
+        cur.execute(f"DELETE FROM {table} WHERE {key} IN ({key_list})", keys)
+        cur.execute('COMMIT')
+        return len(rows), last, moved_children
+    except Exception:
+        if in_transaction:
+            cur.execute('ROLLBACK')
+        raise
+    finally:
+        cur.close()
+
+
+def archive(tables, days, to, chunk_size, archive_dir, limit=None, pause=0.0, dry_run=False, pool=None):
+    """Archive cold rows. Returns {table: rows moved (or eligible with dry_run)}."""
+    pool = pool or get_pool()
+    ensure_index(pool)
+    cutoff = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    results = {}
+    for table in tables:
+        with pool.connection() as conn:
+            if dry_run:
+                results[table] = count_eligible(conn, pool, table, cutoff)
+                continue
+            blocking = unhandled_foreign_keys(conn, pool.dialect, table)
+            if blocking:
+                refs = ', '.join(f'{t}.{c}' for t, c in blocking)
+                print(f"skip {table}: referenced by {refs}, which archive.py does not move", file=sys.stderr)
+                results[table] = 0
+                continue
+            moving = [table] + [c['table'] for c in CHILDREN.get(table, ())]
+            if to in ('table', 'both'):
+                for name in moving:
+                    ensure_archive_table(conn, pool.dialect, name)
+            segments = {name: Segment(archive_dir, name, stamp) for name in moving} if to in ('segments', 'both') else {}
+            moved, after = 0, None
+            while limit is None or moved < limit:
+                size = chunk_size if limit is None else min(chunk_size, limit - moved)
+                count, after, children = archive_chunk(conn, pool, table, cutoff, after, size, segments,
+                                                       to in ('table', 'both'))
+                if after is None:
+                    break
+                moved += count
+                for child, child_count in children.items():
+                    results[child] = results.get(child, 0) + child_count
+                # Let live traffic in between chunks
+                if pause:
+                    time.sleep(pause)
+        results[table] = moved
+    return results
+
+
+# -- restore ---------------------------------------------------------------------
+
+def read_segment(archive_dir, location, table, keys):
+    """Rows of `table` with the given primary keys from one gzip segment (latest copy wins)."""
+    key = _key(table)
+    wanted, found = set(keys), {}
+    with gzip.open(os.path.join(archive_dir, location), 'rt', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if str(record.get(key)) in wanted:
+                found[str(record[key])] = record
+    return found
+
+
+def restore(unique_ids, archive_dir, tables=None, pool=None):
+    """Move archived rows for `unique_ids` back into their hot tables. Returns {table: rows restored}."""
+    pool = pool or get_pool()
+    ensure_index(pool)
+    placeholder = pool.placeholder
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            sql = (f"SELECT source_table, row_key, location FROM {INDEX_TABLE} "
+                   f"WHERE unique_id IN ({', '.join([placeholder] * len(unique_ids))})")
+            params = list(unique_ids)
+            if tables:
+                sql += f" AND source_table IN ({', '.join([placeholder] * len(tables))})"
+                params += list(tables)
+            cur.execute(sql, params)
+            entries = cur.fetchall()
+        finally:
+            cur.close()
+
+        # Group by (table, location) so each segment is read once
+        groups = defaultdict(list)
+        for table, row_key, location in entries:
+            groups[(table, location)].append(row_key)
+
+        restored = defaultdict(int)
+        # Parents before their CHILDREN so foreign keys are satisfied
+        for (table, location), keys in sorted(groups.items(), key=lambda g: g[0][0] in CHILD_KEYS):
+            key = _key(table)
+            key_list = ', '.join([placeholder] * len(keys))
+            source = location
+            cur = conn.cursor()
+            try:
+                _begin(cur, pool.dialect)
+                if source == archive_table(table):
+                    cur.execute(f"SELECT * FROM {source} WHERE {key} IN ({key_list})", keys)
+                    columns = [d[0] for d in cur.description]
+                    rows = [dict(zip(columns, r)) for r in cur.fetchall()]
+                else:
+                    rows = list(read_segment(archive_dir, source, table, keys).values())
+                if len(rows) != len(keys):
+                    raise RuntimeError(f"{table}: {len(keys) - len(rows)} indexed row(s) missing from {source}")
+                for row in rows:
+                    columns = list(row)
+                    cur.execute(f"INSERT INTO {table} ({', '.join(columns)}) "
+                                f"VALUES ({', '.join([placeholder] * len(columns))})", [row[c] for c in columns])
+                if source == archive_table(table):
+                    cur.execute(f"DELETE FROM {source} WHERE {key} IN ({key_list})", keys)
+                cur.execute(f"DELETE FROM {INDEX_TABLE} WHERE source_table = {placeholder} "
+                            f"AND row_key IN ({key_list})", [table] + keys)
+                cur.execute('COMMIT')
+            except Exception:
+                cur.execute('ROLLBACK')
+                raise
+            finally:
+                cur.close()
+            restored[table] += len(rows)
+    return dict(restored)
+
+
+def status(pool=None):
+    pool = pool or get_pool()
+    ensure_index(pool)
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(f"SELECT source_table, COUNT(*) FROM {INDEX_TABLE} GROUP BY source_table")
+            archived = dict(cur.fetchall())
+            print(f"{'table':34} {'hot':>10} {'archived':>10}")
+            for table in list(POLICIES) + list(CHILD_KEYS):
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                print(f"{table:34} {cur.fetchone()[0]:>10} {archived.get(table, 0):>10}")
+        finally:
+            cur.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Archive cold sheet rows and restore them by unique_id.')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='root directory for gzip JSONL segments')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_archive = sub.add_parser('archive', help='move cold rows out of the hot tables')
+    p_archive.add_argument('--table', nargs='+', choices=list(POLICIES), help='limit to these tables')
+    p_archive.add_argument('--days', type=int, default=DEFAULT_DAYS, help='minimum age in days')
+    p_archive.add_argument('--to', choices=['segments', 'table', 'both'], default='segments',
+                           help='archive destination')
+    p_archive.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per transaction')
+    p_archive.add_argument('--limit', type=int, help='stop after this many rows per table')
+    p_archive.add_argument('--pause', type=float, default=0.05, help='seconds to sleep between chunks')
+    p_archive.add_argument('--dry-run', action='store_true', help='only count eligible rows')
+
+    p_restore = sub.add_parser('restore', help='move archived rows back by unique_id')
+    p_restore.add_argument('unique_id', nargs='+')
+    p_restore.add_argument('--table', nargs='+', choices=list(POLICIES) + list(CHILD_KEYS),
+                           help='only restore these tables')
+
+    sub.add_parser('status', help='hot vs archived row counts')
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        status()
+        return 0
+    if args.command == 'restore':
+        results = restore(args.unique_id, args.archive_dir, args.table)
+        if not results:
+            print('No archived rows for the given unique_id(s).')
+            return 1
+        for table, count in results.items():
+            print(f"{table}: {count} row(s) restored")
+        return 0
+
+    started = time.perf_counter()
+    results = archive(args.table or list(POLICIES), args.days, args.to, args.chunk_size, args.archive_dir,
+                      args.limit, args.pause, args.dry_run)
+    verb = 'eligible' if args.dry_run else 'archived'
+    for table, count in results.items():
+        print(f"{table:34} {count:>8} {verb}")
+    print(f"{sum(results.values())} row(s) {verb} in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
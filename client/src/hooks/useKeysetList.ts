@@ -0,0 +1,85 @@
+import { useEffect, useMemo } from 'react';
+import { useInfiniteQuery, keepPreviousData } from '@tanstack/react-query';
+import { apiRequest } from '@/lib/queryClient';
+import { SORT_WHITELIST, DEFAULT_SORT } from '@shared/sortWhitelist';
+
+// Rows requested per keyset page; the table still pages through them locally
+const FETCH_SIZE = 200;
+
+interface KeysetPage<T> {
+    rows: T[];
+    nextCursor: string | null;
+    sortKey: string;
+    sortDir: 'asc' | 'desc';
+}
+
+export interface KeysetListOptions {
+    table: string;               // key of SORT_WHITELIST
+    sortKey: string | null;
+    sortDir: 'asc' | 'desc';
+    rowsNeeded: number;          // rows the visible table page reaches into
+    loadAll?: boolean;           // fetch every page, e.g. while a client-side search/filter is active
+    refetchInterval?: number;    // only while one page is loaded
+    refetchOnWindowFocus?: boolean;
+}
+
+/**
+ * True when the list endpoint can order `table` by `sortKey` itself
+ * (no key means the endpoint's default order).
+ */
+export function isServerSortable(table: string, sortKey: string | null): boolean {
+    return !sortKey || Boolean(SORT_WHITELIST[table]?.columns[sortKey]);
+}
+
+/**
+ * Loads a sheet list through the endpoint's sortKey/sortDir/cursor keyset
+ * pages, following nextCursor only as far as the visible page needs.
+ *
+ * Keys the server cannot sort by fall back to the default order with every
+ * page loaded, so the caller can sort the full list locally as before.
+ */
+export function useKeysetList<T = any>(endpoint: string, options: KeysetListOptions) {
+    const { table, rowsNeeded, loadAll, refetchInterval, refetchOnWindowFocus } = options;
+    const serverSorted = isServerSortable(table, options.sortKey);
+    const sortKey: string = serverSorted && options.sortKey ? options.sortKey : DEFAULT_SORT.sortKey;
+    const sortDir: 'asc' | 'desc' = serverSorted && options.sortKey ? options.sortDir : DEFAULT_SORT.sortDir;
+
+    const query = useInfiniteQuery({
+        // Prefixed by `endpoint`, so invalidating [endpoint] refreshes every page
+        queryKey: [endpoint, 'keyset', sortKey, sortDir],
+        initialPageParam: null as string | null,
+        queryFn: async ({ pageParam }) => {
+            const params = new URLSearchParams({ sortKey, sortDir, limit: String(FETCH_SIZE) });
+            if (pageParam) params.set('cursor', pageParam);
+            const res = await apiRequest('GET', `${endpoint}?${params.toString()}`);
+            return (await res.json()) as KeysetPage<T>;
+        },
+        getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
+        // Keep showing the current rows while a new sort order loads
+        placeholderData: keepPreviousData,
+        // useInfiniteQuery refetches every loaded page in turn, so automatic
+        // refreshes only run while a single page is loaded; deeper lists
+        // refresh on explicit refetch / invalidation
+        refetchInterval: (q) => ((q.state.data?.pages.length ?? 0) > 1 ? false : refetchInterval ?? false),
+        refetchOnWindowFocus: (q) => (q.state.data?.pages.length ?? 0) <= 1 && Boolean(refetchOnWindowFocus),
+    });
+
+    const rows = useMemo(() => query.data?.pages.flatMap((page) => page.rows) ?? [], [query.data]);
+    const wantAll = Boolean(loadAll) || !serverSorted;
+
+    const { hasNextPage, isFetchingNextPage, isPlaceholderData, fetchNextPage } = query;
+    useEffect(() => {
+        // Placeholder rows belong to the previous sort; their cursor does not apply
+        if (isPlaceholderData || !hasNextPage || isFetchingNextPage) return;
+        if (wantAll || rows.length < rowsNeeded) fetchNextPage();
+    }, [hasNextPage, isFetchingNextPage, isPlaceholderData, fetchNextPage, wantAll, rows.length, rowsNeeded]);
+
+    return {
+        rows,
+        serverSorted,
+        hasMore: Boolean(hasNextPage),
+        isLoading: query.isLoading,
+        isError: query.isError,
+        refetch: query.refetch,
+    };
+}
@@ -7,6 +7,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@
 import { formatINR } from "@/components/ui/currency-input";
 import { Eye, IndianRupee, Clock, FileText, Edit as EditIcon, Trash2 } from "lucide-react";
 import { cn, sortData } from "@/lib/utils";
+import { useKeysetList } from "@/hooks/useKeysetList";
 import { FilterBar } from "@/components/FilterBar";
 import type { SampleWithLead } from "@shared/schema";
 import { apiRequest } from "@/lib/queryClient";
@@ -291,26 +292,19 @@ export default function FinanceManagement() {
     retry: 1,
   });
 
-  const { data: financeData = [], isLoading: isLoadingRecords } = useQuery<any>({
-    queryKey: ['/api/finance-sheet'],
-    queryFn: async () => {
-      try {
-        console.log('[Finance GET] Fetching /api/finance-sheet');
-        const res = await fetch(`/api/finance-sheet`);
-        if (!res.ok) {
-          const errorData = await res.text();
-          console.error('[Finance GET] Response not OK:', res.status, errorData);
-          throw new Error(`HTTP ${res.status}: Failed to fetch finance sheet`);
-        }
-        const data = await res.json();
-        console.log('[Finance GET] Success, received', Array.isArray(data) ? data.length : 'non-array', 'records');
-        return data;
-      } catch (e) {
-        console.error('[Finance GET] Error:', e);
-        throw e;
-      }
-    },
-    retry: 1,
+  // Server-sorted keyset pages; search/date filters run client-side, so every
+  // page is loaded while one of them is active
+  const {
+    rows: financeData,
+    serverSorted,
+    hasMore,
+    isLoading: isLoadingRecords,
+  } = useKeysetList('/api/finance-sheet', {
+    table: 'finance_sheet',
+    sortKey,
+    sortDir,
+    rowsNeeded: page * pageSize,
+    loadAll: Boolean(financeQuery) || Boolean(dateRange.from),
   });
 
   // Converted leads removed from Finance view — show only finance_sheet rows
@@ -318,14 +312,15 @@ export default function FinanceManagement() {
 
   const stats = (() => {
     // Use API stats if available, otherwise calculate from client data
-    const totalRevenue = financeStats?.totalRevenue ??
-      (Array.isArray(financeData) ? financeData.reduce((sum, f) => sum + Number(f.paymentReceivedAmount || f.payment_received_amount || 0), 0) : 0);
+    // The client-side fallback is only a total once every keyset page is loaded
+    const totalRevenue: number | null = financeStats?.totalRevenue ??
+      (hasMore ? null : financeData.reduce((sum, f) => sum + Number(f.paymentReceivedAmount || f.payment_received_amount || 0), 0));
     const pendingPayments = financeStats?.pendingPayments ?? 0;
 
     return [
       {
         title: "Total Revenue",
-        value: `₹${formatINR(totalRevenue)}`,
+        value: totalRevenue === null ? 'Unavailable' : `₹${formatINR(totalRevenue)}`,
         icon: IndianRupee,
         color: "text-green-600 dark:text-green-400",
         bgColor: "bg-green-50 dark:bg-green-900/20",
@@ -444,11 +439,12 @@ export default function FinanceManagement() {
     return matchesSearch && matchesDate;
   });
 
-  const sortedFinanceRows = sortData(filteredFinanceRows, sortKey, sortDir);
+  // Rows already arrive in sortKey order when the server sorted them
+  const sortedFinanceRows = serverSorted ? filteredFinanceRows : sortData(filteredFinanceRows, sortKey, sortDir);
 
-  // Pagination calculations for finance records (client-side)
+  // Pagination over the loaded rows; one more page is offered while the server has more
   const totalFiltered = sortedFinanceRows.length;
-  const totalPages = Math.max(1, Math.ceil(totalFiltered / pageSize));
+  const totalPages = Math.max(1, Math.ceil(totalFiltered / pageSize) + (hasMore ? 1 : 0));
   const start = Math.max(0, (page - 1) * pageSize);
   const visibleRows = sortedFinanceRows.slice(start, start + pageSize);
 
@@ -1089,7 +1085,7 @@ export default function FinanceManagement() {
                       <Button size="sm" className="flex-shrink-0 min-w-[64px]" disabled={page <= 1} onClick={() => setPage(p => Math.max(1, p - 1))}>
                         Prev
                       </Button>
-                      <div className="whitespace-nowrap flex-shrink-0 px-2">Page {page} / {totalPages}</div>
+                      <div className="whitespace-nowrap flex-shrink-0 px-2">Page {page} / {totalPages}{hasMore ? '+' : ''}</div>
                       <Button size="sm" className="flex-shrink-0 min-w-[64px]" disabled={page >= totalPages} onClick={() => setPage(p => Math.min(totalPages, p + 1))}>
                         Next
                       </Button>
@@ -1,6 +1,5 @@
 import React, { useState, useEffect, useMemo } from 'react';
 import { ConfirmationDialog, useConfirmationDialog } from "@/components/ConfirmationDialog";
-import { useQuery } from '@tanstack/react-query';
 import { useAuth } from "@/contexts/AuthContext";
 import { Card, CardContent } from '@/components/ui/card';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
@@ -22,6 +21,7 @@ import { FilterBar } from "@/components/FilterBar";
 import { useColumnPreferences, ColumnConfig } from '@/hooks/useColumnPreferences';
 import { ColumnSettings } from '@/components/ColumnSettings';
 import { sortData } from "@/lib/utils";
+import { useKeysetList } from '@/hooks/useKeysetList';
 
 
 function normalizeLead(l: any) {
@@ -225,12 +225,21 @@ export default function ProcessMaster() {
   const processMasterColumnPrefs = useColumnPreferences('process_master_table', processMasterColumns);
 
 
-  const { data: processMasterData = [], isLoading: processMasterLoading, refetch: refetchProcessMaster } = useQuery({
-    queryKey: ['/api/process-master'],
-    queryFn: async () => {
-      const res = await apiRequest('GET', '/api/process-master');
-      return res.json();
-    },
+  // Server-sorted keyset pages; search/date/type filters run client-side, so
+  // every page is loaded while one of them is active
+  const filtersActive = Boolean(searchTerm) || Boolean(dateRange.from) || filterType !== 'combined';
+  const {
+    rows: processMasterData,
+    serverSorted,
+    hasMore,
+    isLoading: processMasterLoading,
+    refetch: refetchProcessMaster,
+  } = useKeysetList('/api/process-master', {
+    table: 'process_master_sheet',
+    sortKey,
+    sortDir,
+    rowsNeeded: page * pageSize,
+    loadAll: filtersActive,
     // Auto-refresh every 30 seconds to catch real-time updates from other sections
     refetchInterval: 30000,
     // Also refetch when the window gains focus
@@ -382,12 +391,13 @@ export default function ProcessMaster() {
   });
 
   const sortedLeads = useMemo(() => {
-    return sortData(filteredLeads, sortKey as any, sortDir);
-  }, [filteredLeads, sortKey, sortDir]);
+    // Rows already arrive in sortKey order when the server sorted them
+    return serverSorted ? filteredLeads : sortData(filteredLeads, sortKey as any, sortDir);
+  }, [filteredLeads, serverSorted, sortKey, sortDir]);
 
-  // Pagination logic
+  // Pagination logic; one more page is offered while the server has more rows
   const totalFiltered = sortedLeads.length;
-  const totalPages = Math.max(1, Math.ceil(totalFiltered / pageSize));
+  const totalPages = Math.max(1, Math.ceil(totalFiltered / pageSize) + (hasMore ? 1 : 0));
   if (page > totalPages) setPage(totalPages);
   const start = (page - 1) * pageSize;
   const visibleLeads = sortedLeads.slice(start, start + pageSize);
@@ -807,7 +817,7 @@ export default function ProcessMaster() {
           <div className="text-sm">Showing {(start + 1) <= totalFiltered ? (start + 1) : 0} - {Math.min(start + pageSize, totalFiltered)} of {totalFiltered}</div>
           <div className="flex items-center gap-2 flex-wrap justify-center sm:justify-end">
             <Button disabled={page <= 1} onClick={() => setPage(p => Math.max(1, p - 1))} size="sm">Prev</Button>
-            <div className="text-sm px-2 min-w-[60px] text-center">Page {page} / {totalPages}</div>
+            <div className="text-sm px-2 min-w-[60px] text-center">Page {page} / {totalPages}{hasMore ? '+' : ''}</div>
             <Button disabled={page >= totalPages} onClick={() => setPage(p => Math.min(totalPages, p + 1))} size="sm">Next</Button>
           </div>
         </div>
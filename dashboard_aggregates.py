@@ -0,0 +1,468 @@
+# LeadLab LIMS - Dashboard aggregate job
+#
+# Maintains dashboard_summary: per-status, per-service and per-day counts
+# (plus finance totals) for the operational sheets, so dashboard endpoints
+# can read a few hundred pre-aggregated rows instead of scanning
+# lead_management, sample_tracking, finance_sheet and the lab/bioinformatics
+# sheets on every refresh.
+#
+# Each source row's contribution (its buckets and amounts) is kept in
+# dashboard_summary_rows. An incremental pass reads only rows whose
+# created/modified timestamp passed the stored watermark (minus a small
+# overlap), subtracts their previous contribution and adds the new one, so
+# re-reading a row is harmless and status changes move counts between
+# buckets. Deletes are not visible to a watermark: when a table holds fewer
+# rows than its ledger, that table is rebuilt (more rows just means inserts
+# landed during the pass, so the incremental pass is rerun). Every table is
+# also fully rebuilt periodically (--rebuild-every) to correct any other drift.
+#
+# Tables are created on first run (see
+# database/migrations/0029_create_dashboard_summary.sql).
+#
+# Usage:
+#   python dashboard_aggregates.py                     # one incremental pass
+#   python dashboard_aggregates.py --full              # rebuild every table
+#   python dashboard_aggregates.py --loop --interval 60
+#   python dashboard_aggregates.py --show finance_sheet
+
+import argparse
+import datetime
+import decimal
+import json
+import sys
+import time
+from collections import defaultdict
+
+from database_config import get_pool
+
+SUMMARY_TABLE = 'dashboard_summary'
+LEDGER_TABLE = 'dashboard_summary_rows'
+STATE_TABLE = 'dashboard_summary_state'
+DEFAULT_PAGE_SIZE = 2000
+DEFAULT_OVERLAP = 300            # seconds re-read below the watermark
+DEFAULT_REBUILD_HOURS = 24
+BLANK = '(blank)'
+STAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DDL = [
+    f"""CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+  source_table VARCHAR(64) NOT NULL,
+  dimension VARCHAR(64) NOT NULL,
+  bucket VARCHAR(255){{bucket_collate}} NOT NULL,
+  row_count BIGINT NOT NULL DEFAULT 0,
+  amount DECIMAL(15,2) NOT NULL DEFAULT 0,
+  updated_at DATETIME NULL,
+  PRIMARY KEY (source_table, dimension, bucket)
+)""",
+    f"""CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+  source_table VARCHAR(64) NOT NULL,
+  row_key VARCHAR(64) NOT NULL,
+  contribution TEXT NOT NULL,
+  PRIMARY KEY (source_table, row_key)
+)""",
+    f"""CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+  source_table VARCHAR(64) NOT NULL PRIMARY KEY,
+  watermark VARCHAR(19) NULL,
+  row_count BIGINT NOT NULL DEFAULT 0,
+  last_full_rebuild DATETIME NULL
+)""",
+]
+
+
+def payment_status(row):
+    """Same split as pendingRevenue in GET /api/dashboard/stats."""
+    return 'received' if row.get('total_amount_received_status') in (1, True) else 'pending'
+
+
+# Source table -> how its rows are bucketed. 'dimensions' map a dimension name
+# to a column or callable; every row also lands in 'day' (from 'created') and
+# total/rows. 'amount' is summed into each bucket; 'totals' are summed into
+# total/<column>.
+SOURCES = {
+    'lead_management': {
+        'key': 'id', 'created': 'lead_created', 'modified': 'lead_modified',
+        'dimensions': {'status': 'status', 'service': 'service_name'},
+        'columns': ['status', 'service_name'],
+        'amount': 'budget',
+    },
+    'sample_tracking': {
+        'key': 'id', 'created': 'created_at', 'modified': None,
+        'dimensions': {},
+        'columns': [],
+        'amount': 'sample_shipment_amount',
+    },
+    'finance_sheet': {
+        'key': 'id', 'created': 'created_at', 'modified': 'modified_at',
+        'dimensions': {'payment_status': payment_status, 'service': 'service_name'},
+        'columns': ['total_amount_received_status', 'service_name'],
+        'amount': 'budget',
+        'totals': ['invoice_amount', 'payment_receipt_amount', 'balance_amount'],
+    },
+}
+for _table in ('labprocess_discovery_sheet', 'labprocess_clinical_sheet'):
+    SOURCES[_table] = {
+        'key': 'id', 'created': 'created_at', 'modified': 'modified_at',
+        'dimensions': {'extraction_qc_status': 'extraction_qc_status',
+                       'library_preparation_qc_status': 'library_preparation_qc_status',
+                       'service': 'service_name'},
+        'columns': ['extraction_qc_status', 'library_preparation_qc_status', 'service_name'],
+        'amount': None,
+    }
+for _table in ('bioinformatics_sheet_discovery', 'bioinformatics_sheet_clinical'):
+    SOURCES[_table] = {
+        'key': 'id', 'created': 'created_at', 'modified': 'modified_at',
+        'dimensions': {'sequencing_status': 'sequencing_status', 'analysis_status': 'analysis_status',
+                       'service': 'service_name'},
+        'columns': ['sequencing_status', 'analysis_status', 'service_name'],
+        'amount': None,
+    }
+
+
+def _stamp(value):
+    """Normalize a DATETIME/TIMESTAMP value (datetime or SQLite text) to STAMP_FORMAT."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.strftime(STAMP_FORMAT)
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d') + ' 00:00:00'
+    return str(value)[:19].replace('T', ' ')
+
+
+def _decimal(value):
+    if value is None or value == '':
+        return None
+    return decimal.Decimal(str(value))
+
+
+def _bucket(value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return BLANK
+    if isinstance(value, bool):
+        value = int(value)
+    return str(value).strip()[:255]
+
+
+def contribution(source, row):
+    """{(dimension, bucket): (count, amount)} this row adds to the summary."""
+    config = SOURCES[source]
+    amount = _decimal(row.get(config['amount'])) if config['amount'] else None
+    amount = amount or decimal.Decimal(0)
+    parts = {('total', 'rows'): (1, amount)}
+    created = _stamp(row.get(config['created']))
+    parts[('day', created[:10] if created else BLANK)] = (1, amount)
+    for dimension, rule in config['dimensions'].items():
+        value = rule(row) if callable(rule) else row.get(rule)
+        parts[(dimension, _bucket(value))] = (1, amount)
+    for column in config.get('totals', ()):
+        value = _decimal(row.get(column))
+        if value is not None:
+            parts[('total', column)] = (1, value)
+    return parts
+
+
+def encode_contribution(parts):
+    return json.dumps([[d, b, c, str(a)] for (d, b), (c, a) in sorted(parts.items())], separators=(',', ':'))
+
+
+def decode_contribution(text):
+    return {(d, b): (c, decimal.Decimal(a)) for d, b, c, a in json.loads(text)}
+
+
+def add_parts(totals, parts, sign=1):
+    for key, (count, amount) in parts.items():
+        entry = totals[key]
+        entry[0] += sign * count
+        entry[1] += sign * amount
+
+
+# -- SQL helpers -----------------------------------------------------------------
+
+def upsert_sql(table, columns, keys, row_count, dialect, increment=()):
+    """Multi-row upsert on `keys`; `increment` columns are added to, not replaced."""
+    placeholder = '?' if dialect == 'sqlite' else '%s'
+    row_sql = '(' + ', '.join([placeholder] * len(columns)) + ')'
+    values_sql = ', '.join([row_sql] * row_count)
+    updates = [c for c in columns if c not in keys]
+    if dialect == 'sqlite':
+        update_sql = ', '.join(f'{c} = {c} + excluded.{c}' if c in increment else f'{c} = excluded.{c}'
+                               for c in updates)
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values_sql} "
+                f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {update_sql}")
+    update_sql = ', '.join(f'{c} = {c} + VALUES({c})' if c in increment else f'{c} = VALUES({c})'
+                           for c in updates)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values_sql} ON DUPLICATE KEY UPDATE {update_sql}"
+
+
+def _execute_many(cur, table, columns, keys, rows, dialect, increment=(), batch=500):
+    for start in range(0, len(rows), batch):
+        chunk = rows[start:start + batch]
+        cur.execute(upsert_sql(table, columns, keys, len(chunk), dialect, increment),
+                    [v for row in chunk for v in row])
+
+
+def _begin(cur, dialect):
+    cur.execute('BEGIN' if dialect == 'sqlite' else 'START TRANSACTION')
+
+
+def ensure_tables(pool):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            # Buckets are compared byte-for-byte: under utf8mb4_unicode_ci
+            # 'Paid' and 'paid' would share a row that rebuild overwrites but
+            # incremental passes add to. SQLite already compares BINARY.
+            collate = '' if pool.dialect == 'sqlite' else ' COLLATE utf8mb4_bin'
+            for statement in DDL:
+                cur.execute(statement.replace('{bucket_collate}', collate))
+        finally:
+            cur.close()
+
+
+def load_state(conn, placeholder, source):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT watermark, row_count, last_full_rebuild FROM {STATE_TABLE} "
+                    f"WHERE source_table = {placeholder}", [source])
+        row = cur.fetchone()
+    finally:
+        cur.close()
+    if not row:
+        return None
+    return {'watermark': row[0], 'row_count': row[1], 'last_full_rebuild': _stamp(row[2])}
+
+
+def _count(conn, sql, params=()):
+    cur = conn.cursor()
+    try:
+        cur.execute(sql, params)
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def fetch_page(conn, placeholder, source, after, since, limit):
+    """Keyset page of `source` rows, optionally only those created/modified after `since`."""
+    config = SOURCES[source]
+    key = config['key']
+    columns = [key, config['created']] + ([config['modified']] if config['modified'] else [])
+    columns += config['columns'] + ([config['amount']] if config['amount'] else []) + config.get('totals', [])
+    columns = list(dict.fromkeys(columns))
+    where, params = [], []
+    if after is not None:
+        where.append(f'{key} > {placeholder}')
+        params.append(after)
+    if since is not None:
+        stamps = [c for c in (config['created'], config['modified']) if c]
+        where.append('(' + ' OR '.join(f'{c} > {placeholder}' for c in stamps) + ')')
+        params.extend([since] * len(stamps))
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT {', '.join(columns)} FROM {source} {where_sql} ORDER BY {key} LIMIT {int(limit)}",
+                    params)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def _max_stamp(source, rows, current):
+    config = SOURCES[source]
+    stamps = [_stamp(r.get(c)) for r in rows for c in (config['created'], config['modified']) if c]
+    return max([s for s in stamps if s] + ([current] if current else []), default=None)
+
+
+def _write_summary(cur, dialect, source, totals, now, increment):
+    rows = [(source, d, b, c, a, now) for (d, b), (c, a) in totals.items() if c or a]
+    _execute_many(cur, SUMMARY_TABLE, ['source_table', 'dimension', 'bucket', 'row_count', 'amount', 'updated_at'],
+                  ['source_table', 'dimension', 'bucket'], rows, dialect,
+                  increment=('row_count', 'amount') if increment else ())
+
+
+def _write_state(cur, dialect, source, watermark, row_count, rebuilt_at):
+    columns = ['source_table', 'watermark', 'row_count'] + (['last_full_rebuild'] if rebuilt_at else [])
+    values = (source, watermark, row_count) + ((rebuilt_at,) if rebuilt_at else ())
+    _execute_many(cur, STATE_TABLE, columns, ['source_table'], [values], dialect)
+
+
+# -- passes ----------------------------------------------------------------------
+
+def rebuild(pool, source, page_size):
+    """Recompute `source` from scratch in one transaction. Returns rows scanned."""
+    dialect, placeholder = pool.dialect, pool.placeholder
+    now = datetime.datetime.now().strftime(STAMP_FORMAT)
+    totals = defaultdict(lambda: [0, decimal.Decimal(0)])
+    watermark, scanned = None, 0
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            _begin(cur, dialect)
+            cur.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE source_table = {placeholder}", [source])
+            cur.execute(f"DELETE FROM {LEDGER_TABLE} WHERE source_table = {placeholder}", [source])
+            after = None
+            while True:
+                rows = fetch_page(conn, placeholder, source, after, None, page_size)
+                if not rows:
+                    break
+                ledger = []
+                for row in rows:
+                    parts = contribution(source, row)
+                    add_parts(totals, parts)
+                    ledger.append((source, str(row[SOURCES[source]['key']]), encode_contribution(parts)))
+                _execute_many(cur, LEDGER_TABLE, ['source_table', 'row_key', 'contribution'],
+                              ['source_table', 'row_key'], ledger, dialect)
+                watermark = _max_stamp(source, rows, watermark)
+                scanned += len(rows)
+                after = rows[-1][SOURCES[source]['key']]
+                if len(rows) < page_size:
+                    break
+            _write_summary(cur, dialect, source, totals, now, increment=False)
+            _write_state(cur, dialect, source, watermark, scanned, now)
+            cur.execute('COMMIT')
+        except Exception:
+            cur.execute('ROLLBACK')
+            raise
+        finally:
+            cur.close()
+    return scanned
+
+
+def incremental(pool, source, state, page_size, overlap):
+    """Apply rows changed since the watermark. Returns (rows applied, ledger size)."""
+    dialect, placeholder = pool.dialect, pool.placeholder
+    key = SOURCES[source]['key']
+    since = None
+    if state['watermark']:
+        since = (datetime.datetime.strptime(state['watermark'], STAMP_FORMAT)
+                 - datetime.timedelta(seconds=overlap)).strftime(STAMP_FORMAT)
+    watermark, applied, ledger_size = state['watermark'], 0, state['row_count']
+    with pool.connection() as conn:
+        after = None
+        while True:
+            rows = fetch_page(conn, placeholder, source, after, since, page_size)
+            if not rows:
+                break
+            keys = [str(r[key]) for r in rows]
+            cur = conn.cursor()
+            try:
+                _begin(cur, dialect)
+                cur.execute(f"SELECT row_key, contribution FROM {LEDGER_TABLE} WHERE source_table = {placeholder} "
+                            f"AND row_key IN ({', '.join([placeholder] * len(keys))})", [source] + keys)
+                previous = dict(cur.fetchall())
+                delta = defaultdict(lambda: [0, decimal.Decimal(0)])
+                ledger = []
+                for row_key, row in zip(keys, rows):
+                    parts = contribution(source, row)
+                    encoded = encode_contribution(parts)
+                    old = previous.get(row_key)
+                    if old == encoded:
+                        continue
+                    if old is not None:
+                        add_parts(delta, decode_contribution(old), -1)
+                    else:
+                        ledger_size += 1
+                    add_parts(delta, parts)
+                    ledger.append((source, row_key, encoded))
+                now = datetime.datetime.now().strftime(STAMP_FORMAT)
+                _write_summary(cur, dialect, source, delta, now, increment=True)
+                cur.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE source_table = {placeholder} AND row_count <= 0",
+                            [source])
+                _execute_many(cur, LEDGER_TABLE, ['source_table', 'row_key', 'contribution'],
+                              ['source_table', 'row_key'], ledger, dialect)
+                watermark = _max_stamp(source, rows, watermark)
+                _write_state(cur, dialect, source, watermark, ledger_size, None)
+                cur.execute('COMMIT')
+            except Exception:
+                cur.execute('ROLLBACK')
+                raise
+            finally:
+                cur.close()
+            applied += len(ledger)
+            after = rows[-1][key]
+            if len(rows) < page_size:
+                break
+    return applied, ledger_size
+
+
+def run_once(pool, sources, page_size=DEFAULT_PAGE_SIZE, overlap=DEFAULT_OVERLAP,
+             rebuild_hours=DEFAULT_REBUILD_HOURS, full=False):
+    """One pass over `sources`. Returns {source: (mode, rows)}."""
+    results = {}
+    cutoff = (datetime.datetime.now() - datetime.timedelta(hours=rebuild_hours)).strftime(STAMP_FORMAT)
+    for source in sources:
+        with pool.connection() as conn:
+            state = load_state(conn, pool.placeholder, source)
+        if full or state is None or not state['last_full_rebuild'] or state['last_full_rebuild'] < cutoff:
+            results[source] = ('rebuild', rebuild(pool, source, page_size))
+            continue
+        applied, ledger_size = incremental(pool, source, state, page_size, overlap)
+        with pool.connection() as conn:
+            actual = _count(conn, f"SELECT COUNT(*) FROM {source}")
+        if actual > ledger_size:
+            # Rows inserted since the pass started; pick them up now. Anything
+            # still missing (never timestamped) waits for the periodic rebuild.
+            with pool.connection() as conn:
+                state = load_state(conn, pool.placeholder, source)
+            more, ledger_size = incremental(pool, source, state, page_size, overlap)
+            applied += more
+            with pool.connection() as conn:
+                actual = _count(conn, f"SELECT COUNT(*) FROM {source}")
+        if actual < ledger_size:
+            # Deleted rows: only a rebuild can see them
+            results[source] = ('rebuild', rebuild(pool, source, page_size))
+        else:
+            results[source] = ('incremental', applied)
+    return results
+
+
+def show(pool, source):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(f"SELECT dimension, bucket, row_count, amount FROM {SUMMARY_TABLE} "
+                        f"WHERE source_table = {pool.placeholder} ORDER BY dimension, bucket", [source])
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+    print(f"{'dimension':30} {'bucket':40} {'rows':>8} {'amount':>16}")
+    for dimension, bucket, count, amount in rows:
+        print(f"{dimension:30} {bucket[:40]:40} {count:>8} {decimal.Decimal(str(amount)):>16.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Maintain the dashboard_summary aggregate table.')
+    parser.add_argument('--only', nargs='+', choices=list(SOURCES), help='limit to these source tables')
+    parser.add_argument('--full', action='store_true', help='rebuild every source from scratch')
+    parser.add_argument('--loop', action='store_true', help='keep running, one pass every --interval seconds')
+    parser.add_argument('--interval', type=float, default=60.0, help='seconds between passes with --loop')
+    parser.add_argument('--rebuild-every', type=float, default=DEFAULT_REBUILD_HOURS,
+                        help='hours between automatic full rebuilds')
+    parser.add_argument('--overlap', type=int, default=DEFAULT_OVERLAP,
+                        help='seconds below the watermark to re-read (late commits)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='rows per keyset page')
+    parser.add_argument('--show', choices=list(SOURCES), help='print the summary rows of one source and exit')
+    args = parser.parse_args(argv)
+
+    pool = get_pool()
+    ensure_tables(pool)
+    if args.show:
+        show(pool, args.show)
+        return 0
+
+    sources = args.only or list(SOURCES)
+    full = args.full
+    while True:
+        started = time.perf_counter()
+        results = run_once(pool, sources, args.page_size, args.overlap, args.rebuild_every, full)
+        summary = ', '.join(f"{source} {mode} {rows}" for source, (mode, rows) in results.items())
+        print(f"[{datetime.datetime.now():%H:%M:%S}] {summary} ({time.perf_counter() - started:.2f}s)")
+        sys.stdout.flush()
+        if not args.loop:
+            return 0
+        full = False
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
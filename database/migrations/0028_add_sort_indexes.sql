@@ -0,0 +1,48 @@
+-- Migration: Add indexes for server-side sorting and keyset pagination
+-- File: 0028_add_sort_indexes.sql
+-- AUTO-GENERATED by header_codegen.py from database_schema.sql. Do not edit by hand.
+--
+-- InnoDB secondary indexes already carry the primary key, so a single-column
+-- index serves ORDER BY <column>, id and the matching keyset WHERE clause.
+
+-- bioinformatics_sheet_clinical
+CREATE INDEX idx_sort_sequencing_status ON bioinformatics_sheet_clinical(sequencing_status);
+CREATE INDEX idx_sort_sequencing_data_storage_date ON bioinformatics_sheet_clinical(sequencing_data_storage_date);
+CREATE INDEX idx_sort_basecalling_data_storage_date ON bioinformatics_sheet_clinical(basecalling_data_storage_date);
+CREATE INDEX idx_sort_analysis_status ON bioinformatics_sheet_clinical(analysis_status);
+CREATE INDEX idx_sort_analysis_date ON bioinformatics_sheet_clinical(analysis_date);
+CREATE INDEX idx_sort_sample_sent_to_third_party_date ON bioinformatics_sheet_clinical(sample_sent_to_third_party_date);
+CREATE INDEX idx_sort_results_raw_data_received_from_third_party_date ON bioinformatics_sheet_clinical(results_raw_data_received_from_third_party_date);
+CREATE INDEX idx_sort_cnv_status ON bioinformatics_sheet_clinical(cnv_status);
+CREATE INDEX idx_sort_created_at ON bioinformatics_sheet_clinical(created_at);
+CREATE INDEX idx_sort_modified_at ON bioinformatics_sheet_clinical(modified_at);
+
+-- finance_sheet
+CREATE INDEX idx_sort_sample_collection_date ON finance_sheet(sample_collection_date);
+CREATE INDEX idx_sort_invoice_date ON finance_sheet(invoice_date);
+CREATE INDEX idx_sort_payment_receipt_date ON finance_sheet(payment_receipt_date);
+CREATE INDEX idx_sort_balance_amount_received_date ON finance_sheet(balance_amount_received_date);
+CREATE INDEX idx_sort_total_amount_received_status ON finance_sheet(total_amount_received_status);
+CREATE INDEX idx_sort_third_party_payment_date ON finance_sheet(third_party_payment_date);
+CREATE INDEX idx_sort_third_party_payment_status ON finance_sheet(third_party_payment_status);
+CREATE INDEX idx_sort_created_at ON finance_sheet(created_at);
+CREATE INDEX idx_sort_modified_at ON finance_sheet(modified_at);
+
+-- nutritional_management
+CREATE INDEX idx_sort_counselling_session_date ON nutritional_management(counselling_session_date);
+CREATE INDEX idx_sort_counselling_status ON nutritional_management(counselling_status);
+CREATE INDEX idx_sort_created_at ON nutritional_management(created_at);
+CREATE INDEX idx_sort_modified_at ON nutritional_management(modified_at);
+
+-- process_master_sheet
+CREATE INDEX idx_sort_results_raw_data_received_from_third_party_date ON process_master_sheet(results_raw_data_received_from_third_party_date);
+CREATE INDEX idx_sort_logistic_status ON process_master_sheet(logistic_status);
+CREATE INDEX idx_sort_progenics_report_release_date ON process_master_sheet(progenics_report_release_date);
+CREATE INDEX idx_sort_created_at ON process_master_sheet(created_at);
+CREATE INDEX idx_sort_modified_at ON process_master_sheet(modified_at);
+
+-- report_management
+CREATE INDEX idx_sort_report_release_date ON report_management(report_release_date);
+CREATE INDEX idx_sort_sample_received_date ON report_management(sample_received_date);
+CREATE INDEX idx_sort_lead_modified ON report_management(lead_modified);
+CREATE INDEX idx_sort_created_at ON report_management(created_at);
@@ -0,0 +1,36 @@
+-- Migration: Create pre-aggregated dashboard summary tables
+-- File: 0029_create_dashboard_summary.sql
+--
+-- Maintained by dashboard_aggregates.py (which also creates these tables if
+-- they are missing). dashboard_summary holds per-status / per-service /
+-- per-day counts and amount totals per source table; dashboard_summary_rows
+-- records each source row's contribution so incremental passes can move a
+-- changed row between buckets; dashboard_summary_state keeps the
+-- modified_at/created_at watermark and last full rebuild per source table.
+-- `bucket` is utf8mb4_bin so case/accent variants of a value stay separate
+-- buckets instead of colliding on the primary key.
+
+CREATE TABLE IF NOT EXISTS `dashboard_summary` (
+  `source_table` VARCHAR(64) NOT NULL,
+  `dimension` VARCHAR(64) NOT NULL,
+  `bucket` VARCHAR(255) COLLATE utf8mb4_bin NOT NULL,
+  `row_count` BIGINT NOT NULL DEFAULT 0,
+  `amount` DECIMAL(15,2) NOT NULL DEFAULT 0,
+  `updated_at` DATETIME NULL,
+  PRIMARY KEY (`source_table`, `dimension`, `bucket`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `dashboard_summary_rows` (
+  `source_table` VARCHAR(64) NOT NULL,
+  `row_key` VARCHAR(64) NOT NULL,
+  `contribution` TEXT NOT NULL,
+  PRIMARY KEY (`source_table`, `row_key`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS `dashboard_summary_state` (
+  `source_table` VARCHAR(64) NOT NULL,
+  `watermark` VARCHAR(19) NULL,
+  `row_count` BIGINT NOT NULL DEFAULT 0,
+  `last_full_rebuild` DATETIME NULL,
+  PRIMARY KEY (`source_table`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,16 @@
+-- Migration: Create the index of rows moved out of the hot tables by archive.py
+-- File: 0030_create_archive_index.sql
+--
+-- location is either <table>_archive or a gzip JSONL segment path relative to
+-- the archive directory. archive.py creates this table (and the
+-- <table>_archive tables) on demand if it is missing.
+
+CREATE TABLE IF NOT EXISTS `archive_index` (
+  `source_table` VARCHAR(64) NOT NULL,
+  `row_key` VARCHAR(255) NOT NULL,
+  `unique_id` VARCHAR(255) NULL,
+  `location` VARCHAR(512) NOT NULL,
+  `archived_at` DATETIME NOT NULL,
+  PRIMARY KEY (`source_table`, `row_key`),
+  KEY `idx_archive_unique_id` (`unique_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
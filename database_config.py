@@ -1,5 +1,27 @@
 # LeadLab LIMS Database Configuration
 # Update these values according to your MySQL server settings
+#
+# Besides the static settings below, this module provides a lazily created,
+# thread-safe connection pool shared by the Python maintenance scripts:
+#
+#   from database_config import get_pool
+#
+#   with get_pool().connection() as conn:
+#       cur = conn.cursor()
+#       cur.execute('SELECT COUNT(*) FROM process_master_sheet')
+#
+# The pool honours pool_size / max_overflow, pre-pings and recycles stale
+# connections, bounds checkout waits, and exposes metrics via pool.stats().
+# Set DB_DRIVER=sqlite and DB_NAME=<file> to run against a local SQLite
+# stand-in instead of MySQL (used for dry runs and local testing).
+
+import decimal
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import unquote
 
 DATABASE_CONFIG = {
     'host': '192.168.29.11',
@@ -19,18 +41,323 @@ DATABASE_URL = f"mysql+pymysql://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['pas
 # Environment variable names for secure configuration
 ENV_VARS = {
     'DB_HOST': 'DB_HOST',
-    'DB_USER': 'DB_USER', 
+    'DB_USER': 'DB_USER',
     'DB_PASSWORD': 'DB_PASSWORD',
     'DB_NAME': 'DB_NAME',
     'DB_PORT': 'DB_PORT'
 }
 
-# Example usage:
-# import os
-# from database_config import DATABASE_CONFIG
-# 
-# # Override with environment variables if available
-# DATABASE_CONFIG['host'] = os.getenv('DB_HOST', DATABASE_CONFIG['host'])
-# DATABASE_CONFIG['user'] = os.getenv('DB_USER', DATABASE_CONFIG['user'])
-# DATABASE_CONFIG['password'] = os.getenv('DB_PASSWORD', DATABASE_CONFIG['password'])
+# Pool behaviour (seconds). Overridable per pool via ConnectionPool(...)
+POOL_DEFAULTS = {
+    'pool_timeout': 30,     # max wait for a free connection at checkout
+    'pool_recycle': 3600,   # replace connections older than this
+    'pool_pre_ping': True,  # test idle connections before handing them out
+}
+
+# Config keys that describe the pool rather than the connection itself
+_POOL_KEYS = {'pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle', 'pool_pre_ping'}
+
+
+def get_config():
+    """Return DATABASE_CONFIG with ENV_VARS overrides applied.
+
+    Like server/db.ts, percent-encoded passwords (e.g. Prolab%2305) are decoded.
+    """
+    config = dict(DATABASE_CONFIG)
+    config.update(POOL_DEFAULTS)
+    env_map = {
+        ENV_VARS['DB_HOST']: 'host',
+        ENV_VARS['DB_USER']: 'user',
+        ENV_VARS['DB_PASSWORD']: 'password',
+        ENV_VARS['DB_NAME']: 'database',
+        ENV_VARS['DB_PORT']: 'port',
+    }
+    for env_name, key in env_map.items():
+        value = os.getenv(env_name)
+        if value:
+            config[key] = value
+    config['port'] = int(config['port'])
+    if '%' in config['password']:
+        config['password'] = unquote(config['password'])
+    config['driver'] = os.getenv('DB_DRIVER', 'mysql').lower()
+    return config
+
+
+def mysql_creator(config):
+    """Return a zero-argument factory that opens a PyMySQL connection."""
+    import pymysql  # imported lazily so SQLite-only runs need no MySQL driver
+
+    connect_args = {k: v for k, v in config.items() if k not in _POOL_KEYS and k != 'driver'}
+
+    def create():
+        return pymysql.connect(**connect_args)
+
+    return create
+
+
+def sqlite_creator(path):
+    """Return a factory for a local SQLite stand-in database."""
+    # PyMySQL accepts Decimal parameters for DECIMAL columns; let SQLite do the same
+    sqlite3.register_adapter(decimal.Decimal, str)
+
+    def create():
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    return create
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within pool_timeout."""
+
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'overflow')
+
+    def __init__(self, conn, overflow):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.overflow = overflow
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections.
+
+    Up to `pool_size` connections are kept warm; up to `max_overflow` extra
+    connections are opened under load and closed again when returned.
+    Connections are created lazily on first checkout.
+    """
+
+    def __init__(self, creator, pool_size=10, max_overflow=20, pool_timeout=30,
+                 pool_recycle=3600, pool_pre_ping=True, dialect='mysql'):
+        self._creator = creator
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.dialect = dialect
+        # DB-API paramstyle of the underlying driver
+        self.placeholder = '?' if dialect == 'sqlite' else '%s'
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._open = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+        self._metrics = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'invalidated': 0,
+            'timeouts': 0,
+            'checkout_time_total': 0.0,
+            'checkout_time_max': 0.0,
+        }
+
+    # -- checkout / checkin ------------------------------------------------
+
+    def _acquire(self):
+        started = time.monotonic()
+        deadline = started + self.pool_timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError('Connection pool is closed')
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    # Reserve the slot now, connect outside the lock
+                    self._open += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No connection available within {self.pool_timeout}s "
+                        f"(size={self.pool_size}, overflow={self.max_overflow})"
+                    )
+                self._waiters += 1
+                try:
+                    self._available.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+
+        try:
+            if pooled is None:
+                pooled = self._connect()
+            else:
+                pooled = self._revalidate(pooled)
+        except Exception:
+            with self._available:
+                self._in_use -= 1
+                self._open -= 1
+                self._available.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._metrics['checkouts'] += 1
+            self._metrics['checkout_time_total'] += elapsed
+            self._metrics['checkout_time_max'] = max(self._metrics['checkout_time_max'], elapsed)
+        return pooled
+
+    def _connect(self):
+        with self._lock:
+            overflow = self._open > self.pool_size
+            self._metrics['created'] += 1
+        return _PooledConnection(self._creator(), overflow)
+
+    def _revalidate(self, pooled):
+        """Replace `pooled` if it is too old or fails a ping."""
+        if self.pool_recycle and time.monotonic() - pooled.created_at > self.pool_recycle:
+            self._close_quietly(pooled.conn)
+            with self._lock:
+                self._metrics['recycled'] += 1
+            return self._connect()
+        if self.pool_pre_ping and not self._ping(pooled.conn):
+            self._close_quietly(pooled.conn)
+            with self._lock:
+                self._metrics['invalidated'] += 1
+            return self._connect()
+        return pooled
+
+    def _ping(self, conn):
+        try:
+            if hasattr(conn, 'ping'):
+                conn.ping(reconnect=False)
+            else:
+                conn.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _release(self, pooled, discard=False):
+        with self._available:
+            self._in_use -= 1
+            keep = not discard and not self._closed and not (
+                pooled.overflow and len(self._idle) + self._in_use >= self.pool_size
+            )
+            if keep:
+                self._idle.append(pooled)
+            else:
+                self._open -= 1
+            self._available.notify()
+        if not keep:
+            self._close_quietly(pooled.conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a `with` block.
+
+        On error the transaction is rolled back; connections that raise
+        driver-level errors are discarded rather than returned to the pool.
+        """
+        pooled = self._acquire()
+        discard = False
+        try:
+            yield pooled.conn
+        except Exception as exc:
+            try:
+                pooled.conn.rollback()
+            except Exception:
+                discard = True
+            if _is_disconnect(exc):
+                discard = True
+            raise
+        finally:
+            self._release(pooled, discard=discard)
+
+    # -- housekeeping ------------------------------------------------------
+
+    def stats(self):
+        """Return a snapshot of pool metrics."""
+        with self._lock:
+            checkouts = self._metrics['checkouts']
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'overflow_in_use': max(0, self._open - self.pool_size),
+                'waiters': self._waiters,
+                'checkouts': checkouts,
+                'created': self._metrics['created'],
+                'recycled': self._metrics['recycled'],
+                'invalidated': self._metrics['invalidated'],
+                'timeouts': self._metrics['timeouts'],
+                'checkout_ms_avg': (self._metrics['checkout_time_total'] / checkouts * 1000) if checkouts else 0.0,
+                'checkout_ms_max': self._metrics['checkout_time_max'] * 1000,
+            }
+
+    def dispose(self):
+        """Close idle connections and refuse new checkouts."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._available.notify_all()
+        for pooled in idle:
+            self._close_quietly(pooled.conn)
+
+
+def _is_disconnect(exc):
+    """True for errors that mean the connection itself is unusable."""
+    if isinstance(exc, sqlite3.ProgrammingError):
+        return True
+    name = type(exc).__name__
+    return name in ('OperationalError', 'InterfaceError')
+
+
+def create_pool(config=None, creator=None):
+    """Build a ConnectionPool from `config` (default: get_config())."""
+    config = config or get_config()
+    dialect = config.get('driver', 'mysql')
+    if creator is None:
+        creator = sqlite_creator(config['database']) if dialect == 'sqlite' else mysql_creator(config)
+    return ConnectionPool(
+        creator,
+        pool_size=int(config.get('pool_size', 10)),
+        max_overflow=int(config.get('max_overflow', 20)),
+        pool_timeout=float(config.get('pool_timeout', POOL_DEFAULTS['pool_timeout'])),
+        pool_recycle=float(config.get('pool_recycle', POOL_DEFAULTS['pool_recycle'])),
+        pool_pre_ping=bool(config.get('pool_pre_ping', POOL_DEFAULTS['pool_pre_ping'])),
+        dialect=dialect,
+    )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+    return _pool
+
 
+def reset_pool():
+    """Dispose the process-wide pool (e.g. after fork or config change)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.dispose()
+        _pool = None
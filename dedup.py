@@ -0,0 +1,359 @@
+# LeadLab LIMS - Duplicate detection for genetic counselling records and leads
+#
+# Streams genetic_counselling_records / lead_management straight from MySQL in
+# keyset-paged chunks, normalises unique_id, project_id, patient names and
+# phone numbers, and groups candidates with hash blocking: every row is
+# hashed under a few blocking rules and rows sharing a hash are unioned into
+# one cluster. There are no pairwise comparisons, so the work grows linearly
+# with the table.
+#
+# Each cluster keeps one survivor (latest modified_at, then created_at, then
+# id). Clusters are always reported first; with --apply the duplicates are
+# deleted in batched statements, and with --merge the survivor's empty fields
+# are first filled from the newest duplicate that has them.
+#
+# Usage:
+#   python dedup.py genetic_counselling_records              # report clusters only
+#   python dedup.py lead_management --rules name_phone       # one blocking rule
+#   python dedup.py genetic_counselling_records --apply      # delete duplicates
+#   python dedup.py lead_management --apply --merge          # merge, then delete
+#   python dedup.py genetic_counselling_records --report clusters.jsonl
+
+import argparse
+import datetime
+import hashlib
+import json
+import re
+import sys
+import time
+
+import schema_index
+from database_config import get_pool
+
+DEFAULT_PAGE_SIZE = 5000
+DEFAULT_BATCH_SIZE = 500
+SAMPLE_CLUSTERS = 20
+
+# Per table: primary key, recency columns (COALESCEd in order; newest wins),
+# and blocking rules.
+# A rule is a tuple of columns; rows whose normalised values are all present
+# and equal under any rule end up in the same cluster.
+TABLES = {
+    'genetic_counselling_records': {
+        'pk': 'id',
+        'recency': ['modified_at', 'created_at'],
+        'label': ['unique_id', 'patient_client_name'],
+        'rules': {
+            'unique_id': ('unique_id',),
+            # One patient can have separate counselling records per service
+            # (e.g. WES and Karyotype); only same-service rows are duplicates
+            'name_phone': ('patient_client_name', 'patient_client_phone', 'service_name'),
+            'project_name': ('project_id', 'patient_client_name', 'service_name'),
+        },
+    },
+    'lead_management': {
+        'pk': 'id',
+        'recency': ['lead_modified', 'lead_created'],
+        'label': ['unique_id', 'patient_client_name'],
+        'rules': {
+            'unique_id': ('unique_id',),
+            # The same patient may legitimately have leads for different services
+            'name_phone': ('patient_client_name', 'patient_client_phone', 'service_name'),
+            'project_name': ('project_id', 'patient_client_name', 'service_name'),
+        },
+    },
+}
+
+# Honorifics dropped from names before comparison
+NAME_TITLES = {'mr', 'mrs', 'ms', 'miss', 'dr', 'master', 'baby', 'prof', 'smt', 'shri', 'sri'}
+# Columns never copied onto the survivor by --merge
+MERGE_EXCLUDE = {'id', 'unique_id', 'created_at', 'created_by', 'modified_at', 'modified_by',
+                 'lead_created', 'lead_modified', 'lead_created_by'}
+
+
+def normalize_phone(value):
+    """Last 10 digits of an Indian mobile/landline, dropping +91 / 0 prefixes."""
+    digits = re.sub(r'\D', '', str(value or ''))
+    if len(digits) > 10 and (digits.startswith('91') or digits.startswith('0')):
+        digits = digits[-10:]
+    return digits if len(digits) >= 7 else None
+
+
+def normalize_name(value):
+    """Case-folded name tokens without titles or punctuation, in sorted order."""
+    tokens = re.sub(r'[^\w\s]', ' ', str(value or '').casefold()).split()
+    tokens = sorted(t for t in tokens if t not in NAME_TITLES and not t.isdigit())
+    return ' '.join(tokens) or None
+
+
+def normalize_id(value):
+    """unique_id / project_id without case, whitespace or separator differences."""
+    text = re.sub(r'[\s\-_/]', '', str(value or '').casefold())
+    return text or None
+
+
+def normalize_field(column, value):
+    if column.endswith('_phone'):
+        return normalize_phone(value)
+    if column.endswith('_name'):
+        return normalize_name(value)
+    if column in ('unique_id', 'project_id'):
+        return normalize_id(value)
+    text = ' '.join(str(value).split()).casefold() if value is not None else ''
+    return text or None
+
+
+def block_hash(rule, values):
+    payload = '\x1f'.join([rule] + values)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).digest()
+
+
+class UnionFind:
+    """Disjoint sets over row positions (path halving + union by size)."""
+
+    def __init__(self):
+        self.parent = []
+        self.size = []
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+def stream_rows(conn, placeholder, table, columns, pk, page_size):
+    """Yield row dicts ordered by primary key, one keyset page at a time."""
+    after = None
+    while True:
+        where = f'WHERE {pk} > {placeholder}' if after is not None else ''
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY {pk} LIMIT {int(page_size)}",
+                [after] if after is not None else [],
+            )
+            names = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        for row in rows:
+            yield dict(zip(names, row))
+        if len(rows) < page_size:
+            return
+        after = rows[-1][names.index(pk)]
+
+
+def _recency(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    if value:
+        try:
+            return datetime.datetime.fromisoformat(str(value))
+        except ValueError:
+            pass
+    return datetime.datetime.min
+
+
+def find_clusters(rows, spec, rules):
+    """Group rows into duplicate clusters.
+
+    Returns a list of clusters, each {'survivor': member, 'duplicates': [...],
+    'rules': [...]} where members are (pk, recency key, label dict).
+    """
+    uf = UnionFind()
+    members, first_by_hash, matched = [], {}, {}
+    for row in rows:
+        pos = uf.add()
+        # COALESCE(modified, created): a newer row that was never edited must
+        # not lose to an older edited one
+        stamp = next((row.get(c) for c in spec['recency'] if row.get(c)), None)
+        recency = (_recency(stamp), str(row[spec['pk']]))
+        members.append((row[spec['pk']], recency, {c: row.get(c) for c in spec['label']}))
+        for rule_name, columns in rules.items():
+            values = [normalize_field(c, row.get(c)) for c in columns]
+            if None in values:
+                continue
+            h = block_hash(rule_name, values)
+            other = first_by_hash.setdefault(h, pos)
+            if other != pos:
+                uf.union(other, pos)
+                matched.setdefault(pos, set()).add(rule_name)
+                matched.setdefault(other, set()).add(rule_name)
+
+    groups = {}
+    for pos in matched:
+        groups.setdefault(uf.find(pos), []).append(pos)
+
+    clusters = []
+    for positions in groups.values():
+        if len(positions) < 2:
+            continue
+        ordered = sorted(positions, key=lambda p: members[p][1], reverse=True)
+        clusters.append({
+            'survivor': members[ordered[0]],
+            'duplicates': [members[p] for p in ordered[1:]],
+            'rules': sorted(set().union(*(matched[p] for p in positions))),
+        })
+    clusters.sort(key=lambda c: -len(c['duplicates']))
+    return clusters, len(members)
+
+
+def _fetch_by_pk(conn, placeholder, table, pk, ids):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT * FROM {table} WHERE {pk} IN ({', '.join([placeholder] * len(ids))})", list(ids))
+        names = [d[0] for d in cur.description]
+        return {row[names.index(pk)]: dict(zip(names, row)) for row in cur.fetchall()}
+    finally:
+        cur.close()
+
+
+def merge_values(survivor, duplicates):
+    """Empty survivor fields filled from the newest duplicate that has a value."""
+    merged = {}
+    for column, value in survivor.items():
+        if column in MERGE_EXCLUDE or (value is not None and value != ''):
+            continue
+        for dup in duplicates:
+            if dup.get(column) not in (None, ''):
+                merged[column] = dup[column]
+                break
+    return merged
+
+
+def apply_clusters(conn, pool, table, spec, clusters, merge=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Delete (and optionally merge) duplicates, one transaction per batch of clusters."""
+    pk, ph = spec['pk'], pool.placeholder
+    deleted = merged_fields = 0
+    for start in range(0, len(clusters), batch_size):
+        batch = clusters[start:start + batch_size]
+        loser_ids = [m[0] for c in batch for m in c['duplicates']]
+        updates = {}
+        if merge:
+            ids = [c['survivor'][0] for c in batch] + loser_ids
+            full = _fetch_by_pk(conn, ph, table, pk, ids)
+            for c in batch:
+                values = merge_values(full[c['survivor'][0]], [full[m[0]] for m in c['duplicates']])
+                for column, value in values.items():
+                    updates.setdefault(column, []).append((c['survivor'][0], value))
+
+        cur = conn.cursor()
+        try:
+            cur.execute('BEGIN' if pool.dialect == 'sqlite' else 'START TRANSACTION')
+            # Delete first so merged values cannot collide with a loser's unique key
+            cur.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join([ph] * len(loser_ids))})", loser_ids)
+            for column, pairs in sorted(updates.items()):
+                cases = ' '.join([f'WHEN {ph} THEN {ph}'] * len(pairs))
+                cur.execute(
+                    f"UPDATE {table} SET {column} = CASE {pk} {cases} ELSE {column} END "
+                    f"WHERE {pk} IN ({', '.join([ph] * len(pairs))})",
+                    [v for pair in pairs for v in pair] + [k for k, _ in pairs],
+                )
+                merged_fields += len(pairs)
+            cur.execute('COMMIT')
+        except Exception:
+            cur.execute('ROLLBACK')
+            raise
+        finally:
+            cur.close()
+        deleted += len(loser_ids)
+    return deleted, merged_fields
+
+
+def _member_line(member, marker):
+    pk, recency, label = member
+    stamp = recency[0].strftime('%Y-%m-%d %H:%M') if recency[0] != datetime.datetime.min else '-'
+    details = ', '.join(f"{k}={v!r}" for k, v in label.items())
+    return f"    {marker} {pk}  modified {stamp}  {details}"
+
+
+def print_clusters(table, clusters, total, rules):
+    dupes = sum(len(c['duplicates']) for c in clusters)
+    print(f"{table}: {total} rows scanned, {len(clusters)} cluster(s), {dupes} duplicate row(s) "
+          f"[rules: {', '.join(rules)}]")
+    for c in clusters[:SAMPLE_CLUSTERS]:
+        print(f"\n  cluster of {len(c['duplicates']) + 1} (matched on {', '.join(c['rules'])})")
+        print(_member_line(c['survivor'], 'keep  '))
+        for m in c['duplicates']:
+            print(_member_line(m, 'remove'))
+        survivor_uid = c['survivor'][2].get('unique_id')
+        if any(m[2].get('unique_id') != survivor_uid for m in c['duplicates']):
+            print("    note: duplicates carry other unique_ids; downstream sheets may still reference them")
+    if len(clusters) > SAMPLE_CLUSTERS:
+        print(f"\n  ... {len(clusters) - SAMPLE_CLUSTERS} more cluster(s); use --report for the full list")
+
+
+def write_report(path, clusters):
+    with open(path, 'w', encoding='utf-8') as f:
+        for c in clusters:
+            f.write(json.dumps({
+                'survivor': c['survivor'][0],
+                'duplicates': [m[0] for m in c['duplicates']],
+                'rules': c['rules'],
+                'labels': {str(m[0]): m[2] for m in [c['survivor']] + c['duplicates']},
+            }, default=str) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find and remove duplicate LIMS records with hash blocking.')
+    parser.add_argument('table', choices=sorted(TABLES))
+    parser.add_argument('--rules', help='comma-separated blocking rules (default: all for the table)')
+    parser.add_argument('--apply', action='store_true', help='delete duplicates after reporting them')
+    parser.add_argument('--merge', action='store_true', help='with --apply, fill empty survivor fields first')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='rows per keyset page')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='clusters per transaction')
+    parser.add_argument('--report', help='write every cluster as JSON lines to this file')
+    args = parser.parse_args(argv)
+
+    spec = TABLES[args.table]
+    rules = spec['rules']
+    if args.rules:
+        names = [r.strip() for r in args.rules.split(',') if r.strip()]
+        unknown = [r for r in names if r not in rules]
+        if unknown:
+            parser.error(f"unknown rule(s) for {args.table}: {', '.join(unknown)}. Available: {', '.join(rules)}")
+        rules = {r: rules[r] for r in names}
+    if args.merge and not args.apply:
+        parser.error('--merge only makes sense with --apply')
+
+    available = schema_index.table_columns(schema_index.load_index(), args.table)
+    columns = [spec['pk']] + spec['recency'] + spec['label'] + [c for cols in rules.values() for c in cols]
+    columns = [c for c in dict.fromkeys(columns) if c in available]
+
+    started = time.perf_counter()
+    pool = get_pool()
+    with pool.connection() as conn:
+        rows = stream_rows(conn, pool.placeholder, args.table, columns, spec['pk'], args.page_size)
+        clusters, total = find_clusters(rows, spec, rules)
+        print_clusters(args.table, clusters, total, list(rules))
+        if args.report:
+            write_report(args.report, clusters)
+        if args.apply and clusters:
+            deleted, merged = apply_clusters(conn, pool, args.table, spec, clusters, args.merge, args.batch_size)
+            print(f"\nDeleted {deleted} duplicate row(s); merged {merged} field(s) into survivors.")
+        elif clusters:
+            print("\nNothing changed. Re-run with --apply to delete duplicates.")
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,448 @@
+# LeadLab LIMS - Sortable table header generator
+#
+# Replaces the old generate_header*.py paste-and-run scripts. Instead of
+# rewriting a pasted TSX literal one line at a time, this reads the real page
+# components from client/src and rewrites every `isColumnVisible('key')`
+# header (both <TableHead> and <th>) in a single pass per file.
+#
+# Column keys, labels and widths come from the parsed schema index (see
+# schema_index.py). Header keys that do not exist in the page's table are
+# reported as schema drift at generation time.
+#
+# Usage:
+#   python header_codegen.py                 # all pages
+#   python header_codegen.py finance report  # selected pages
+#   python header_codegen.py --check         # exit 1 if anything would change
+#   python header_codegen.py --force         # ignore the hash cache
+#   python header_codegen.py --strict        # exit 1 on schema drift
+#   python header_codegen.py --emit finance  # print a header block from the schema
+#   python header_codegen.py --sort-artifacts
+#                                            # rewrite the sort whitelist + index migration
+#
+# Besides the page headers, the generator keeps two artifacts in step with the
+# schema so that sorting and paging can happen in MySQL instead of the
+# browser:
+#   shared/sortWhitelist.ts                       sortKey -> SQL column + index hint
+#   database/migrations/0028_add_sort_indexes.sql indexes for sortable date/status columns
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import schema_index
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(ROOT_DIR, '.header_codegen_cache.json')
+
+# Page name -> component path (relative to the repo root), backing table,
+# column preferences variable, header tag and header class template
+PAGES = {
+    'finance': {
+        'path': 'client/src/pages/FinanceManagement.tsx',
+        'table': 'finance_sheet',
+        'prefs': 'financeColumnPrefs',
+        'tag': 'TableHead',
+        'class': 'min-w-[{width}px] whitespace-nowrap font-semibold',
+    },
+    'bioinformatics': {
+        'path': 'client/src/pages/Bioinformatics.tsx',
+        'table': 'bioinformatics_sheet_clinical',
+        'prefs': 'columnPrefs',
+        'tag': 'TableHead',
+        'class': 'min-w-[{width}px] whitespace-nowrap font-semibold',
+    },
+    'nutrition': {
+        'path': 'client/src/pages/Nutrition.tsx',
+        'table': 'nutritional_management',
+        'prefs': 'nutritionColumnPrefs',
+        'tag': 'th',
+        'class': 'min-w-[{width}px] px-4 py-1 text-left whitespace-nowrap font-semibold',
+    },
+    'process_master': {
+        'path': 'client/src/pages/ProcessMaster.tsx',
+        'table': 'process_master_sheet',
+        'prefs': 'processMasterColumnPrefs',
+        'tag': 'TableHead',
+        'class': 'min-w-[{width}px] whitespace-nowrap py-1',
+    },
+    'report': {
+        'path': 'client/src/pages/ReportManagement.tsx',
+        'table': 'report_management',
+        'prefs': 'reportColumnPrefs',
+        'tag': 'TableHead',
+        'class': 'min-w-[{width}px] whitespace-nowrap font-semibold py-1',
+    },
+}
+
+# Surrogate keys that are never shown as a column
+HIDDEN_COLUMNS = {'id'}
+
+SORT_WHITELIST_FILE = os.path.join(ROOT_DIR, 'shared', 'sortWhitelist.ts')
+SORT_INDEX_MIGRATION = os.path.join(ROOT_DIR, 'database', 'migrations', '0028_add_sort_indexes.sql')
+
+# Columns a list endpoint shows COALESCEd from the other sheets
+# (GET /api/process-master). They sort on the shown value, which no index on
+# the raw column can serve, so they get no sort index.
+DERIVED_SORT_COLUMNS = {
+    'process_master_sheet': {
+        'client_id', 'organisation_hospital', 'clinician_researcher_name', 'clinician_researcher_phone',
+        'patient_client_name', 'patient_client_phone', 'sample_collection_date', 'sample_recevied_date',
+        'service_name', 'sample_type', 'no_of_samples', 'sales_responsible_person', 'progenics_trf',
+        'third_party_trf', 'sample_sent_to_third_party_date', 'third_party_name', 'third_party_report',
+        'finance_status', 'lab_process_status', 'bioinformatics_status', 'nutritional_management_status',
+    },
+}
+
+# Column types that are never sorted server-side (no useful order, no index)
+UNSORTABLE_TYPES = {'TEXT', 'MEDIUMTEXT', 'LONGTEXT', 'BLOB', 'JSON'}
+
+# Default order of each list endpoint (matches the pages' initial sortKey)
+DEFAULT_SORT = ('createdAt', 'desc')
+
+# Columns that never get a sort handler
+UNSORTABLE_KEYS = {'actions'}
+
+# One pattern for both header flavours. Headers that already carry an onClick
+# do not match because the tag must be followed directly by className.
+HEADER_KEY_RE = re.compile(r"""isColumnVisible\('([^']+)'\)\s*&&\s*<(?:TableHead|th)\b""")
+HEADER_RE = re.compile(
+    r"""(?P<prefix>isColumnVisible\('(?P<key>[^']+)'\)\s*&&\s*)"""
+    r"""<(?P<tag>TableHead|th) className="(?P<cls>[^"]*)">"""
+    r"""(?P<label>[^<{]*)</(?P=tag)>"""
+)
+
+
+def render_header(tag, key, cls, label):
+    """Return the sortable JSX for one header cell."""
+    on_click = f"onClick={{() => {{ setSortKey('{key}'); setSortDir(s => s === 'asc' ? 'desc' : 'asc'); }}}}"
+    indicator = f"{{sortKey === '{key}' ? (sortDir === 'asc' ? ' ▲' : ' ▼') : ''}}"
+    return f'<{tag} {on_click} className="cursor-pointer {cls}">{label}{indicator}</{tag}>'
+
+
+def rewrite_source(source):
+    """Rewrite all plain headers in `source`. Returns (new_source, count)."""
+    count = 0
+
+    def replace(match):
+        nonlocal count
+        key = match.group('key')
+        if key in UNSORTABLE_KEYS:
+            return match.group(0)
+        count += 1
+        return match.group('prefix') + render_header(
+            match.group('tag'), key, match.group('cls'), match.group('label')
+        )
+
+    return HEADER_RE.sub(replace, source), count
+
+
+def emit_header_block(page, index):
+    """Build the sortable header block for `page` from the schema index."""
+    config = PAGES[page]
+    lines = []
+    for name, col in schema_index.table_columns(index, config['table']).items():
+        if name in HIDDEN_COLUMNS:
+            continue
+        cls = config['class'].format(width=col['width'])
+        header = render_header(config['tag'], col['key'], cls, col['label'])
+        lines.append(f"{{{config['prefs']}.isColumnVisible('{col['key']}') && {header}}}")
+    return '\n'.join(lines)
+
+
+def page_drift(page, source, index):
+    """Return header keys in `source` that the page's table does not define."""
+    known = {col['key'] for col in schema_index.table_columns(index, PAGES[page]['table']).values()}
+    return [
+        key for key in HEADER_KEY_RE.findall(source)
+        if key not in known and key not in UNSORTABLE_KEYS
+    ]
+
+
+def _is_sort_index_candidate(name, col_type):
+    """Only dates and workflow statuses get a dedicated sort index.
+
+    Every other whitelisted column still sorts in MySQL, just via filesort; one
+    index per column on ~40-column sheets would cost more on writes than it
+    saves on reads.
+    """
+    base = col_type.split('(')[0].split()[0]
+    return base in ('DATE', 'DATETIME', 'TIMESTAMP') or name.lower().endswith('_status')
+
+
+def build_sort_whitelist(index):
+    """Return ({table: {key: {column, index[, derived]}}}, {table: tiebreaker}, [(table, index, column)])."""
+    whitelist, tiebreakers, new_indexes = {}, {}, []
+    for table in sorted({config['table'] for config in PAGES.values()}):
+        info = index['tables'][table]
+        leading = {}
+        for index_name, idx in info['indexes'].items():
+            leading.setdefault(idx['columns'][0], index_name)
+        for pk_col in info['primary_key'][:1]:
+            leading.setdefault(pk_col, 'PRIMARY')
+
+        entries = {}
+        for name, col in info['columns'].items():
+            col_type = col['type']
+            if col_type.split('(')[0].split()[0] in UNSORTABLE_TYPES:
+                continue
+            if name in DERIVED_SORT_COLUMNS.get(table, ()):
+                entries[col['key']] = {'column': name, 'index': None, 'derived': True}
+                continue
+            hint = leading.get(name)
+            if hint is None and _is_sort_index_candidate(name, col_type):
+                hint = f'idx_sort_{name.lower()}'[:64]
+                new_indexes.append((table, hint, name))
+            entries[col['key']] = {'column': name, 'index': hint}
+        whitelist[table] = entries
+        tiebreakers[table] = info['primary_key'][0]
+    return whitelist, tiebreakers, new_indexes
+
+
+def render_sort_whitelist_ts(whitelist, tiebreakers):
+    lines = [
+        '// AUTO-GENERATED by header_codegen.py from database_schema.sql. Do not edit by hand.',
+        '//',
+        '// Server-side sort whitelist: maps the sortKey sent by a page header to the',
+        '// SQL column it orders by, plus the index MySQL can use for that order.',
+        '// Only keys listed here are accepted in ORDER BY.',
+        '',
+        'export interface SortColumn {',
+        '  column: string;',
+        '  index: string | null;',
+        '  // Shown COALESCEd from other sheets; sorted on that value, not the raw column',
+        '  derived?: boolean;',
+        '}',
+        '',
+        'export interface SortTable {',
+        '  tiebreaker: string;',
+        '  columns: Record<string, SortColumn>;',
+        '}',
+        '',
+        '// Query parameters understood by keyset-paginated list endpoints',
+        "export const SORT_QUERY_PARAMS = ['sortKey', 'sortDir', 'cursor', 'limit'] as const;",
+        '',
+        f"export const DEFAULT_SORT = {{ sortKey: '{DEFAULT_SORT[0]}', sortDir: '{DEFAULT_SORT[1]}' }} as const;",
+        '',
+        'export const SORT_WHITELIST: Record<string, SortTable> = {',
+    ]
+    for table, entries in whitelist.items():
+        lines.append(f'  {table}: {{')
+        lines.append(f"    tiebreaker: '{tiebreakers[table]}',")
+        lines.append('    columns: {')
+        for key, entry in entries.items():
+            index_hint = f"'{entry['index']}'" if entry['index'] else 'null'
+            derived = ', derived: true' if entry.get('derived') else ''
+            lines.append(f"      {key}: {{ column: '{entry['column']}', index: {index_hint}{derived} }},")
+        lines.append('    },')
+        lines.append('  },')
+    lines.append('};')
+    return '\n'.join(lines) + '\n'
+
+
+def render_sort_index_migration(new_indexes):
+    lines = [
+        '-- Migration: Add indexes for server-side sorting and keyset pagination',
+        '-- File: 0028_add_sort_indexes.sql',
+        '-- AUTO-GENERATED by header_codegen.py from database_schema.sql. Do not edit by hand.',
+        '--',
+        '-- InnoDB secondary indexes already carry the primary key, so a single-column',
+        '-- index serves ORDER BY <column>, id and the matching keyset WHERE clause.',
+    ]
+    current = None
+    for table, index_name, column in new_indexes:
+        if table != current:
+            lines.extend(['', f'-- {table}'])
+            current = table
+        lines.append(f'CREATE INDEX {index_name} ON {table}({column});')
+    return '\n'.join(lines) + '\n'
+
+
+def write_sort_artifacts(index, write=True):
+    """Regenerate the sort whitelist and index migration. Returns changed paths."""
+    whitelist, tiebreakers, new_indexes = build_sort_whitelist(index)
+    outputs = {
+        SORT_WHITELIST_FILE: render_sort_whitelist_ts(whitelist, tiebreakers),
+        SORT_INDEX_MIGRATION: render_sort_index_migration(new_indexes),
+    }
+    changed = []
+    for path, text in outputs.items():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == text:
+                    continue
+        except OSError:
+            pass
+        changed.append(os.path.relpath(path, ROOT_DIR))
+        if write:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+    return changed
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def process_page(page, index, write=True):
+    """Rewrite one page on disk. Returns (path, rewritten_count, new_hash, drift)."""
+    path = os.path.join(ROOT_DIR, PAGES[page]['path'])
+    with open(path, 'rb') as f:
+        raw = f.read()
+    source = raw.decode('utf-8')
+    drift = page_drift(page, source, index)
+    new_source, count = rewrite_source(source)
+    # The cache stores the hash of what is on disk after this run
+    new_raw = new_source.encode('utf-8')
+    if count:
+        if not write:
+            return path, count, content_hash(raw), drift
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(new_raw)
+        os.replace(tmp_path, path)
+        return path, count, content_hash(new_raw), drift
+    return path, 0, content_hash(raw), drift
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    tmp_path = CACHE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def stale_pages(pages, cache):
+    """Return the subset of `pages` whose content hash differs from the cache."""
+    stale = []
+    for page in pages:
+        with open(os.path.join(ROOT_DIR, PAGES[page]['path']), 'rb') as f:
+            digest = content_hash(f.read())
+        if cache.get(PAGES[page]['path'], {}).get('hash') != digest:
+            stale.append(page)
+    return stale
+
+
+def _check_pages(names):
+    unknown = [n for n in names if n not in PAGES]
+    if unknown:
+        raise ValueError(f"Unknown page(s): {', '.join(unknown)}. Choose from: {', '.join(PAGES)}")
+
+
+def run(page_names=None, force=False, check=False, jobs=None):
+    """Regenerate headers for the given pages.
+
+    Returns ({page_path: count}, {page_path: [drifted keys]}, [changed artifact paths]).
+    """
+    names = page_names or list(PAGES)
+    _check_pages(names)
+
+    index = schema_index.load_index()
+    cache = load_cache()
+    # A schema change re-checks every page for drift and refreshes the
+    # sort whitelist / index migration
+    artifacts = []
+    if force or cache.get('_schema') != index['sources']:
+        artifacts = write_sort_artifacts(index, write=not check)
+        # In --check mode pending artifacts must be reported again next time
+        cache = {'_schema': None if check and artifacts else index['sources']}
+    todo = stale_pages(names, cache)
+    drift = {
+        PAGES[n]['path']: cache[PAGES[n]['path']]['drift']
+        for n in names
+        if n not in todo and cache[PAGES[n]['path']]['drift']
+    }
+    results = {}
+    if not todo:
+        save_cache(cache)
+        return results, drift, artifacts
+
+    write = not check
+    if len(todo) == 1:
+        outcomes = [process_page(todo[0], index, write)]
+    else:
+        n = len(todo)
+        with ProcessPoolExecutor(max_workers=jobs or min(n, os.cpu_count() or 1)) as pool:
+            outcomes = list(pool.map(process_page, todo, [index] * n, [write] * n))
+
+    for path, count, digest, page_drift_keys in outcomes:
+        rel = os.path.relpath(path, ROOT_DIR)
+        results[rel] = count
+        if page_drift_keys:
+            drift[rel] = page_drift_keys
+        # Only remember pages that are fully generated, so --check keeps
+        # reporting pending pages until they are actually written
+        if write or count == 0:
+            cache[rel] = {'hash': digest, 'drift': page_drift_keys}
+    save_cache(cache)
+    return results, drift, artifacts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate sortable table headers in the LIMS page components.')
+    parser.add_argument('pages', nargs='*', help=f"pages to process (default: all of {', '.join(PAGES)})")
+    parser.add_argument('--force', action='store_true', help='ignore the content hash cache')
+    parser.add_argument('--check', action='store_true', help='report pending rewrites without writing; exit 1 if any')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per stale page)')
+    parser.add_argument('--strict', action='store_true', help='exit 1 if a page uses keys missing from its table')
+    parser.add_argument('--emit', metavar='PAGE', help='print the schema-driven header block for PAGE and exit')
+    parser.add_argument('--sort-artifacts', action='store_true',
+                        help='regenerate the sort whitelist and sort index migration and exit')
+    args = parser.parse_args(argv)
+
+    if args.sort_artifacts:
+        changed = write_sort_artifacts(schema_index.load_index(), write=not args.check)
+        for rel in changed:
+            print(f"{rel}: {'would update' if args.check else 'updated'}")
+        if not changed:
+            print('Sort artifacts up to date')
+        return 1 if args.check and changed else 0
+
+    if args.emit:
+        try:
+            _check_pages([args.emit])
+        except ValueError as e:
+            parser.error(str(e))
+        print(emit_header_block(args.emit, schema_index.load_index()))
+        return 0
+
+    started = time.perf_counter()
+    try:
+        results, drift, artifacts = run(args.pages, force=args.force, check=args.check, jobs=args.jobs)
+    except ValueError as e:
+        parser.error(str(e))
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for rel, keys in sorted(drift.items()):
+        print(f"Schema drift in {rel}: not in table: {', '.join(keys)}", file=sys.stderr)
+    for rel in artifacts:
+        print(f"{rel}: {'would update' if args.check else 'updated'}")
+    if not results and not artifacts:
+        print(f"No changes ({elapsed_ms:.0f}ms)")
+        return 1 if args.strict and drift else 0
+
+    pending = 0
+    for rel, count in sorted(results.items()):
+        verb = 'would rewrite' if args.check else 'rewrote'
+        print(f"{rel}: {verb} {count} header(s)" if count else f"{rel}: up to date")
+        pending += count
+    print(f"Done in {elapsed_ms:.0f}ms")
+    if args.strict and drift:
+        return 1
+    return 1 if args.check and (pending or artifacts) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
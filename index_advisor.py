@@ -0,0 +1,771 @@
+# LeadLab LIMS - Query-aware index advisor
+#
+# Proposes indexes from the queries the server actually runs:
+#
+#   1. Existing indexes come from database_schema.sql (via schema_index.py),
+#      the CREATE TABLE / CREATE INDEX statements in database/migrations/ and
+#      drizzle primaryKey()/unique() columns in shared/schema.ts.
+#   2. SQL string literals in the server sources (server/routes.ts,
+#      server/storage.ts, server/modules/) and drizzle .where()/.orderBy()
+#      chains are parsed for WHERE / JOIN ... ON / ORDER BY columns.
+#   3. Every query is weighted by the server.log hit count of the routes that
+#      run it (directly, or through the storage.* method it lives in).
+#   4. Candidate indexes (equality columns, then one range or the ORDER BY
+#      columns) not already served by an existing index prefix are ranked by
+#      total weight.
+#
+# The bench subcommand loads synthetic rows into a scratch MySQL database and
+# compares EXPLAIN plans and timings for each candidate before and after
+# creating it.
+#
+# Usage:
+#   python index_advisor.py                       # ranked candidates
+#   python index_advisor.py --show-queries        # with the queries behind each one
+#   python index_advisor.py --emit                # write database/migrations/00NN_add_advised_indexes.sql
+#   python index_advisor.py --limit 10 bench --database lims_bench --rows 200000
+
+import argparse
+import datetime
+import glob
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+
+import schema_index
+from log_analyzer import DEFAULT_LOG, scan
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(ROOT_DIR, 'database', 'migrations')
+SOURCE_PATTERNS = ['server/routes.ts', 'server/storage.ts', 'server/modules/**/*.ts']
+STORAGE_FILE = 'server/storage.ts'
+
+MAX_INDEX_COLUMNS = 4
+EXPR = '__expr__'
+
+ROUTE_RE = re.compile(r'app\.(get|post|put|patch|delete)\(\s*[\'"`]([^\'"`]+)[\'"`]')
+STORAGE_METHOD_RE = re.compile(r'^\s+async (\w+)\(', re.M)
+STORAGE_CALL_RE = re.compile(r'storage\.(\w+)\(')
+SQL_START_RE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.I)
+TABLE_REF_RE = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:WHERE|LEFT|RIGHT|INNER|OUTER|CROSS|JOIN|ON|SET|ORDER|'
+    r'GROUP|LIMIT|HAVING|UNION|USING|FOR)\b)(\w+))?', re.I
+)
+CLAUSE_END_RE = re.compile(r'\b(ORDER\s+BY|GROUP\s+BY|LIMIT|HAVING|UNION|WHERE|LEFT|RIGHT|INNER|JOIN|SET)\b', re.I)
+PREDICATE_RE = re.compile(
+    r'(?:\b(\w+)\.)?\b(\w+)\s*(<=>|<>|!=|<=|>=|=|<|>|\bNOT\s+IN\b|\bIN\b|\bNOT\s+LIKE\b|\bLIKE\b|\bIS\s+NOT\b|\bIS\b|\bBETWEEN\b)'
+    r'\s*(?:(\w+)\.(\w+)\b)?', re.I
+)
+ORDER_ITEM_RE = re.compile(r'^(?:(\w+)\.)?(\w+)(?:\s+(?:ASC|DESC))?$', re.I)
+DRIZZLE_IMPORT_RE = re.compile(r'import\s*\{([^}]*)\}\s*from\s*["\']@shared/schema["\']', re.S)
+DRIZZLE_OP_RE = re.compile(r'\b(eq|ne|gt|gte|lt|lte|like|ilike|inArray|isNull|between)\(\s*(\w+)\.(\w+)')
+DRIZZLE_ORDER_RE = re.compile(r'(?:\b(?:asc|desc)\(\s*)?\b(\w+)\.(\w+)')
+
+EQ_OPS = {'=', '<=>', 'IN', 'IS'}
+RANGE_OPS = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE'}
+DRIZZLE_EQ = {'eq', 'inArray', 'isNull'}
+DRIZZLE_RANGE = {'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'between'}
+
+
+# -- schema --------------------------------------------------------------------
+
+def _drizzle_tables():
+    """Columns and key columns of every table in shared/schema.ts."""
+    with open(schema_index.DRIZZLE_SCHEMA, 'r', encoding='utf-8') as f:
+        text = f.read()
+    tables, variables = {}, {}
+    for match in re.finditer(r'export const (\w+)\s*=\s*mysqlTable\(\s*["\'](\w+)["\']\s*,\s*\{', text):
+        body, _ = schema_index._balanced_body(text, match.end(), '{', '}')
+        columns, keys, unique = {}, [], []
+        for line in body.splitlines():
+            col = schema_index.DRIZZLE_COLUMN_RE.match(line)
+            if not col:
+                continue
+            columns[col.group(1)] = col.group(2)
+            if '.primaryKey()' in line:
+                keys.append(col.group(2))
+            if '.unique()' in line:
+                unique.append(col.group(2))
+        variables[match.group(1)] = match.group(2)
+        tables[match.group(2)] = {'props': columns, 'primary_key': keys, 'unique': unique}
+    return tables, variables
+
+
+def _add_keys(entry, info):
+    for idx in info['indexes'].values():
+        entry['indexes'].append(list(idx['columns']))
+        if idx['unique']:
+            entry['unique'].append(list(idx['columns']))
+    if info['primary_key'] and not entry['primary_key']:
+        entry['primary_key'] = list(info['primary_key'])
+        entry['indexes'].append(list(info['primary_key']))
+        entry['unique'].append(list(info['primary_key']))
+
+
+def load_schema():
+    """Return {table: {'columns', 'indexes', 'unique', 'primary_key', 'props', 'ddl'}}.
+
+    'ddl' names the SQL file whose CREATE TABLE the bench can replay (None for
+    tables only known from shared/schema.ts).
+    """
+    index = schema_index.load_index()
+    drizzle, variables = _drizzle_tables()
+    schema = {}
+    for table, info in index['tables'].items():
+        entry = {'columns': set(info['columns']), 'indexes': [], 'unique': [], 'primary_key': [],
+                 'props': drizzle.get(table, {}).get('props', {}), 'ddl': schema_index.SQL_SCHEMA}
+        _add_keys(entry, info)
+        schema[table] = entry
+    for table, info in drizzle.items():
+        if table in schema:
+            continue
+        schema[table] = {'columns': set(info['props'].values()), 'indexes': [[c] for c in info['unique']],
+                         'unique': [[c] for c in info['unique']], 'primary_key': info['primary_key'],
+                         'props': info['props'], 'ddl': None}
+        if info['primary_key']:
+            schema[table]['indexes'].append(info['primary_key'])
+            schema[table]['unique'].append(info['primary_key'])
+    # Migrations add indexes; table dumps there also record keys of drizzle-only tables
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        parsed = schema_index.parse_sql_schema(text)
+        for table, info in parsed.items():
+            if table not in schema:
+                continue
+            _add_keys(schema[table], info)
+            if schema[table]['ddl'] is None and info['columns']:
+                schema[table]['ddl'] = path
+        for unique, _, table, cols in schema_index.CREATE_INDEX_RE.findall(schema_index._strip_sql_comments(text)):
+            if table in schema and table not in parsed:
+                _add_keys(schema[table], {'indexes': {'': {'columns': schema_index._column_list(cols),
+                                                           'unique': bool(unique)}},
+                                          'primary_key': []})
+    return schema, variables
+
+
+def covered(schema, table, columns, eq_columns=()):
+    """True if an existing index already serves `columns`.
+
+    InnoDB secondary indexes carry the primary key after their own columns, and
+    equality on every column of a unique index already pins a single row.
+    """
+    info = schema[table]
+    for idx in info['indexes']:
+        effective = idx + [c for c in info['primary_key'] if c not in idx]
+        if effective[:len(columns)] == columns:
+            return True
+        if idx in info['unique'] and set(idx) <= set(eq_columns):
+            return True
+    return False
+
+
+# -- source scanning -------------------------------------------------------------
+
+def _skip_quoted(text, i, quote):
+    n = len(text)
+    i += 1
+    while i < n and text[i] != quote and text[i] != '\n':
+        i += 2 if text[i] == '\\' else 1
+    return i + 1
+
+
+def _read_template(text, i):
+    """Read a template literal body starting after the backtick; ${...} become EXPR."""
+    parts, n = [], len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '\\':
+            parts.append(text[i:i + 2])
+            i += 2
+        elif ch == '`':
+            return ''.join(parts), i + 1
+        elif text.startswith('${', i):
+            depth, j = 1, i + 2
+            while j < n and depth:
+                c = text[j]
+                if c == '`':
+                    _, j = _read_template(text, j + 1)
+                    continue
+                if c in '\'"':
+                    j = _skip_quoted(text, j, c)
+                    continue
+                depth += (c == '{') - (c == '}')
+                j += 1
+            parts.append(f' {EXPR} ')
+            i = j
+        else:
+            parts.append(ch)
+            i += 1
+    return ''.join(parts), n
+
+
+def iter_string_literals(text):
+    """Yield (offset, content) for every top-level string/template literal."""
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if text.startswith('//', i):
+            nl = text.find('\n', i)
+            i = n if nl == -1 else nl
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif ch in '\'"':
+            end = _skip_quoted(text, i, ch)
+            yield i, text[i + 1:end - 1]
+            i = end
+        elif ch == '`':
+            content, end = _read_template(text, i + 1)
+            yield i, content
+            i = end
+        else:
+            i += 1
+
+
+def _segment(sql, start):
+    """Text from `start` to the next top-level clause keyword or closing paren."""
+    depth, i, n = 0, start, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            if depth == 0:
+                break
+            depth -= 1
+        elif depth == 0 and ch.isalpha() and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] == '_')):
+            if CLAUSE_END_RE.match(sql, i):
+                break
+        i += 1
+    return sql[start:i]
+
+
+def _unwrap(segment):
+    """Drop parentheses that wrap the whole segment: '((a OR b))' -> 'a OR b'."""
+    segment = segment.strip()
+    while segment.startswith('(') and segment.endswith(')'):
+        body, end = schema_index._balanced_body(segment, 1)
+        if end != len(segment):
+            break
+        segment = body.strip()
+    return segment
+
+
+def _has_top_level_or(segment):
+    depth = 0
+    segment = _unwrap(segment)
+    for m in re.finditer(r'\(|\)|\bOR\b', segment, re.I):
+        token = m.group(0)
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            return True
+    return False
+
+
+def _new_usage():
+    return {'eq': [], 'range': [], 'order': [], 'join': [], 'or': False}
+
+
+def _add(usage, kind, column):
+    if column not in usage[kind]:
+        usage[kind].append(column)
+
+
+def analyze_sql(sql, schema):
+    """Return {table: usage} for one SQL statement."""
+    sql = re.sub(r'\s+', ' ', sql.replace('`', ''))
+    sql = re.sub(r'\s+COLLATE\s+\w+', '', sql, flags=re.I)
+    aliases, order = {}, []
+    for m in TABLE_REF_RE.finditer(sql):
+        table = m.group(1)
+        if table not in schema:
+            continue
+        aliases[table] = table
+        if m.group(2):
+            aliases[m.group(2)] = table
+        if table not in order:
+            order.append(table)
+    if not order:
+        return {}
+
+    def resolve(alias, column):
+        if alias:
+            table = aliases.get(alias)
+            return (table, column) if table and column in schema[table]['columns'] else None
+        for table in order:
+            if column in schema[table]['columns']:
+                return table, column
+        return None
+
+    usages = {}
+    for m in re.finditer(r'\b(WHERE|ON)\b', sql, re.I):
+        segment = _segment(sql, m.end())
+        is_or = _has_top_level_or(segment)
+        for p in PREDICATE_RE.finditer(segment):
+            left = resolve(p.group(1), p.group(2))
+            op = ' '.join(p.group(3).upper().split())
+            right = resolve(p.group(4), p.group(5)) if p.group(5) else None
+            if not left or op not in EQ_OPS | RANGE_OPS:
+                continue
+            if right and op == '=':
+                for table, column in (left, right):
+                    _add(usages.setdefault(table, _new_usage()), 'join', column)
+                continue
+            usage = usages.setdefault(left[0], _new_usage())
+            usage['or'] = usage['or'] or is_or
+            _add(usage, 'eq' if op in EQ_OPS else 'range', left[1])
+    for m in re.finditer(r'\bORDER\s+BY\b', sql, re.I):
+        items = [s.strip() for s in _segment(sql, m.end()).split(',')]
+        resolved = [ORDER_ITEM_RE.match(item) for item in items]
+        if not all(resolved):
+            continue  # expressions: an index cannot serve the sort
+        for r in resolved:
+            hit = resolve(r.group(1), r.group(2))
+            if hit:
+                _add(usages.setdefault(hit[0], _new_usage()), 'order', hit[1])
+    return usages
+
+
+def analyze_drizzle(text, schema, variables):
+    """Yield (offset, {table: usage}) for drizzle .where()/.orderBy() chains."""
+    aliases = dict(variables)
+    for block in DRIZZLE_IMPORT_RE.finditer(text):
+        for name in block.group(1).split(','):
+            parts = name.split(' as ')
+            if len(parts) == 2 and parts[0].strip() in variables:
+                aliases[parts[1].strip()] = variables[parts[0].strip()]
+
+    def column_of(var, prop):
+        table = aliases.get(var)
+        if not table or table not in schema:
+            return None
+        column = schema[table]['props'].get(prop)
+        return (table, column) if column else None
+
+    for m in re.finditer(r'\.where\(', text):
+        args, end = schema_index._balanced_body(text, m.end())
+        usages = {}
+        is_or = bool(re.search(r'\bor\(', args))
+        for op, var, prop in DRIZZLE_OP_RE.findall(args):
+            hit = column_of(var, prop)
+            if not hit or op not in DRIZZLE_EQ | DRIZZLE_RANGE:
+                continue
+            usage = usages.setdefault(hit[0], _new_usage())
+            usage['or'] = usage['or'] or is_or
+            _add(usage, 'eq' if op in DRIZZLE_EQ else 'range', hit[1])
+        stmt_end = text.find(';', end)
+        rest = text[end:stmt_end if stmt_end != -1 else len(text)]
+        order = re.search(r'\.orderBy\(', rest)
+        if order:
+            order_args, _ = schema_index._balanced_body(rest, order.end())
+            for var, prop in DRIZZLE_ORDER_RE.findall(order_args):
+                hit = column_of(var, prop)
+                if hit:
+                    _add(usages.setdefault(hit[0], _new_usage()), 'order', hit[1])
+        if usages:
+            yield m.start(), usages
+
+
+def _line_of(text, offset):
+    return text.count('\n', 0, offset) + 1
+
+
+def collect_queries(schema, variables, patterns=SOURCE_PATTERNS):
+    """Every query found in the sources, with the route or storage method it runs under."""
+    queries, route_calls = [], []
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, pattern), recursive=True)):
+            rel = os.path.relpath(path, ROOT_DIR)
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            routes = [(m.start(), f"{m.group(1).upper()} {m.group(2)}") for m in ROUTE_RE.finditer(text)]
+            methods = [(m.start(), m.group(1)) for m in STORAGE_METHOD_RE.finditer(text)] if rel == STORAGE_FILE else []
+
+            def owner(offset):
+                route = next((r for pos, r in reversed(routes) if pos < offset), None)
+                method = next((name for pos, name in reversed(methods) if pos < offset), None)
+                return route, method
+
+            for offset, content in iter_string_literals(text):
+                if not SQL_START_RE.match(content):
+                    continue
+                usages = analyze_sql(content, schema)
+                if usages:
+                    route, method = owner(offset)
+                    queries.append({'file': rel, 'line': _line_of(text, offset), 'route': route,
+                                    'method': method, 'usages': usages,
+                                    'sql': ' '.join(content.split())[:160]})
+            for offset, usages in analyze_drizzle(text, schema, variables):
+                route, method = owner(offset)
+                snippet = ' '.join(text[offset:text.find(';', offset)].split())[:160]
+                queries.append({'file': rel, 'line': _line_of(text, offset), 'route': route,
+                                'method': method, 'usages': usages, 'sql': snippet})
+            for m in STORAGE_CALL_RE.finditer(text):
+                route, _ = owner(m.start())
+                if route:
+                    route_calls.append((route, m.group(1)))
+    return queries, route_calls
+
+
+# -- weighting -------------------------------------------------------------------
+
+def _route_matches(express_route, log_route):
+    method, path = express_route.split(' ', 1)
+    log_method, log_path = log_route.split(' ', 1)
+    if method != log_method:
+        return False
+    a, b = path.rstrip('/').split('/'), log_path.rstrip('/').split('/')
+    return len(a) == len(b) and all(x == y or x.startswith(':') for x, y in zip(a, b))
+
+
+def route_hits(log_path):
+    """{'GET /api/users/:id': hits} from the server log (empty if missing)."""
+    if not log_path or not os.path.exists(log_path):
+        return {}
+    cumulative, _, _, _ = scan(log_path, None)
+    return {route: stats.count for route, stats in cumulative.routes.items()}
+
+
+def weigh(queries, route_calls, hits):
+    """Set query['weight'] = 1 + log hits of every route that runs it."""
+    express_hits = {}
+
+    def hits_for(route):
+        if route not in express_hits:
+            express_hits[route] = sum(n for log_route, n in hits.items() if _route_matches(route, log_route))
+        return express_hits[route]
+
+    method_routes = {}
+    for route, method in route_calls:
+        method_routes.setdefault(method, set()).add(route)
+    for q in queries:
+        routes = set()
+        if q['file'] == STORAGE_FILE and q['method']:
+            routes = method_routes.get(q['method'], set())
+        elif q['route']:
+            routes = {q['route']}
+        q['routes'] = sorted(routes)
+        q['weight'] = 1 + sum(hits_for(r) for r in routes)
+
+
+# -- candidates ------------------------------------------------------------------
+
+def _probe(eq=(), range_=(), order=()):
+    return {'columns': list(eq) + list(range_) + list(order), 'eq': list(eq),
+            'range': list(range_), 'order': list(order)}
+
+
+def candidate_columns(usage):
+    """Index probes one table usage would benefit from.
+
+    A probe lists the equality columns, then at most one range column or the
+    ORDER BY columns; bench replays the same shape.
+    """
+    if usage['or']:
+        return [_probe(eq=[c]) for c in usage['eq']] + [_probe(range_=[c]) for c in usage['range']] \
+            + [_probe(eq=[c]) for c in usage['join']]
+    found = []
+    eq = usage['eq'][:MAX_INDEX_COLUMNS - 1]
+    if usage['range']:
+        found.append(_probe(eq, usage['range'][:1]))
+    elif usage['eq'] or usage['order']:
+        order = [c for c in usage['order'] if c not in eq][:MAX_INDEX_COLUMNS - len(eq)]
+        found.append(_probe(eq, order=order))
+    found += [_probe(eq=[c]) for c in usage['join']]
+    return found
+
+
+def rank_candidates(queries, schema):
+    """Aggregate candidates over all queries, dropping ones existing indexes serve."""
+    candidates = {}
+    for q in queries:
+        for table, usage in q['usages'].items():
+            for probe in candidate_columns(usage):
+                cols = probe['columns']
+                if covered(schema, table, cols, usage['eq']):
+                    continue
+                c = candidates.setdefault((table, tuple(cols)), dict(probe, table=table, score=0, queries=[]))
+                c['score'] += q['weight']
+                c['queries'].append(q)
+    # A candidate that is a prefix of a wider one is served by it
+    ranked = sorted(candidates.values(), key=lambda c: -len(c['columns']))
+    kept = []
+    for c in ranked:
+        wider = next((k for k in kept if k['table'] == c['table']
+                      and k['columns'][:len(c['columns'])] == c['columns']), None)
+        if wider:
+            wider['score'] += c['score']
+            wider['queries'] += c['queries']
+        else:
+            kept.append(c)
+    for c in kept:
+        c['routes'] = sorted({r for q in c['queries'] for r in q['routes']})
+    return sorted(kept, key=lambda c: (-c['score'], c['table'], c['columns']))
+
+
+def index_name(columns):
+    return ('idx_adv_' + '_'.join(columns))[:64]
+
+
+def render_migration(candidates, filename):
+    lines = [
+        '-- Migration: Add indexes advised from the server query mix',
+        f'-- File: {filename}',
+        '-- AUTO-GENERATED by index_advisor.py from the server sources and server.log. Review before applying.',
+        '--',
+        '-- Ranked by the request volume of the routes whose queries each index serves.',
+        '',
+    ]
+    for c in candidates:
+        routes = ', '.join(c['routes'][:3]) + (' ...' if len(c['routes']) > 3 else '')
+        lines.append(f"-- score {c['score']}: {routes or 'no logged route'}")
+        lines.append(f"CREATE INDEX {index_name(c['columns'])} ON {c['table']}({', '.join(c['columns'])});")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def next_migration_path(slug):
+    numbers = [int(m.group(1)) for name in os.listdir(MIGRATIONS_DIR)
+               for m in [re.match(r'(\d{4})_', name)] if m]
+    filename = f"{max(numbers, default=0) + 1:04d}_{slug}.sql"
+    return os.path.join(MIGRATIONS_DIR, filename), filename
+
+
+def print_candidates(candidates, limit, show_queries, skipped_tables):
+    print(f"{'#':>3} {'score':>7}  {'index':70} routes")
+    for i, c in enumerate(candidates[:limit], 1):
+        target = f"{c['table']}({', '.join(c['columns'])})"
+        routes = ', '.join(c['routes'][:2]) + (f" +{len(c['routes']) - 2}" if len(c['routes']) > 2 else '')
+        print(f"{i:>3} {c['score']:>7}  {target:70} {routes or '-'}")
+        if show_queries:
+            for q in c['queries'][:5]:
+                print(f"{'':13}{q['file']}:{q['line']}  {q['sql'][:110]}")
+    if len(candidates) > limit:
+        print(f"... {len(candidates) - limit} more candidate(s)")
+    if skipped_tables:
+        print(f"\nNo CREATE TABLE found (existing keys taken from shared/schema.ts only): "
+              f"{', '.join(sorted(skipped_tables))}")
+
+
+# -- benchmark -------------------------------------------------------------------
+
+LOW_CARDINALITY = ('status', 'gender', 'type', 'category', 'mode_of_payment', 'service_name',
+                   'speciality', 'role')
+
+
+def _table_definition(table, path):
+    """Return (CREATE TABLE statement, parsed info) for `table` from the SQL file at `path`."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = schema_index._strip_sql_comments(f.read())
+    for m in schema_index.CREATE_TABLE_RE.finditer(text):
+        if m.group(1) == table:
+            body, end = schema_index._balanced_body(text, m.end())
+            tail = text[end:text.find(';', end)]
+            return f"CREATE TABLE {table} ({body}){tail}", schema_index.parse_sql_schema(text)[table]
+    raise KeyError(f"Table '{table}' not found in {os.path.relpath(path, ROOT_DIR)}")
+
+
+def _value_factory(column, col_type, rows, unique, rng):
+    base = col_type.split('(')[0].split()[0]
+    length = schema_index._varchar_length(col_type) or 255
+    epoch = datetime.datetime(2024, 1, 1)
+    if base in ('DATE', 'DATETIME', 'TIMESTAMP'):
+        def make(i):
+            value = epoch + datetime.timedelta(seconds=rng.randrange(730 * 86400))
+            return value.date() if base == 'DATE' else value
+        return make
+    if base == 'TIME':
+        return lambda i: f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00"
+    if base in ('TINYINT', 'BOOLEAN', 'BOOL'):
+        return lambda i: rng.randrange(2)
+    if base in ('INT', 'INTEGER', 'SMALLINT', 'BIGINT'):
+        return (lambda i: i + 1) if unique else (lambda i: rng.randrange(100))
+    if base == 'DECIMAL':
+        return lambda i: round(rng.uniform(0, 100000), 2)
+    if base in ('TEXT', 'VARCHAR', 'CHAR'):
+        if column == 'id' and length == 36:
+            return lambda i: str(uuid.UUID(int=rng.getrandbits(128)))
+        if unique:
+            return lambda i: f"{column[:8]}-{i}"[:length]
+        if column.endswith(LOW_CARDINALITY) or column in LOW_CARDINALITY:
+            distinct = 8
+        elif column.endswith(('project_id', 'organisation_hospital', 'clinician_researcher_name', 'user_id')):
+            distinct = max(rows // 20, 1)
+        else:
+            distinct = max(rows // 2, 1)
+        return lambda i: f"{column[:8]}-{rng.randrange(distinct)}"[:length]
+    return lambda i: None
+
+
+def load_synthetic(conn, schema, table, rows, seed=7):
+    """Recreate `table` from its CREATE TABLE and fill it with `rows` synthetic rows."""
+    ddl, info = _table_definition(table, schema[table]['ddl'])
+    # Leading column of every unique key gets distinct values so composite keys cannot collide
+    unique_cols = {cols[0] for cols in schema[table]['unique']}
+    rng = random.Random(seed)
+    columns = [(name, col_type) for name, col_type in info['columns']
+               if not (name in info['primary_key'] and col_type.startswith('BIGINT'))]
+    makers = [_value_factory(name, col_type, rows, name in unique_cols, rng) for name, col_type in columns]
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {table}")
+    cur.execute(ddl)
+    names = ', '.join(name for name, _ in columns)
+    row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    batch = 1000
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        params = [make(start + k) for k in range(count) for make in makers]
+        cur.execute(f"INSERT INTO {table} ({names}) VALUES {', '.join([row_sql] * count)}", params)
+    conn.commit()
+    cur.execute(f"ANALYZE TABLE {table}")
+    cur.fetchall()
+    cur.close()
+
+
+def probe_sql(candidate):
+    """SELECT with the candidate's WHERE / ORDER BY shape, plus the columns needing sample values."""
+    where = [f"{c} = %s" for c in candidate['eq']] + [f"{c} >= %s" for c in candidate['range']]
+    sql = f"SELECT * FROM {candidate['table']}"
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    if candidate['order']:
+        sql += ' ORDER BY ' + ', '.join(f"{c} DESC" for c in candidate['order'])
+    return sql + ' LIMIT 100', candidate['eq'] + candidate['range']
+
+
+def _sample_values(conn, candidate, rows, rng):
+    """Parameter values taken from a random existing row, so probes hit real data."""
+    _, params = probe_sql(candidate)
+    if not params:
+        return ()
+    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(params)} FROM {candidate['table']} LIMIT 1 OFFSET %s", (rng.randrange(rows),))
+    sample = cur.fetchone()
+    cur.close()
+    return sample
+
+
+def _bench_query(conn, candidate, sample, repeats):
+    """EXPLAIN + median timing of the candidate's probe query."""
+    sql, _ = probe_sql(candidate)
+    cur = conn.cursor()
+    cur.execute('EXPLAIN ' + sql, sample)
+    names = [d[0] for d in cur.description]
+    plan = dict(zip(names, cur.fetchone()))
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cur.execute(sql, sample)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    cur.close()
+    return {'type': plan.get('type'), 'key': plan.get('key'), 'rows': plan.get('rows'),
+            'ms': statistics.median(timings)}
+
+
+def bench(candidates, schema, config, rows, repeats, keep):
+    from database_config import mysql_creator
+
+    conn = mysql_creator(dict(config, autocommit=False))()
+    loaded = set()
+    results = []
+    rng = random.Random(11)
+    try:
+        for c in candidates:
+            table = c['table']
+            if not schema[table]['ddl']:
+                print(f"skip {table}: no CREATE TABLE to replay")
+                continue
+            if table not in loaded:
+                started = time.perf_counter()
+                load_synthetic(conn, schema, table, rows)
+                loaded.add(table)
+                print(f"loaded {rows} synthetic rows into {table} in {time.perf_counter() - started:.1f}s")
+            sample = _sample_values(conn, c, rows, rng)
+            before = _bench_query(conn, c, sample, repeats)
+            name = index_name(c['columns'])
+            cur = conn.cursor()
+            cur.execute(f"CREATE INDEX {name} ON {table}({', '.join(c['columns'])})")
+            cur.execute(f"ANALYZE TABLE {table}")
+            cur.fetchall()
+            after = _bench_query(conn, c, sample, repeats)
+            if not keep:
+                cur.execute(f"DROP INDEX {name} ON {table}")
+            cur.close()
+            results.append((c, before, after))
+    finally:
+        conn.close()
+    return results
+
+
+def print_bench(results):
+    print(f"\n{'index':60} {'before':>28} {'after':>28} {'speedup':>8}")
+    for c, before, after in results:
+        target = f"{c['table']}({', '.join(c['columns'])})"
+        fmt = lambda r: f"{r['type'] or '-'}/{r['rows'] or 0} rows {r['ms']:.2f}ms"
+        speedup = before['ms'] / after['ms'] if after['ms'] else 0
+        print(f"{target[:60]:60} {fmt(before):>28} {fmt(after):>28} {speedup:>7.1f}x")
+
+
+# -- CLI -------------------------------------------------------------------------
+
+def analyze(log_path):
+    schema, variables = load_schema()
+    queries, route_calls = collect_queries(schema, variables)
+    weigh(queries, route_calls, route_hits(log_path))
+    candidates = rank_candidates(queries, schema)
+    skipped = {c['table'] for c in candidates if not schema[c['table']]['ddl']}
+    return schema, queries, candidates, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Suggest indexes from the server query mix.')
+    parser.add_argument('--log', default=DEFAULT_LOG, help='server log used for request weights')
+    parser.add_argument('--limit', type=int, default=25, help='candidates to show / emit / bench')
+    parser.add_argument('--min-score', type=int, default=1, help='ignore candidates below this score')
+    parser.add_argument('--show-queries', action='store_true', help='list the queries behind each candidate')
+    parser.add_argument('--emit', action='store_true', help='write the next database/migrations file')
+    sub = parser.add_subparsers(dest='command')
+    p_bench = sub.add_parser('bench', help='EXPLAIN and time candidates on synthetic data')
+    p_bench.add_argument('--database', required=True, help='scratch MySQL database (tables are recreated)')
+    p_bench.add_argument('--rows', type=int, default=100000, help='synthetic rows per table')
+    p_bench.add_argument('--repeats', type=int, default=5, help='timed runs per query')
+    p_bench.add_argument('--keep', action='store_true', help='keep the created indexes')
+    p_bench.add_argument('--allow-remote', action='store_true', help='allow a non-local DB_HOST')
+    args = parser.parse_args(argv)
+
+    schema, queries, candidates, skipped = analyze(args.log)
+    candidates = [c for c in candidates if c['score'] >= args.min_score]
+    print(f"{len(queries)} queries analysed, {len(candidates)} index candidate(s)\n")
+    print_candidates(candidates, args.limit, args.show_queries, skipped)
+
+    if args.emit:
+        emit = [c for c in candidates[:args.limit] if schema[c['table']]['ddl']]
+        path, filename = next_migration_path('add_advised_indexes')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_migration(emit, filename))
+        print(f"\nWrote {os.path.relpath(path, ROOT_DIR)} ({len(emit)} indexes)")
+
+    if args.command == 'bench':
+        from database_config import DATABASE_CONFIG, get_config
+
+        config = get_config()
+        if args.database == DATABASE_CONFIG['database'] or args.database == config['database']:
+            parser.error('refusing to recreate tables in the configured application database')
+        if config['host'] not in ('127.0.0.1', 'localhost', '::1') and not args.allow_remote:
+            parser.error(f"DB_HOST is {config['host']}; set DB_HOST=127.0.0.1 or pass --allow-remote")
+        config['database'] = args.database
+        results = bench(candidates[:args.limit], schema, config, args.rows, args.repeats, args.keep)
+        print_bench(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
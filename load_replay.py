@@ -0,0 +1,412 @@
+# LeadLab LIMS - Load replay benchmark
+#
+# Builds a workload profile from the request mix recorded in server.log
+# (e.g. the users / notifications / dashboard polling pattern) and replays it
+# with asyncio against a running server, at a fixed concurrency (closed loop)
+# or a fixed arrival rate (open loop, Poisson arrivals). Reports throughput,
+# latency percentiles and error rates per endpoint, writes them to a JSON
+# results file and compares them with a saved baseline.
+#
+# Point the server at a local MySQL: either start it yourself, or pass
+# --start-server to launch `npx tsx server/index.ts` with PORT/DB_* set from
+# --port and the DB_* environment of this process (DB_HOST defaults to
+# 127.0.0.1). Only GET requests are replayed unless --include-writes is given.
+#
+# Requires aiohttp (pip install aiohttp).
+#
+# Usage:
+#   python load_replay.py profile > profile.json                 # request mix from server.log
+#   python load_replay.py run --concurrency 20 --duration 60     # closed loop
+#   python load_replay.py run --rate 200 --duration 60           # open loop, 200 req/s
+#   python load_replay.py run --start-server --save-baseline bench/baseline.json
+#   python load_replay.py run --baseline bench/baseline.json     # exit 1 on regression
+#   python load_replay.py compare bench/baseline.json results.json
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from log_analyzer import DEFAULT_LOG, REQUEST_RE, route_template
+
+DEFAULT_BASE_URL = 'http://127.0.0.1:{port}'
+DEFAULT_PORT = 4001
+DEFAULT_SERVER_CMD = 'npx tsx server/index.ts'
+HEALTH_PATH = '/api/modules/health'
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Concrete paths kept per route template for replay
+PATHS_PER_ROUTE = 20
+SAFE_METHODS = {'GET', 'HEAD'}
+
+# Regression thresholds for --baseline / compare
+P95_TOLERANCE = 0.25         # p95 may grow by 25%
+THROUGHPUT_TOLERANCE = 0.15  # throughput may drop by 15%
+ERROR_RATE_TOLERANCE = 0.01  # error rate may grow by 1 percentage point
+
+
+# -- workload profile --------------------------------------------------------
+
+def build_profile(log_path, include_writes=False):
+    """Request mix from a server log: route -> weight and sample concrete paths."""
+    routes = {}
+    with open(log_path, 'rb') as f:
+        for line in f:
+            m = REQUEST_RE.match(line)
+            if not m:
+                continue
+            method = m.group(5).decode()
+            if method not in SAFE_METHODS and not include_writes:
+                continue
+            path = m.group(6).decode('utf-8', 'replace')
+            key = f"{method} {route_template(path)}"
+            entry = routes.setdefault(key, {'method': method, 'route': key, 'count': 0, 'paths': []})
+            entry['count'] += 1
+            if path not in entry['paths'] and len(entry['paths']) < PATHS_PER_ROUTE:
+                entry['paths'].append(path)
+    total = sum(e['count'] for e in routes.values())
+    for entry in routes.values():
+        entry['weight'] = entry['count'] / total if total else 0.0
+    return {
+        'source': os.path.relpath(log_path, ROOT_DIR),
+        'requests': total,
+        'routes': sorted(routes.values(), key=lambda e: -e['count']),
+    }
+
+
+def load_profile(args):
+    if args.profile:
+        with open(args.profile, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return build_profile(args.log, args.include_writes)
+
+
+class RequestPicker:
+    """Draws (route, method, path) according to the profile weights."""
+
+    def __init__(self, profile, only=None, seed=None):
+        entries = [e for e in profile['routes'] if e['paths'] and (not only or re.search(only, e['route']))]
+        if not entries:
+            raise ValueError('Workload profile has no replayable routes')
+        self.entries = entries
+        self.weights = [e['count'] for e in entries]
+        self.rng = random.Random(seed)
+
+    def pick(self):
+        entry = self.rng.choices(self.entries, self.weights)[0]
+        return entry['route'], entry['method'], self.rng.choice(entry['paths'])
+
+
+# -- measurement ---------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.client_errors = {}
+
+    def record(self, route, status, ms):
+        self.latencies.setdefault(route, []).append(ms)
+        if status is None or status >= 500:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        elif status >= 400:
+            self.client_errors[route] = self.client_errors.get(route, 0) + 1
+
+    def summary(self, elapsed):
+        elapsed = max(elapsed, 1e-9)
+        endpoints = {}
+        all_latencies = []
+        for route, values in self.latencies.items():
+            values.sort()
+            all_latencies.extend(values)
+            endpoints[route] = _stats(values, self.errors.get(route, 0), self.client_errors.get(route, 0), elapsed)
+        all_latencies.sort()
+        total = _stats(all_latencies, sum(self.errors.values()), sum(self.client_errors.values()), elapsed)
+        return {'elapsed_s': round(elapsed, 3), 'total': total, 'endpoints': endpoints}
+
+
+def _stats(values, errors, client_errors, elapsed):
+    count = len(values)
+    return {
+        'requests': count,
+        'throughput_rps': round(count / elapsed, 2),
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2) if values else 0.0,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'client_error_rate': round(client_errors / count, 4) if count else 0.0,
+    }
+
+
+# -- replay --------------------------------------------------------------------
+
+async def _send(session, base_url, picker, recorder, timeout, measuring, scheduled=None):
+    """Send one request; latency runs from `scheduled` (its open-loop arrival time) if given."""
+    loop = asyncio.get_running_loop()
+    route, method, path = picker.pick()
+    started = loop.time() if scheduled is None else scheduled
+    measured = measuring(started)  # requests sent during warmup are not recorded
+    status = None
+    try:
+        async with session.request(method, base_url + path, timeout=timeout) as resp:
+            await resp.read()
+            status = resp.status
+    except Exception:
+        status = None
+    if measured:
+        recorder.record(route, status, (loop.time() - started) * 1000)
+
+
+async def replay(base_url, picker, concurrency, rate, duration, warmup, timeout):
+    import aiohttp  # optional dependency, only needed for replays
+
+    recorder = Recorder()
+    loop = asyncio.get_running_loop()
+    begin = loop.time()
+    measure_from = begin + warmup
+    stop_at = measure_from + duration
+
+    def measuring(at):
+        return at >= measure_from
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        if rate:
+            # Open loop: Poisson arrivals, at most `concurrency` in flight. Latency
+            # counts from the scheduled arrival, so time spent queued behind a
+            # slow server is measured rather than omitted.
+            slots = asyncio.Semaphore(concurrency)
+            pending = set()
+
+            async def one(scheduled):
+                async with slots:
+                    await _send(session, base_url, picker, recorder, client_timeout, measuring, scheduled)
+
+            next_at = loop.time()
+            while next_at < stop_at:
+                delay = next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.ensure_future(one(next_at))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                next_at += picker.rng.expovariate(rate)
+            if pending:
+                await asyncio.gather(*pending)
+        else:
+            # Closed loop: `concurrency` workers sending back to back
+            async def worker():
+                while loop.time() < stop_at:
+                    await _send(session, base_url, picker, recorder, client_timeout, measuring)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return recorder.summary(loop.time() - measure_from)
+
+
+# -- server ----------------------------------------------------------------------
+
+def wait_for_health(base_url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + HEALTH_PATH, timeout=2) as resp:
+                if resp.status < 500:
+                    return True
+        except Exception:
+            time.sleep(1)
+    return False
+
+
+def start_server(cmd, port):
+    env = dict(os.environ)
+    env['PORT'] = str(port)
+    env.setdefault('DB_HOST', '127.0.0.1')
+    env.setdefault('NODE_ENV', 'production')
+    # Own session/process group, so stop_server reaches the node process
+    # behind the shell and npm/tsx wrappers
+    return subprocess.Popen(cmd, shell=True, cwd=ROOT_DIR, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+
+def stop_server(server, timeout=10):
+    """SIGTERM the server's process group, SIGKILL it if still running after `timeout`."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(server.pid, sig)
+        except ProcessLookupError:
+            break
+        try:
+            server.wait(timeout=timeout)
+            break
+        except subprocess.TimeoutExpired:
+            continue
+    server.wait()
+
+
+# -- baseline comparison -----------------------------------------------------------
+
+def compare(baseline, current):
+    """Return [(route, metric, before, after)] for metrics outside tolerance."""
+    problems = []
+    pairs = [('total', baseline['total'], current['total'])]
+    pairs += [(route, stats, current['endpoints'][route])
+              for route, stats in baseline['endpoints'].items() if route in current['endpoints']]
+    for route, before, after in pairs:
+        if before['p95_ms'] and after['p95_ms'] > before['p95_ms'] * (1 + P95_TOLERANCE):
+            problems.append((route, 'p95_ms', before['p95_ms'], after['p95_ms']))
+        if before['throughput_rps'] and after['throughput_rps'] < before['throughput_rps'] * (1 - THROUGHPUT_TOLERANCE):
+            problems.append((route, 'throughput_rps', before['throughput_rps'], after['throughput_rps']))
+        if after['error_rate'] > before['error_rate'] + ERROR_RATE_TOLERANCE:
+            problems.append((route, 'error_rate', before['error_rate'], after['error_rate']))
+    return problems
+
+
+def print_results(results):
+    total = results['total']
+    settings = results['settings']
+    mode = f"rate {settings['rate']}/s" if settings['rate'] else 'closed loop'
+    print(f"{total['requests']} requests in {results['elapsed_s']}s, concurrency {settings['concurrency']}, {mode}: "
+          f"{total['throughput_rps']} req/s, p50 {total['p50_ms']}ms, p95 {total['p95_ms']}ms, "
+          f"p99 {total['p99_ms']}ms, errors {total['error_rate']:.2%}")
+    print(f"\n{'endpoint':52} {'reqs':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>7} {'4xx':>7}")
+    for route, s in sorted(results['endpoints'].items(), key=lambda kv: -kv[1]['requests']):
+        print(f"{route[:52]:52} {s['requests']:>7} {s['throughput_rps']:>8} {s['p50_ms']:>8} "
+              f"{s['p95_ms']:>8} {s['p99_ms']:>8} {s['error_rate']:>7.2%} {s['client_error_rate']:>7.2%}")
+
+
+def print_comparison(problems):
+    if not problems:
+        print("\nWithin baseline tolerances.")
+        return
+    print("\nRegressions against baseline:")
+    for route, metric, before, after in problems:
+        print(f"  {route}: {metric} {before} -> {after}")
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def cmd_run(args):
+    try:
+        picker = RequestPicker(load_profile(args), args.only, args.seed)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    base_url = (args.base_url or DEFAULT_BASE_URL.format(port=args.port)).rstrip('/')
+
+    server = None
+    if args.start_server:
+        server = start_server(args.server_cmd, args.port)
+        if not wait_for_health(base_url, args.startup_timeout):
+            stop_server(server)
+            print(f"Server did not become healthy at {base_url}{HEALTH_PATH}", file=sys.stderr)
+            return 2
+    try:
+        summary = asyncio.run(replay(base_url, picker, args.concurrency, args.rate,
+                                     args.duration, args.warmup, args.timeout))
+    finally:
+        if server:
+            stop_server(server)
+
+    results = {
+        'settings': {'base_url': base_url, 'concurrency': args.concurrency, 'rate': args.rate,
+                     'duration_s': args.duration, 'warmup_s': args.warmup, 'only': args.only},
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        **summary,
+    }
+    print_results(results)
+    if args.out:
+        _write_json(args.out, results)
+    if args.save_baseline:
+        _write_json(args.save_baseline, results)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            problems = compare(json.load(f), results)
+        print_comparison(problems)
+        return 1 if problems else 0
+    return 0
+
+
+def cmd_compare(args):
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.results, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    print_results(results)
+    problems = compare(baseline, results)
+    print_comparison(problems)
+    return 1 if problems else 0
+
+
+def cmd_profile(args):
+    profile = build_profile(args.log, args.include_writes)
+    json.dump(profile, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded LIMS traffic and benchmark the server.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_profile = sub.add_parser('profile', help='print the workload profile built from a server log')
+    p_profile.add_argument('--log', default=DEFAULT_LOG, help='server log to build the request mix from')
+    p_profile.add_argument('--include-writes', action='store_true', help='also include non-GET requests')
+    p_profile.set_defaults(func=cmd_profile)
+
+    p_run = sub.add_parser('run', help='replay a workload and report per-endpoint results')
+    p_run.add_argument('--log', default=DEFAULT_LOG, help='server log to build the request mix from')
+    p_run.add_argument('--profile', help='use a saved profile instead of the log')
+    p_run.add_argument('--include-writes', action='store_true', help='also replay non-GET requests')
+    p_run.add_argument('--only', help='regex restricting the replayed routes')
+    p_run.add_argument('--base-url', help=f'server URL (default http://127.0.0.1:{DEFAULT_PORT})')
+    p_run.add_argument('--port', type=int, default=DEFAULT_PORT, help='server port')
+    p_run.add_argument('--concurrency', type=int, default=10, help='parallel connections / in-flight requests')
+    p_run.add_argument('--rate', type=float, help='arrival rate in req/s (open loop); default closed loop')
+    p_run.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    p_run.add_argument('--warmup', type=float, default=5.0, help='unmeasured seconds before measuring')
+    p_run.add_argument('--timeout', type=float, default=30.0, help='per-request timeout (s)')
+    p_run.add_argument('--seed', type=int, help='seed for the request picker')
+    p_run.add_argument('--out', help='write results JSON here')
+    p_run.add_argument('--save-baseline', help='write results JSON as the new baseline')
+    p_run.add_argument('--baseline', help='compare with this baseline; exit 1 on regression')
+    p_run.add_argument('--start-server', action='store_true', help='start the server for the run')
+    p_run.add_argument('--server-cmd', default=DEFAULT_SERVER_CMD, help='command used by --start-server')
+    p_run.add_argument('--startup-timeout', type=float, default=60.0, help='seconds to wait for the server')
+    p_run.set_defaults(func=cmd_run)
+
+    p_compare = sub.add_parser('compare', help='compare a results file with a baseline')
+    p_compare.add_argument('baseline')
+    p_compare.add_argument('results')
+    p_compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
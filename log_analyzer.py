@@ -0,0 +1,380 @@
+# LeadLab LIMS - server.log request analyzer
+#
+# Parses the request lines written by server/index.ts,
+#
+#   7:47:02 PM [express] GET /api/users/e8300c2f-... 200 in 4ms :: {...}
+#
+# with one precompiled bytes pattern over a memory-mapped log, and aggregates
+# them per route template (ids collapsed to :id) into fixed-bucket latency
+# histograms (p50/p95/p99), status mix and request rate. Memory use depends on
+# the number of routes, not the size of the log.
+#
+# A byte-offset checkpoint (.server_log_checkpoint.json) stores the
+# aggregates, so repeated runs only parse bytes appended since the last run.
+# Routes whose p95 over the new bytes is well above their previous p95 are
+# flagged as regressions. A rotated or truncated log starts a fresh aggregate.
+#
+# Usage:
+#   python log_analyzer.py                        # server.log, incremental
+#   python log_analyzer.py server-dev.log --top 10 --sort p95
+#   python log_analyzer.py --reset                # drop the checkpoint, parse everything
+#   python log_analyzer.py --no-checkpoint        # one-off full parse, nothing saved
+#   python log_analyzer.py --follow --interval 30 # keep tailing, report every 30s
+#   python log_analyzer.py --json                 # machine-readable output
+
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG = os.path.join(ROOT_DIR, 'server.log')
+CHECKPOINT_FILE = os.path.join(ROOT_DIR, '.server_log_checkpoint.json')
+
+# Bump when the checkpoint layout or bucket bounds change
+CHECKPOINT_VERSION = 1
+
+# Upper bounds (ms) of the latency buckets; the last bucket is open-ended
+BUCKET_BOUNDS = [
+    1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 80, 100, 125, 150,
+    200, 250, 300, 400, 500, 600, 800, 1000, 1250, 1500, 2000, 2500, 3000, 4000,
+    5000, 7500, 10000, 15000, 20000, 30000, 60000,
+]
+
+# One pattern for every request line; lines cut by the 80-char limit before
+# the duration simply do not match and are counted as unparsed
+REQUEST_RE = re.compile(
+    rb'^(\d{1,2}):(\d{2}):(\d{2}) ([AP]M) \[express\] '
+    rb'(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS) (\S+) (\d{3}) in (\d+)ms'
+)
+EXPRESS_RE = re.compile(rb'\[express\] (?:GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS) ')
+
+# Path segments collapsed to :id
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I)
+ID_SEGMENT_RE = re.compile(r'\d')
+
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_COUNT = 20
+
+
+def route_template(path):
+    """'/api/users/e830...?x=1' -> '/api/users/:id'."""
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    segments = []
+    for segment in path.split('/'):
+        if segment and (UUID_RE.match(segment) or ID_SEGMENT_RE.search(segment)):
+            segments.append(':id')
+        else:
+            segments.append(segment)
+    return '/'.join(segments) or '/'
+
+
+class RouteStats:
+    """Count, latency histogram and status mix for one METHOD + route."""
+
+    __slots__ = ('count', 'buckets', 'total_ms', 'max_ms', 'statuses')
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total_ms = 0
+        self.max_ms = 0
+        self.statuses = {}
+
+    def add(self, status, ms):
+        self.count += 1
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        for status, n in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + n
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, capped at the max seen."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[i], self.max_ms) if i < len(BUCKET_BOUNDS) else self.max_ms
+        return self.max_ms
+
+    def status_mix(self):
+        mix = {}
+        for status, n in self.statuses.items():
+            key = status[0] + 'xx'
+            mix[key] = mix.get(key, 0) + n
+        return mix
+
+    def to_json(self):
+        return {'count': self.count, 'buckets': self.buckets, 'total_ms': self.total_ms,
+                'max_ms': self.max_ms, 'statuses': self.statuses}
+
+    @classmethod
+    def from_json(cls, data):
+        stats = cls()
+        stats.count = data['count']
+        stats.buckets = data['buckets']
+        stats.total_ms = data['total_ms']
+        stats.max_ms = data['max_ms']
+        stats.statuses = data['statuses']
+        return stats
+
+
+class Aggregate:
+    """Per-route stats plus the clock span they cover.
+
+    Log times carry no date, so the clock is seconds since the first line and
+    advances a day whenever the time of day jumps backwards by over 12 hours.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.unparsed = 0
+        self.first = None
+        self.last = None
+        self.day_offset = 0
+        self.last_tod = None
+
+    def tick(self, tod):
+        if self.last_tod is not None and tod < self.last_tod - 43200:
+            self.day_offset += 86400
+        self.last_tod = tod
+        clock = self.day_offset + tod
+        if self.first is None:
+            self.first = clock
+        self.last = clock
+
+    def span_seconds(self):
+        if self.first is None:
+            return 0
+        return max(self.last - self.first, 1)
+
+    def merge(self, other):
+        for route, stats in other.routes.items():
+            self.routes.setdefault(route, RouteStats()).merge(stats)
+        self.unparsed += other.unparsed
+        if other.first is not None:
+            if self.first is None:
+                self.first = other.first
+            self.last = other.last
+        self.day_offset, self.last_tod = other.day_offset, other.last_tod
+
+    def to_json(self):
+        return {'routes': {r: s.to_json() for r, s in self.routes.items()}, 'unparsed': self.unparsed,
+                'first': self.first, 'last': self.last, 'day_offset': self.day_offset, 'last_tod': self.last_tod}
+
+    @classmethod
+    def from_json(cls, data):
+        agg = cls()
+        agg.routes = {r: RouteStats.from_json(s) for r, s in data['routes'].items()}
+        agg.unparsed = data['unparsed']
+        agg.first, agg.last = data['first'], data['last']
+        agg.day_offset, agg.last_tod = data['day_offset'], data['last_tod']
+        return agg
+
+    def continue_clock_from(self, other):
+        """Start this (window) aggregate where `other` left off."""
+        self.day_offset, self.last_tod = other.day_offset, other.last_tod
+
+
+def parse_range(buf, start, end, agg):
+    """Parse complete lines in buf[start:end] into `agg`; returns the end offset consumed."""
+    match = REQUEST_RE.match
+    routes = agg.routes
+    templates = {}
+    pos = start
+    while pos < end:
+        nl = buf.find(b'\n', pos, end)
+        if nl == -1:
+            break  # partial last line, picked up on the next run
+        line = buf[pos:nl]
+        pos = nl + 1
+        m = match(line)
+        if m is None:
+            if EXPRESS_RE.search(line):
+                agg.unparsed += 1
+            continue
+        hour, minute, second, ampm, method, path, status, ms = m.groups()
+        tod = (int(hour) % 12 + (12 if ampm == b'PM' else 0)) * 3600 + int(minute) * 60 + int(second)
+        agg.tick(tod)
+        key = method + b' ' + path
+        route = templates.get(key)
+        if route is None:
+            route = method.decode() + ' ' + route_template(path.decode('utf-8', 'replace'))
+            templates[key] = route
+        stats = routes.get(route)
+        if stats is None:
+            stats = routes[route] = RouteStats()
+        stats.add(status.decode(), int(ms))
+    return pos
+
+
+def _head_hash(f):
+    f.seek(0)
+    return hashlib.sha256(f.read(256)).hexdigest()
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == CHECKPOINT_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {'version': CHECKPOINT_VERSION, 'logs': {}}
+
+
+def save_checkpoint(data, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def scan(log_path, entry):
+    """Parse the bytes of `log_path` not yet covered by checkpoint `entry`.
+
+    Returns (cumulative Aggregate, window Aggregate for the new bytes,
+    cumulative Aggregate before this scan, new checkpoint entry).
+    """
+    with open(log_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        head = _head_hash(f)
+        fresh = (
+            entry is None
+            or entry['inode'] != st.st_ino
+            or entry['head'] != head
+            or st.st_size < entry['offset']
+        )
+        cumulative = Aggregate() if fresh else Aggregate.from_json(entry['aggregate'])
+        offset = 0 if fresh else entry['offset']
+        window = Aggregate()
+        window.continue_clock_from(cumulative)
+        if st.st_size > offset:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                offset = parse_range(buf, offset, st.st_size, window)
+    previous = Aggregate.from_json(json.loads(json.dumps(cumulative.to_json())))
+    cumulative.merge(window)
+    new_entry = {'inode': st.st_ino, 'head': head, 'offset': offset, 'aggregate': cumulative.to_json()}
+    return cumulative, window, previous, new_entry
+
+
+def route_rows(agg):
+    span = agg.span_seconds()
+    rows = []
+    for route, stats in agg.routes.items():
+        rows.append({
+            'route': route,
+            'count': stats.count,
+            'per_min': stats.count * 60 / span if span else 0.0,
+            'avg_ms': stats.total_ms / stats.count if stats.count else 0.0,
+            'p50': stats.percentile(50),
+            'p95': stats.percentile(95),
+            'p99': stats.percentile(99),
+            'max': stats.max_ms,
+            'status': stats.status_mix(),
+        })
+    return rows
+
+
+def regressions(previous, window):
+    """Routes whose p95 in the new bytes exceeds REGRESSION_FACTOR x their previous p95."""
+    found = []
+    for route, stats in window.routes.items():
+        before = previous.routes.get(route)
+        if not before or before.count < REGRESSION_MIN_COUNT or stats.count < REGRESSION_MIN_COUNT:
+            continue
+        old, new = before.percentile(95), stats.percentile(95)
+        if new > old * REGRESSION_FACTOR:
+            found.append({'route': route, 'p95_before': old, 'p95_now': new, 'count': stats.count})
+    return found
+
+
+def print_report(log_path, agg, window, regressed, top, sort_key):
+    rows = sorted(route_rows(agg), key=lambda r: r[sort_key], reverse=True)
+    total = sum(r['count'] for r in rows)
+    span = agg.span_seconds()
+    print(f"{os.path.basename(log_path)}: {total} requests over {span / 60:.1f} min "
+          f"({sum(s.count for s in window.routes.values())} new), {len(rows)} routes, "
+          f"{agg.unparsed} truncated/unparsed request lines")
+    print(f"\n{'route':52} {'count':>7} {'req/min':>8} {'avg':>7} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>6}  status")
+    for r in rows[:top]:
+        mix = ' '.join(f"{k}:{v}" for k, v in sorted(r['status'].items()))
+        print(f"{r['route'][:52]:52} {r['count']:>7} {r['per_min']:>8.1f} {r['avg_ms']:>7.1f} "
+              f"{r['p50']:>6} {r['p95']:>6} {r['p99']:>6} {r['max']:>6}  {mix}")
+    if len(rows) > top:
+        print(f"... {len(rows) - top} more route(s)")
+    if regressed:
+        print("\nLatency regressions in new lines (p95, ms):")
+        for r in regressed:
+            print(f"  {r['route']}: {r['p95_before']} -> {r['p95_now']} over {r['count']} requests")
+
+
+def run_once(log_path, checkpoint_path, use_checkpoint, reset):
+    data = load_checkpoint(checkpoint_path) if use_checkpoint else {'version': CHECKPOINT_VERSION, 'logs': {}}
+    key = os.path.abspath(log_path)
+    entry = None if reset else data['logs'].get(key)
+    agg, window, previous, new_entry = scan(log_path, entry)
+    if use_checkpoint:
+        data['logs'][key] = new_entry
+        save_checkpoint(data, checkpoint_path)
+    return agg, window, regressions(previous, window), new_entry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarise request latency and volume from server.log.')
+    parser.add_argument('log', nargs='?', default=DEFAULT_LOG, help='log file (default: server.log)')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help='checkpoint file')
+    parser.add_argument('--no-checkpoint', action='store_true', help='parse the whole log and save nothing')
+    parser.add_argument('--reset', action='store_true', help='ignore the stored checkpoint for this log')
+    parser.add_argument('--top', type=int, default=25, help='routes to show')
+    parser.add_argument('--sort', choices=['count', 'per_min', 'avg_ms', 'p95', 'p99', 'max'], default='count')
+    parser.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    parser.add_argument('--follow', action='store_true', help='keep tailing the log')
+    parser.add_argument('--interval', type=float, default=10.0, help='seconds between reports in --follow mode')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.log):
+        parser.error(f"log not found: {args.log}")
+    if args.follow and args.no_checkpoint:
+        parser.error('--follow needs the checkpoint to track its position')
+
+    reset = args.reset
+    while True:
+        agg, window, regressed, _ = run_once(args.log, args.checkpoint, not args.no_checkpoint, reset)
+        reset = False
+        if args.json:
+            print(json.dumps({'log': args.log, 'span_seconds': agg.span_seconds(), 'unparsed': agg.unparsed,
+                              'routes': route_rows(agg), 'regressions': regressed}))
+        else:
+            print_report(args.log, agg, window, regressed, args.top, args.sort)
+        if not args.follow:
+            return 0
+        sys.stdout.flush()
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+        if not args.json:
+            print()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
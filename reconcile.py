@@ -0,0 +1,526 @@
+# LeadLab LIMS - Process master reconciliation
+#
+# Checks process_master_sheet against lead_management and the downstream
+# sheets in one batch pass instead of per-record SELECT-then-UPDATE round trips.
+#
+# process_master_sheet is walked in keyset-paged chunks ordered by unique_id.
+# Each chunk covers a unique_id range; every source table is read for that
+# same range (bounds and order under one collation), hash-joined in memory on
+# unique_id as the database compares it, and compared field by field against
+# the COALESCE chains of GET /api/process-master (lab, bioinformatics,
+# nutrition and finance sheets, sample_tracking). --extra-rules also fills
+# sample_id, the report release date and lead fields, which the route does
+# not. Fixes are applied as set-based statements, one transaction per chunk:
+#
+#   - process_master_sheet fields that disagree with their source
+#   - process_master_sheet rows missing for a lead (inserted from the lead)
+#   - blank project_id on downstream sheets (backfilled from process master)
+#
+# Conflicting non-blank project_ids and rows with no process master entry are
+# reported only. Without --apply the job is a dry run that prints the report.
+#
+# Usage:
+#   python reconcile.py                          # dry run, summary report
+#   python reconcile.py --report drift.jsonl     # also write every discrepancy
+#   python reconcile.py --apply                  # apply fixes
+#   python reconcile.py --apply --extra-rules    # plus rules the route does not use
+#   python reconcile.py --chunk-size 5000 --only finance_sheet
+
+import argparse
+import datetime
+import decimal
+import json
+import sys
+import time
+import unicodedata
+from collections import Counter, defaultdict
+
+import schema_index
+from database_config import get_pool
+
+TARGET = 'process_master_sheet'
+KEY_COLUMN = 'unique_id'
+DEFAULT_CHUNK_SIZE = 2000
+SAMPLE_LINES = 20
+
+
+def finance_status(row):
+    """Mirror of the finance_status CASE in GET /api/process-master."""
+    if row.get('total_amount_received_status') in (1, True):
+        return 'Completed'
+    amount = row.get('payment_receipt_amount')
+    if amount is not None and amount > 0:
+        return 'Partial'
+    return None
+
+
+# Source table -> {process_master_sheet column: source column or callable}.
+# Exactly the COALESCE chains of GET /api/process-master: the first source
+# with a non-empty value wins, and every other column is shown from
+# process_master_sheet itself. Columns missing from database_schema.sql are
+# dropped at startup.
+LAB_FIELDS = {
+    'client_id': 'client_id',
+    'service_name': 'service_name',
+    'sample_type': 'sample_type',
+    'no_of_samples': 'no_of_samples',
+    'progenics_trf': 'progenics_trf',
+    'lab_process_status': 'extraction_qc_status',
+}
+SOURCES = {
+    'labprocess_discovery_sheet': LAB_FIELDS,
+    'labprocess_clinical_sheet': LAB_FIELDS,
+    'bioinformatics_sheet_discovery': {
+        'bioinformatics_status': 'analysis_status',
+    },
+    'bioinformatics_sheet_clinical': {
+        'bioinformatics_status': 'analysis_status',
+    },
+    'nutritional_management': {
+        'nutritional_management_status': 'counselling_status',
+    },
+    'finance_sheet': {
+        'finance_status': finance_status,
+    },
+    'sample_tracking': {
+        'organisation_hospital': 'organisation_hospital',
+        'clinician_researcher_name': 'clinician_researcher_name',
+        'clinician_researcher_phone': 'clinician_researcher_phone',
+        'patient_client_name': 'patient_client_name',
+        'patient_client_phone': 'patient_client_phone',
+        'sample_collection_date': 'sample_collection_date',
+        'sample_recevied_date': 'sample_recevied_date',
+        'sales_responsible_person': 'sales_responsible_person',
+        'third_party_trf': 'third_party_trf',
+        'sample_sent_to_third_party_date': 'sample_sent_to_third_party_date',
+        'third_party_name': 'third_party_name',
+        'third_party_report': 'third_party_report',
+    },
+}
+
+# Lead fields copied into a new process master row, as
+# /api/sync/leads-to-process-master does
+LEAD_FIELDS = {
+    'project_id': 'project_id',
+    'organisation_hospital': 'organisation_hospital',
+    'clinician_researcher_name': 'clinician_researcher_name',
+    'speciality': 'speciality',
+    'clinician_researcher_email': 'clinician_researcher_email',
+    'clinician_researcher_phone': 'clinician_researcher_phone',
+    'clinician_researcher_address': 'clinician_researcher_address',
+    'patient_client_name': 'patient_client_name',
+    'age': 'age',
+    'gender': 'gender',
+    'patient_client_email': 'patient_client_email',
+    'patient_client_phone': 'patient_client_phone',
+    'patient_client_address': 'patient_client_address',
+    'sample_collection_date': 'sample_collection_date',
+    'sample_recevied_date': 'sample_recevied_date',
+    'service_name': 'service_name',
+    'sample_type': 'sample_type',
+    'no_of_samples': 'no_of_samples',
+    'tat': 'tat',
+    'sales_responsible_person': 'sales_responsible_person',
+    'progenics_trf': 'progenics_trf',
+}
+
+# Rules the route does NOT apply, only used with --extra-rules. They
+# overwrite values that are edited in Process Master, so they are opt-in.
+EXTRA_SOURCES = {
+    'labprocess_discovery_sheet': {'sample_id': 'sample_id'},
+    'labprocess_clinical_sheet': {'sample_id': 'sample_id'},
+    'report_management': {'progenics_report_release_date': 'report_release_date'},
+    'lead_management': LEAD_FIELDS,
+}
+
+
+def source_rules(extra=False):
+    """SOURCES, plus EXTRA_SOURCES after them (lower precedence) with `extra`."""
+    rules = {table: dict(fields) for table, fields in SOURCES.items()}
+    if extra:
+        for table, fields in EXTRA_SOURCES.items():
+            merged = rules.setdefault(table, {})
+            merged.update({k: v for k, v in fields.items() if k not in merged})
+    return rules
+
+
+# Extra source columns read for derived (callable) fields
+EXTRA_COLUMNS = {
+    'finance_sheet': ['total_amount_received_status', 'payment_receipt_amount'],
+}
+
+# Tables whose rows create a process master row when it is missing,
+# as /api/sync/leads-to-process-master does
+ORIGIN_TABLE = 'lead_management'
+ORIGIN_AUDIT = {'created_by': 'lead_created_by'}
+
+# Tables checked for project_id consistency with process master (all but the target)
+PROJECT_ID_TABLES = [
+    'lead_management', 'sample_tracking', 'finance_sheet', 'genetic_counselling_records',
+    'labprocess_discovery_sheet', 'labprocess_clinical_sheet', 'bioinformatics_sheet_clinical',
+    'bioinformatics_sheet_discovery', 'nutritional_management', 'report_management', 'geneticanalyst',
+]
+
+
+def join_key(value, dialect='mysql'):
+    """unique_id as the database compares it.
+
+    MySQL: utf8mb4_unicode_ci, i.e. case- and accent-insensitive with trailing
+    spaces ignored (approximated). SQLite: BINARY.
+    """
+    value = str(value)
+    if dialect == 'sqlite':
+        return value
+    decomposed = unicodedata.normalize('NFKD', value.rstrip(' '))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _collated(dialect):
+    """unique_id expression for range bounds and ORDER BY, one collation for every table."""
+    return KEY_COLUMN if dialect == 'sqlite' else f'{KEY_COLUMN} COLLATE utf8mb4_unicode_ci'
+
+
+def normalize(value, col_type):
+    """Normalise a value to the target column type so equal data compares equal."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return None
+    base = col_type.split('(')[0].split()[0]
+    if base == 'DATE':
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        try:
+            return datetime.date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+    if base in ('DATETIME', 'TIMESTAMP'):
+        if isinstance(value, datetime.datetime):
+            return value.replace(microsecond=0)
+        try:
+            return datetime.datetime.fromisoformat(str(value)).replace(microsecond=0)
+        except ValueError:
+            return None
+    if base in ('INT', 'INTEGER', 'BIGINT', 'SMALLINT', 'TINYINT'):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if base == 'DECIMAL':
+        try:
+            return decimal.Decimal(str(value))
+        except decimal.InvalidOperation:
+            return None
+    return str(value)
+
+
+class Plan:
+    """Source rules resolved against the parsed schema."""
+
+    def __init__(self, index, only=None, extra=False):
+        self.target_types = {name: col['type'] for name, col in schema_index.table_columns(index, TARGET).items()}
+        self.sources = {}
+        self.dropped = []
+        for table, fields in source_rules(extra).items():
+            if only and table not in only:
+                continue
+            available = schema_index.table_columns(index, table)
+            kept = {}
+            for target_col, source in fields.items():
+                if target_col not in self.target_types:
+                    self.dropped.append(f"{TARGET}.{target_col}")
+                elif isinstance(source, str) and source not in available:
+                    self.dropped.append(f"{table}.{source}")
+                else:
+                    kept[target_col] = source
+            self.sources[table] = kept
+
+        # Lead columns for inserting missing process master rows
+        self.origin_fields = None
+        if not only or ORIGIN_TABLE in only:
+            available = schema_index.table_columns(index, ORIGIN_TABLE)
+            self.origin_fields = {target_col: source for target_col, source in LEAD_FIELDS.items()
+                                  if target_col in self.target_types and source in available}
+
+        self.project_tables = [t for t in PROJECT_ID_TABLES if not only or t in only]
+        self.read_columns = {}
+        for table in set(self.sources) | set(self.project_tables):
+            available = schema_index.table_columns(index, table)
+            cols = {KEY_COLUMN, 'project_id'}
+            cols.update(s for s in self.sources.get(table, {}).values() if isinstance(s, str))
+            cols.update(EXTRA_COLUMNS.get(table, []))
+            if table == ORIGIN_TABLE and self.origin_fields is not None:
+                cols.update(self.origin_fields.values())
+                cols.update(ORIGIN_AUDIT.values())
+            # sample_tracking allows several rows per unique_id; keep the first by id
+            order = ['id'] if 'id' in available and table == 'sample_tracking' else []
+            self.read_columns[table] = ([c for c in available if c in cols], order)
+        self.target_columns = [KEY_COLUMN] + sorted(
+            {c for fields in self.sources.values() for c in fields} | {'project_id'}
+        )
+        self.target_columns = [c for c in self.target_columns if c in self.target_types]
+
+
+def fetch_range(conn, pool, table, columns, order, lo, hi):
+    """Rows of `table` with lo < unique_id <= hi (open bounds when None).
+
+    Bounds and order use one explicit collation, so every table splits into
+    the same chunks as process_master_sheet whatever its own collation.
+    """
+    key, placeholder = _collated(pool.dialect), pool.placeholder
+    where, params = [], []
+    if lo is not None:
+        where.append(f'{key} > {placeholder}')
+        params.append(lo)
+    if hi is not None:
+        where.append(f'{key} <= {placeholder}')
+        params.append(hi)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else f'WHERE {KEY_COLUMN} IS NOT NULL'
+    order_sql = ', '.join([key] + order)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT {', '.join(columns)} FROM {table} {where_sql} ORDER BY {order_sql}", params)
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def fetch_target_chunk(conn, pool, columns, after, limit):
+    key, placeholder = _collated(pool.dialect), pool.placeholder
+    where = f'WHERE {key} > {placeholder}' if after is not None else ''
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {', '.join(columns)} FROM {TARGET} {where} ORDER BY {key} LIMIT {int(limit)}",
+            [after] if after is not None else [],
+        )
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def hash_by_key(rows, dialect='mysql'):
+    """unique_id -> first row, in fetch order."""
+    table = {}
+    for row in rows:
+        table.setdefault(join_key(row[KEY_COLUMN], dialect), row)
+    return table
+
+
+def reconcile_chunk(plan, target_rows, source_rows, dialect='mysql'):
+    """Compare one chunk. Returns (updates, inserts, backfills, findings).
+
+    updates:   {column: [(unique_id, value)]} for process_master_sheet
+    inserts:   [row dict] for process_master_sheet
+    backfills: {table: [(unique_id, project_id)]}
+    findings:  [discrepancy dict] for the report
+    """
+    targets = hash_by_key(target_rows, dialect)
+    sources = {table: hash_by_key(rows, dialect) for table, rows in source_rows.items()}
+    updates, inserts, backfills, findings = defaultdict(list), [], defaultdict(list), []
+
+    for key, pm in targets.items():
+        expected = {}
+        for table, fields in plan.sources.items():
+            row = sources[table].get(key)
+            if row is None:
+                continue
+            for column, source in fields.items():
+                if column in expected:
+                    continue
+                raw = source(row) if callable(source) else row.get(source)
+                value = normalize(raw, plan.target_types[column])
+                if value is not None:
+                    expected[column] = (value, table)
+        for column, (value, table) in expected.items():
+            current = normalize(pm.get(column), plan.target_types[column])
+            if current != value:
+                updates[column].append((pm[KEY_COLUMN], value))
+                findings.append({'kind': 'field', 'unique_id': pm[KEY_COLUMN], 'table': TARGET,
+                                 'column': column, 'current': current, 'expected': value, 'source': table})
+
+        # Backfill with the project_id this chunk is about to settle on
+        pm_project = expected['project_id'][0] if 'project_id' in expected else \
+            normalize(pm.get('project_id'), 'VARCHAR')
+        for table in plan.project_tables:
+            row = sources[table].get(key)
+            if row is None or 'project_id' in plan.sources.get(table, {}):
+                continue
+            other = normalize(row.get('project_id'), 'VARCHAR')
+            if other is None and pm_project is not None:
+                backfills[table].append((row[KEY_COLUMN], pm_project))
+                findings.append({'kind': 'project_id_blank', 'unique_id': row[KEY_COLUMN], 'table': table,
+                                 'column': 'project_id', 'current': None, 'expected': pm_project, 'source': TARGET})
+            elif other is not None and pm_project is not None and other != pm_project:
+                findings.append({'kind': 'project_id_conflict', 'unique_id': row[KEY_COLUMN], 'table': table,
+                                 'column': 'project_id', 'current': other, 'expected': pm_project, 'source': TARGET})
+
+    for table, rows in sources.items():
+        for key, row in rows.items():
+            if key in targets:
+                continue
+            if table == ORIGIN_TABLE and plan.origin_fields is not None:
+                record = {KEY_COLUMN: row[KEY_COLUMN]}
+                for column, source in plan.origin_fields.items():
+                    record[column] = normalize(row.get(source), plan.target_types[column])
+                for column, source in ORIGIN_AUDIT.items():
+                    if column in plan.target_types:
+                        record[column] = row.get(source)
+                inserts.append(record)
+                kind = 'missing_process_master'
+            else:
+                kind = 'orphan'
+            findings.append({'kind': kind, 'unique_id': row[KEY_COLUMN], 'table': table,
+                             'column': None, 'current': None, 'expected': None, 'source': table})
+    return updates, inserts, backfills, findings
+
+
+def _case_update(table, column, pairs, placeholder, extra_set=''):
+    """One set-based UPDATE ... SET col = CASE unique_id WHEN ... END for many rows."""
+    cases = ' '.join([f'WHEN {placeholder} THEN {placeholder}'] * len(pairs))
+    keys = ', '.join([placeholder] * len(pairs))
+    params = [v for pair in pairs for v in pair] + [k for k, _ in pairs]
+    sql = (f'UPDATE {table} SET {column} = CASE {KEY_COLUMN} {cases} ELSE {column} END{extra_set} '
+           f'WHERE {KEY_COLUMN} IN ({keys})')
+    return sql, params
+
+
+def build_statements(plan, updates, inserts, backfills, placeholder, now):
+    statements = []
+    for column, pairs in sorted(updates.items()):
+        sql, params = _case_update(TARGET, column, pairs, placeholder, f', modified_at = {placeholder}')
+        # modified_at placeholder sits before the WHERE clause
+        split = 2 * len(pairs)
+        statements.append((sql, params[:split] + [now] + params[split:]))
+    if inserts:
+        columns = sorted({c for record in inserts for c in record}) + ['created_at']
+        row_sql = '(' + ', '.join([placeholder] * len(columns)) + ')'
+        params = [record.get(c) if c != 'created_at' else now for record in inserts for c in columns]
+        statements.append((
+            f"INSERT INTO {TARGET} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(inserts))}",
+            params,
+        ))
+    for table, pairs in sorted(backfills.items()):
+        statements.append(_case_update(table, 'project_id', pairs, placeholder))
+    return statements
+
+
+def apply_statements(conn, dialect, statements):
+    """Run all statements for one chunk in a single transaction."""
+    if not statements:
+        return
+    cur = conn.cursor()
+    try:
+        cur.execute('BEGIN' if dialect == 'sqlite' else 'START TRANSACTION')
+        for sql, params in statements:
+            cur.execute(sql, params)
+        cur.execute('COMMIT')
+    except Exception:
+        cur.execute('ROLLBACK')
+        raise
+    finally:
+        cur.close()
+
+
+def run(chunk_size=DEFAULT_CHUNK_SIZE, apply=False, only=None, report=None, pool=None, extra=False):
+    """Reconcile every chunk. Returns (totals Counter, sample findings)."""
+    plan = Plan(schema_index.load_index(), only, extra)
+    pool = pool or get_pool()
+    totals, samples = Counter(), []
+    for name in plan.dropped:
+        print(f"warning: {name} is not in database_schema.sql, rule skipped", file=sys.stderr)
+
+    with pool.connection() as conn:
+        after = None
+        while True:
+            target_rows = fetch_target_chunk(conn, pool, plan.target_columns, after, chunk_size)
+            # The last chunk is open-ended so source rows beyond the last
+            # process master unique_id are still seen
+            hi = target_rows[-1][KEY_COLUMN] if len(target_rows) == chunk_size else None
+            source_rows = {
+                table: fetch_range(conn, pool, table, columns, order, after, hi)
+                for table, (columns, order) in plan.read_columns.items()
+            }
+            updates, inserts, backfills, findings = reconcile_chunk(plan, target_rows, source_rows, pool.dialect)
+
+            totals['chunks'] += 1
+            totals['rows'] += len(target_rows)
+            for finding in findings:
+                totals[(finding['kind'], finding['table'], finding['column'])] += 1
+                if report:
+                    report.write(json.dumps(finding, default=str) + '\n')
+                if len(samples) < SAMPLE_LINES:
+                    samples.append(finding)
+            if apply:
+                statements = build_statements(plan, updates, inserts, backfills, pool.placeholder,
+                                              datetime.datetime.now().replace(microsecond=0))
+                apply_statements(conn, pool.dialect, statements)
+                totals['statements'] += len(statements)
+                totals['fixed'] += sum(len(p) for p in updates.values()) + len(inserts) + \
+                    sum(len(p) for p in backfills.values())
+            if hi is None:
+                break
+            after = hi
+    return totals, samples
+
+
+def print_report(totals, samples, applied, elapsed):
+    print(f"Checked {totals['rows']} {TARGET} rows in {totals['chunks']} chunk(s), {elapsed:.1f}s")
+    labels = {
+        'field': 'field mismatch',
+        'project_id_blank': 'blank project_id',
+        'project_id_conflict': 'project_id conflict (report only)',
+        'missing_process_master': 'lead without process master row',
+        'orphan': 'no process master row (report only)',
+    }
+    rows = sorted((k, v) for k, v in totals.items() if isinstance(k, tuple))
+    if not rows:
+        print("No discrepancies found.")
+        return
+    print(f"\n{'discrepancy':40} {'table':32} {'column':40} {'count':>7}")
+    for (kind, table, column), count in rows:
+        print(f"{labels[kind]:40} {table:32} {column or '-':40} {count:>7}")
+    print("\nExamples:")
+    for f in samples:
+        detail = f"{f['column']}: {f['current']!r} -> {f['expected']!r} (from {f['source']})" if f['column'] else ''
+        print(f"  [{f['kind']}] {f['table']} {f['unique_id']} {detail}")
+    if applied:
+        print(f"\nApplied {totals['fixed']} fix(es) in {totals['statements']} statement(s).")
+    else:
+        print("\nDry run: nothing was changed. Re-run with --apply to fix.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reconcile process_master_sheet with its source sheets.')
+    parser.add_argument('--apply', action='store_true', help='apply fixes (default is a dry run)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='process master rows per chunk')
+    parser.add_argument('--only', action='append', metavar='TABLE', help='limit to these source tables (repeatable)')
+    parser.add_argument('--report', help='write every discrepancy as JSON lines to this file')
+    parser.add_argument('--extra-rules', action='store_true',
+                        help='also fill sample_id, report release date and lead fields, which '
+                             'GET /api/process-master does not (overwrites Process Master edits)')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.only or []) - set(source_rules(True)) - set(PROJECT_ID_TABLES)
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(sorted(unknown))}")
+
+    started = time.perf_counter()
+    report = open(args.report, 'w', encoding='utf-8') if args.report else None
+    try:
+        totals, samples = run(args.chunk_size, args.apply, args.only, report, extra=args.extra_rules)
+    finally:
+        if report:
+            report.close()
+    print_report(totals, samples, args.apply, time.perf_counter() - started)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,309 @@
+# LeadLab LIMS - Parsed schema index
+#
+# Parses database_schema.sql (the 12 operational tables) and the drizzle
+# models in shared/schema.ts once, and keeps a compact on-disk index of
+#
+#   table -> column -> (camelCase key, label, type, width)
+#
+# plus each table's primary key and indexes. The index is only rebuilt when
+# one of the two source files changes. Mismatches between the SQL schema and
+# the drizzle models are recorded as drift so generators can fail early.
+#
+# Usage:
+#   python schema_index.py                       # build if stale, print summary + drift
+#   python schema_index.py --rebuild             # force a rebuild
+#   python schema_index.py --table finance_sheet # dump one table
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SQL_SCHEMA = os.path.join(ROOT_DIR, 'database_schema.sql')
+DRIZZLE_SCHEMA = os.path.join(ROOT_DIR, 'shared', 'schema.ts')
+INDEX_FILE = os.path.join(ROOT_DIR, '.schema_index.json')
+
+# Bump when the on-disk layout changes so old indexes get rebuilt
+INDEX_VERSION = 1
+
+# Words that are written in upper case in column labels
+ACRONYMS = {
+    'id': 'ID', 'trf': 'TRF', 'tat': 'TAT', 'utr': 'UTR', 'vcf': 'VCF',
+    'cnv': 'CNV', 'gc': 'GC', 'qc': 'QC', 'html': 'HTML', 'url': 'URL',
+}
+
+CREATE_TABLE_RE = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\(', re.I)
+CREATE_INDEX_RE = re.compile(
+    r'CREATE\s+(UNIQUE\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?\s*\(([^)]*)\)', re.I
+)
+KEY_DEF_RE = re.compile(
+    r'^(?:(UNIQUE)\s+)?(?:KEY|INDEX)\s+`?(\w+)`?\s*\(([^)]*)\)|^UNIQUE\s*\(([^)]*)\)', re.I
+)
+PRIMARY_KEY_RE = re.compile(r'^PRIMARY\s+KEY\s*\(([^)]*)\)', re.I)
+COLUMN_RE = re.compile(r'^`?(\w+)`?\s+(\w+(?:\s*\([^)]*\))?(?:\s+UNSIGNED)?)(.*)$', re.I | re.S)
+DRIZZLE_TABLE_RE = re.compile(r'mysqlTable\(\s*["\'](\w+)["\']\s*,\s*\{')
+DRIZZLE_COLUMN_RE = re.compile(r'^\s*(\w+)\s*:\s*\w+\(\s*["\'](\w+)["\']', re.M)
+DRIZZLE_LENGTH_RE = re.compile(r'length:\s*(\d+)')
+
+
+def _strip_sql_comments(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    return re.sub(r'--[^\n]*', '', text)
+
+
+def _balanced_body(text, start, open_ch='(', close_ch=')'):
+    """Return (body, end) for the block whose opening bracket is text[start - 1]."""
+    depth = 1
+    i = start
+    while depth and i < len(text):
+        ch = text[i]
+        if ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+        i += 1
+    return text[start:i - 1], i
+
+
+def _split_top_level(body):
+    parts, depth, current = [], 0, []
+    for ch in body:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    tail = ''.join(current).strip()
+    if tail:
+        parts.append(tail)
+    return parts
+
+
+def _column_list(text):
+    return [c.strip().strip('`').split('(')[0].strip() for c in text.split(',') if c.strip()]
+
+
+def parse_sql_schema(text):
+    """Parse CREATE TABLE / CREATE INDEX statements.
+
+    Returns {table: {'columns': [(name, type)], 'primary_key': [...],
+    'indexes': {name: {'columns': [...], 'unique': bool}}}}.
+    """
+    text = _strip_sql_comments(text)
+    tables = {}
+    for match in CREATE_TABLE_RE.finditer(text):
+        table = match.group(1)
+        body, _ = _balanced_body(text, match.end())
+        info = {'columns': [], 'primary_key': [], 'indexes': {}}
+        for item in _split_top_level(body):
+            item = ' '.join(item.split())
+            pk = PRIMARY_KEY_RE.match(item)
+            if pk:
+                info['primary_key'] = _column_list(pk.group(1))
+                continue
+            key = KEY_DEF_RE.match(item)
+            if key:
+                if key.group(4) is not None:
+                    cols = _column_list(key.group(4))
+                    info['indexes']['uk_' + '_'.join(cols)] = {'columns': cols, 'unique': True}
+                else:
+                    info['indexes'][key.group(2)] = {
+                        'columns': _column_list(key.group(3)),
+                        'unique': bool(key.group(1)),
+                    }
+                continue
+            if re.match(r'^(CONSTRAINT|FOREIGN\s+KEY|CHECK)\b', item, re.I):
+                continue
+            col = COLUMN_RE.match(item)
+            if not col:
+                continue
+            name, col_type, rest = col.group(1), col.group(2), col.group(3)
+            col_type = re.sub(r'\s*,\s*', ',', re.sub(r'\s*\(\s*', '(', col_type.upper()))
+            col_type = col_type.replace(' )', ')')
+            info['columns'].append((name, col_type))
+            rest_upper = rest.upper()
+            if 'PRIMARY KEY' in rest_upper:
+                info['primary_key'] = [name]
+            elif re.search(r'\bUNIQUE\b', rest_upper):
+                info['indexes'][name] = {'columns': [name], 'unique': True}
+        tables[table] = info
+
+    for match in CREATE_INDEX_RE.finditer(text):
+        unique, name, table, cols = match.groups()
+        if table in tables:
+            tables[table]['indexes'][name] = {'columns': _column_list(cols), 'unique': bool(unique)}
+    return tables
+
+
+def parse_drizzle_schema(text):
+    """Parse shared/schema.ts into {table: {sql_column: (camelKey, length)}}."""
+    tables = {}
+    for match in DRIZZLE_TABLE_RE.finditer(text):
+        body, _ = _balanced_body(text, match.end(), '{', '}')
+        columns = {}
+        for line in body.splitlines():
+            col = DRIZZLE_COLUMN_RE.match(line)
+            if not col:
+                continue
+            length = DRIZZLE_LENGTH_RE.search(line)
+            columns[col.group(2).lower()] = (col.group(1), int(length.group(1)) if length else None)
+        tables[match.group(1)] = columns
+    return tables
+
+
+def camel_case(column):
+    head, *rest = column.lower().split('_')
+    return head + ''.join(word.capitalize() for word in rest)
+
+
+def column_label(column):
+    return ' '.join(ACRONYMS.get(word, word.capitalize()) for word in column.lower().split('_') if word)
+
+
+def _varchar_length(col_type):
+    m = re.match(r'VARCHAR\((\d+)\)', col_type)
+    return int(m.group(1)) if m else None
+
+
+def column_width(col_type, label):
+    """Pick a min-width (px) for a header from its SQL type and label."""
+    base = col_type.split('(')[0].split()[0]
+    if base in ('DATE', 'DATETIME', 'TIMESTAMP', 'TIME'):
+        width = 160
+    elif base in ('INT', 'INTEGER', 'BIGINT', 'SMALLINT'):
+        width = 120
+    elif base == 'DECIMAL':
+        width = 140
+    elif base in ('TINYINT', 'BOOLEAN', 'BOOL'):
+        width = 160
+    elif base == 'TEXT':
+        width = 220
+    elif base == 'VARCHAR':
+        length = _varchar_length(col_type) or 255
+        width = 150 if length <= 50 else 160 if length <= 100 else 180 if length <= 255 else 200
+    else:
+        width = 160
+    # Long labels need room to stay on one line (whitespace-nowrap)
+    label_width = min(len(label) * 8 + 40, 320)
+    return max(width, (label_width + 9) // 10 * 10)
+
+
+def build_index(sql_text, drizzle_text):
+    sql_tables = parse_sql_schema(sql_text)
+    drizzle_tables = parse_drizzle_schema(drizzle_text)
+    tables, drift = {}, []
+
+    for table, info in sql_tables.items():
+        model = drizzle_tables.get(table)
+        columns = {}
+        for name, col_type in info['columns']:
+            key = model[name.lower()][0] if model and name.lower() in model else camel_case(name)
+            label = column_label(name)
+            columns[name] = {
+                'key': key,
+                'label': label,
+                'type': col_type,
+                'width': column_width(col_type, label),
+            }
+        tables[table] = {
+            'primary_key': info['primary_key'],
+            'indexes': info['indexes'],
+            'columns': columns,
+        }
+
+        if model is None:
+            continue
+        sql_names = {name.lower(): col_type for name, col_type in info['columns']}
+        for name in sql_names.keys() - model.keys():
+            drift.append(f"{table}.{name}: in database_schema.sql but not in shared/schema.ts")
+        for name in model.keys() - sql_names.keys():
+            drift.append(f"{table}.{name}: in shared/schema.ts but not in database_schema.sql")
+        for name in sql_names.keys() & model.keys():
+            sql_len, ts_len = _varchar_length(sql_names[name]), model[name][1]
+            if sql_len and ts_len and sql_len != ts_len:
+                drift.append(f"{table}.{name}: VARCHAR({sql_len}) in SQL but length {ts_len} in drizzle")
+
+    return {'tables': tables, 'drift': sorted(drift)}
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_stamps():
+    return {
+        os.path.relpath(path, ROOT_DIR): _file_hash(path)
+        for path in (SQL_SCHEMA, DRIZZLE_SCHEMA)
+    }
+
+
+def load_index(rebuild=False):
+    """Return the schema index, rebuilding it only when a source file changed."""
+    stamps = _source_stamps()
+    if not rebuild:
+        try:
+            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION and index.get('sources') == stamps:
+                return index
+        except (OSError, ValueError):
+            pass
+
+    with open(SQL_SCHEMA, 'r', encoding='utf-8') as f:
+        sql_text = f.read()
+    with open(DRIZZLE_SCHEMA, 'r', encoding='utf-8') as f:
+        drizzle_text = f.read()
+    index = build_index(sql_text, drizzle_text)
+    index['version'] = INDEX_VERSION
+    index['sources'] = stamps
+
+    tmp_path = INDEX_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, INDEX_FILE)
+    return index
+
+
+def table_columns(index, table):
+    """Return the ordered column dict for `table`, raising KeyError with context."""
+    try:
+        return index['tables'][table]['columns']
+    except KeyError:
+        raise KeyError(f"Table '{table}' not found in database_schema.sql") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the parsed schema index used by the LIMS generators.')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild even if sources are unchanged')
+    parser.add_argument('--table', help='print the indexed columns of one table')
+    args = parser.parse_args(argv)
+
+    index = load_index(rebuild=args.rebuild)
+    if args.table:
+        try:
+            columns = table_columns(index, args.table)
+        except KeyError as e:
+            parser.error(e.args[0])
+        for name, col in columns.items():
+            print(f"{name:50} {col['key']:45} {col['type']:16} {col['width']:>4}  {col['label']}")
+        return 0
+
+    for table, info in index['tables'].items():
+        print(f"{table}: {len(info['columns'])} columns, {len(info['indexes'])} indexes")
+    if index['drift']:
+        print(f"\nSchema drift ({len(index['drift'])}):")
+        for line in index['drift']:
+            print(f"  {line}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import { SORT_WHITELIST, DEFAULT_SORT } from '@shared/sortWhitelist';
+
+/**
+ * Server-side sorting + keyset pagination for the sheet list endpoints.
+ *
+ * Query parameters (see SORT_QUERY_PARAMS in shared/sortWhitelist.ts):
+ * - sortKey: camelCase column key from the page header (must be whitelisted)
+ * - sortDir: 'asc' | 'desc'
+ * - cursor:  opaque token returned as nextCursor by the previous page
+ * - limit:   page size (default 100, max 1000)
+ *
+ * Rows are ordered by (sort column, tiebreaker) and the next page starts
+ * strictly after the last row of the previous one, so MySQL can walk the
+ * sort index instead of scanning and discarding OFFSET rows.
+ */
+
+const DEFAULT_LIMIT = 100;
+const MAX_LIMIT = 1000;
+const SORT_VALUE_ALIAS = '_sort_value';
+
+export interface KeysetRequest {
+  column: string;
+  // The list endpoint shows a value computed from other sheets under this name
+  derived: boolean;
+  tiebreaker: string;
+  sortKey: string;
+  sortDir: 'asc' | 'desc';
+  cursor: [unknown, unknown] | null;
+  limit: number;
+}
+
+export interface KeysetClause {
+  select: string;
+  where: string;
+  orderBy: string;
+  limit: string;
+  params: any[];
+}
+
+/**
+ * Returns true when the request asks for a server-sorted page rather than
+ * the legacy full list.
+ */
+export function wantsKeysetPage(query: Record<string, unknown>): boolean {
+  return query.sortKey !== undefined || query.cursor !== undefined || query.limit !== undefined;
+}
+
+function decodeCursor(raw: unknown): [unknown, unknown] | null {
+  if (raw === undefined || raw === null || raw === '') return null;
+  try {
+    const decoded = JSON.parse(Buffer.from(String(raw), 'base64url').toString('utf8'));
+    if (Array.isArray(decoded) && decoded.length === 2) return [decoded[0], decoded[1]];
+  } catch {
+    // fall through
+  }
+  throw new Error('Invalid cursor');
+}
+
+// mysql2 materialises DATE/DATETIME in the server's local time zone, so the
+// cursor keeps local wall-clock time rather than UTC
+function formatLocalDateTime(d: Date): string {
+  const pad = (n: number) => String(n).padStart(2, '0');
+  return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())} ${pad(d.getHours())}:${pad(d.getMinutes())}:${pad(d.getSeconds())}`;
+}
+
+function encodeCursor(value: unknown, tiebreak: unknown): string {
+  const normalized = value instanceof Date ? formatLocalDateTime(value) : value;
+  return Buffer.from(JSON.stringify([normalized ?? null, tiebreak]), 'utf8').toString('base64url');
+}
+
+/**
+ * Validates sortKey/sortDir/cursor/limit against the generated whitelist.
+ * Throws on unknown tables, keys or malformed cursors.
+ */
+export function parseKeysetRequest(table: string, query: Record<string, unknown>): KeysetRequest {
+  const spec = SORT_WHITELIST[table];
+  if (!spec) throw new Error(`No sort whitelist for table ${table}`);
+
+  const sortKey = query.sortKey ? String(query.sortKey) : DEFAULT_SORT.sortKey;
+  const entry = spec.columns[sortKey];
+  if (!entry) throw new Error(`Unsupported sortKey: ${sortKey}`);
+
+  const sortDir = query.sortDir === 'asc' ? 'asc' : query.sortDir === 'desc' ? 'desc' : DEFAULT_SORT.sortDir;
+  const requested = parseInt(String(query.limit ?? DEFAULT_LIMIT), 10) || DEFAULT_LIMIT;
+  const limit = Math.min(Math.max(requested, 1), MAX_LIMIT);
+
+  return {
+    column: entry.column,
+    derived: Boolean(entry.derived),
+    tiebreaker: spec.tiebreaker,
+    sortKey,
+    sortDir,
+    cursor: decodeCursor(query.cursor),
+    limit,
+  };
+}
+
+/**
+ * Builds the WHERE / ORDER BY / LIMIT fragments for a keyset page.
+ * `alias` prefixes column names (e.g. 'pm' -> pm.created_at).
+ *
+ * MySQL sorts NULLs first ascending and last descending, so the cursor
+ * predicate has to say on which side of the NULL block the page resumes.
+ */
+export function buildKeysetClause(req: KeysetRequest, alias?: string): KeysetClause {
+  const col = alias ? `${alias}.${req.column}` : req.column;
+  const tie = alias ? `${alias}.${req.tiebreaker}` : req.tiebreaker;
+  const dir = req.sortDir === 'asc' ? 'ASC' : 'DESC';
+  const cmp = req.sortDir === 'asc' ? '>' : '<';
+  const params: any[] = [];
+  let where = '';
+
+  if (req.cursor) {
+    const [value, tiebreak] = req.cursor;
+    if (value === null) {
+      where = req.sortDir === 'asc'
+        ? `((${col} IS NULL AND ${tie} ${cmp} ?) OR ${col} IS NOT NULL)`
+        : `(${col} IS NULL AND ${tie} ${cmp} ?)`;
+      params.push(tiebreak);
+    } else {
+      where = `(${col} ${cmp} ? OR (${col} = ? AND ${tie} ${cmp} ?)${req.sortDir === 'desc' ? ` OR ${col} IS NULL` : ''})`;
+      params.push(value, value, tiebreak);
+    }
+  }
+
+  // The raw sort value is selected separately because list queries may
+  // return a COALESCEd column under the same name. One extra row is fetched
+  // to know whether another page exists.
+  return {
+    select: `${col} AS ${SORT_VALUE_ALIAS}`,
+    where,
+    orderBy: `ORDER BY ${col} ${dir}, ${tie} ${dir}`,
+    limit: `LIMIT ${req.limit + 1}`,
+    params,
+  };
+}
+
+/**
+ * Trims the look-ahead row and computes the cursor for the next page.
+ */
+export function finishKeysetPage<T extends Record<string, any>>(req: KeysetRequest, rows: T[]) {
+  const hasMore = rows.length > req.limit;
+  const page = (hasMore ? rows.slice(0, req.limit) : rows).map(({ [SORT_VALUE_ALIAS]: _, ...row }) => row);
+  const last = hasMore ? rows[req.limit - 1] : undefined;
+  return {
+    rows: page,
+    nextCursor: last ? encodeCursor(last[SORT_VALUE_ALIAS], last[req.tiebreaker]) : null,
+    sortKey: req.sortKey,
+    sortDir: req.sortDir,
+  };
+}
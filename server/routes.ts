@@ -25,6 +25,7 @@ import { db, pool } from './db';
 import { sql } from 'drizzle-orm';
 import { generateRoleId } from './lib/generateRoleId';
 import { generateProjectId } from './lib/generateProjectId';
+import { wantsKeysetPage, parseKeysetRequest, buildKeysetClause, finishKeysetPage, type KeysetRequest } from './lib/keysetPagination';
 import { ensureUploadDirectories, handleFileUpload } from './lib/uploadHandler';
 import xlsx from "xlsx";
 import { ZodError } from 'zod';
@@ -3368,12 +3369,20 @@ export async function registerRoutes(app: Express): Promise<Server> {
   // Process Master Canonical Routes - DYNAMIC aggregation from all source tables
   // This provides real-time updates across all sections
   app.get('/api/process-master', async (req, res) => {
+    // Optional server-side sort + keyset pagination (?sortKey=&sortDir=&cursor=&limit=).
+    // Without those parameters the full list is returned as before.
+    let keyset: KeysetRequest | null = null;
+    try {
+      keyset = wantsKeysetPage(req.query) ? parseKeysetRequest('process_master_sheet', req.query) : null;
+    } catch (error) {
+      return res.status(400).json({ message: (error as Error).message });
+    }
+    const clause = keyset ? buildKeysetClause(keyset, 'pm') : null;
     try {
       // Comprehensive query that aggregates data from all source tables
       // Using subqueries instead of JOINs to avoid row multiplication when labprocess tables have multiple samples per unique_id
       // NOTE: COLLATE clause added to fix collation mismatch between tables
-      const query = `
-        SELECT 
+      const columns = `
           pm.id,
           pm.unique_id,
           pm.project_id,
@@ -3492,17 +3501,32 @@ export async function registerRoutes(app: Express): Promise<Server> {
           pm.created_at,
           pm.created_by,
           pm.modified_at,
-          pm.modified_by
-        FROM process_master_sheet pm
-        ORDER BY pm.created_at DESC
-      `;
-
-      const [rows] = await pool.execute(query);
-      res.json(rows || []);
+          pm.modified_by`;
+      // Keyset pages sort and resume on the value shown. For the COALESCEd
+      // columns above that is not pm.<column>, so the list is wrapped as a
+      // derived table (materialised, then filesorted); plain columns sort on
+      // pm directly and can use their index.
+      const keysetWhere = clause?.where ? `WHERE ${clause.where}` : '';
+      let listQuery = `SELECT ${columns} FROM process_master_sheet pm ORDER BY pm.created_at DESC`;
+      if (keyset && clause) {
+        listQuery = keyset.derived
+          ? `SELECT pm.*, ${clause.select} FROM (SELECT ${columns} FROM process_master_sheet pm) pm ${keysetWhere} ${clause.orderBy} ${clause.limit}`
+          : `SELECT ${columns}, ${clause.select} FROM process_master_sheet pm ${keysetWhere} ${clause.orderBy} ${clause.limit}`;
+      }
+
+      const [rows] = await pool.execute(listQuery, clause?.params ?? []);
+      res.json(keyset ? finishKeysetPage(keyset, rows as any[]) : (rows || []));
     } catch (error) {
       console.error('Failed to fetch process master records:', (error as Error).message);
       // Fallback to basic query if JOINs fail (e.g., missing tables)
       try {
+        if (keyset && clause) {
+          const [rows] = await pool.execute(
+            `SELECT pm.*, ${clause.select} FROM process_master_sheet pm ${clause.where ? `WHERE ${clause.where}` : ''} ${clause.orderBy} ${clause.limit}`,
+            clause.params
+          );
+          return res.json(finishKeysetPage(keyset, rows as any[]));
+        }
         const [rows] = await pool.execute('SELECT * FROM process_master_sheet ORDER BY created_at DESC');
         res.json(rows || []);
       } catch (fallbackError) {
@@ -3877,7 +3901,22 @@ export async function registerRoutes(app: Express): Promise<Server> {
 
   // Finance sheet adapter
   app.get('/api/finance-sheet', async (req, res) => {
+    // Optional server-side sort + keyset pagination, same contract as /api/process-master
+    let keyset: KeysetRequest | null = null;
     try {
+      keyset = wantsKeysetPage(req.query) ? parseKeysetRequest('finance_sheet', req.query) : null;
+    } catch (error) {
+      return res.status(400).json({ message: (error as Error).message });
+    }
+    try {
+      if (keyset) {
+        const clause = buildKeysetClause(keyset);
+        const [rows] = await pool.execute(
+          `SELECT *, ${clause.select} FROM finance_sheet ${clause.where ? `WHERE ${clause.where}` : ''} ${clause.orderBy} ${clause.limit}`,
+          clause.params
+        );
+        return res.json(finishKeysetPage(keyset, rows as any[]));
+      }
       const [rows] = await pool.execute('SELECT * FROM finance_sheet ORDER BY created_at DESC');
       res.json(rows || []);
     } catch (error) {
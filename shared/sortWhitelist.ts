@@ -0,0 +1,222 @@
+// AUTO-GENERATED by header_codegen.py from database_schema.sql. Do not edit by hand.
+//
+// Server-side sort whitelist: maps the sortKey sent by a page header to the
+// SQL column it orders by, plus the index MySQL can use for that order.
+// Only keys listed here are accepted in ORDER BY.
+
+export interface SortColumn {
+  column: string;
+  index: string | null;
+  // Shown COALESCEd from other sheets; sorted on that value, not the raw column
+  derived?: boolean;
+}
+
+export interface SortTable {
+  tiebreaker: string;
+  columns: Record<string, SortColumn>;
+}
+
+// Query parameters understood by keyset-paginated list endpoints
+export const SORT_QUERY_PARAMS = ['sortKey', 'sortDir', 'cursor', 'limit'] as const;
+
+export const DEFAULT_SORT = { sortKey: 'createdAt', sortDir: 'desc' } as const;
+
+export const SORT_WHITELIST: Record<string, SortTable> = {
+  bioinformatics_sheet_clinical: {
+    tiebreaker: 'id',
+    columns: {
+      id: { column: 'id', index: 'PRIMARY' },
+      uniqueId: { column: 'unique_id', index: 'ux_bioinformatics_unique_id' },
+      projectId: { column: 'project_id', index: 'idx_project_id' },
+      sampleId: { column: 'sample_id', index: 'idx_sample_id' },
+      clientId: { column: 'client_id', index: null },
+      organisationHospital: { column: 'organisation_hospital', index: null },
+      clinicianResearcherName: { column: 'clinician_researcher_name', index: null },
+      patientClientName: { column: 'patient_client_name', index: null },
+      age: { column: 'age', index: null },
+      gender: { column: 'gender', index: null },
+      serviceName: { column: 'service_name', index: null },
+      noOfSamples: { column: 'no_of_samples', index: null },
+      sequencingStatus: { column: 'sequencing_status', index: 'idx_sort_sequencing_status' },
+      sequencingDataStorageDate: { column: 'sequencing_data_storage_date', index: 'idx_sort_sequencing_data_storage_date' },
+      basecalling: { column: 'basecalling', index: null },
+      basecallingDataStorageDate: { column: 'basecalling_data_storage_date', index: 'idx_sort_basecalling_data_storage_date' },
+      workflowType: { column: 'workflow_type', index: null },
+      analysisStatus: { column: 'analysis_status', index: 'idx_sort_analysis_status' },
+      analysisDate: { column: 'analysis_date', index: 'idx_sort_analysis_date' },
+      thirdPartyName: { column: 'third_party_name', index: null },
+      sampleSentToThirdPartyDate: { column: 'sample_sent_to_third_party_date', index: 'idx_sort_sample_sent_to_third_party_date' },
+      thirdPartyTrf: { column: 'third_party_trf', index: null },
+      resultsRawDataReceivedFromThirdPartyDate: { column: 'results_raw_data_received_from_third_party_date', index: 'idx_sort_results_raw_data_received_from_third_party_date' },
+      thirdPartyReport: { column: 'third_party_report', index: null },
+      tat: { column: 'tat', index: null },
+      vcfFileLink: { column: 'vcf_file_link', index: null },
+      cnvStatus: { column: 'cnv_status', index: 'idx_sort_cnv_status' },
+      progenicsRawData: { column: 'progenics_raw_data', index: null },
+      progenicsRawDataSize: { column: 'progenics_raw_data_size', index: null },
+      progenicsRawDataLink: { column: 'progenics_raw_data_link', index: null },
+      analysisHtmlLink: { column: 'analysis_html_link', index: null },
+      relativeAbundanceSheet: { column: 'relative_abundance_sheet', index: null },
+      dataAnalysisSheet: { column: 'data_analysis_sheet', index: null },
+      alertToTechnicalLeadd: { column: 'alert_to_technical_leadd', index: null },
+      alertToReportTeam: { column: 'alert_to_report_team', index: null },
+      createdAt: { column: 'created_at', index: 'idx_sort_created_at' },
+      createdBy: { column: 'created_by', index: null },
+      modifiedAt: { column: 'modified_at', index: 'idx_sort_modified_at' },
+      modifiedBy: { column: 'modified_by', index: null },
+    },
+  },
+  finance_sheet: {
+    tiebreaker: 'id',
+    columns: {
+      id: { column: 'id', index: 'PRIMARY' },
+      uniqueId: { column: 'unique_id', index: 'ux_finance_unique_id' },
+      projectId: { column: 'project_id', index: 'idx_project_id' },
+      sampleCollectionDate: { column: 'sample_collection_date', index: 'idx_sort_sample_collection_date' },
+      organisationHospital: { column: 'organisation_hospital', index: null },
+      clinicianResearcherName: { column: 'clinician_researcher_name', index: null },
+      clinicianResearcherEmail: { column: 'clinician_researcher_email', index: null },
+      clinicianResearcherPhone: { column: 'clinician_researcher_phone', index: null },
+      clinicianResearcherAddress: { column: 'clinician_researcher_address', index: null },
+      patientClientName: { column: 'patient_client_name', index: null },
+      patientClientEmail: { column: 'patient_client_email', index: null },
+      patientClientPhone: { column: 'patient_client_phone', index: null },
+      patientClientAddress: { column: 'patient_client_address', index: null },
+      serviceName: { column: 'service_name', index: null },
+      budget: { column: 'budget', index: null },
+      phlebotomistCharges: { column: 'phlebotomist_charges', index: null },
+      salesResponsiblePerson: { column: 'sales_responsible_person', index: null },
+      sampleShipmentAmount: { column: 'sample_shipment_amount', index: null },
+      invoiceNumber: { column: 'invoice_number', index: 'idx_invoice_number' },
+      invoiceAmount: { column: 'invoice_amount', index: null },
+      invoiceDate: { column: 'invoice_date', index: 'idx_sort_invoice_date' },
+      paymentReceiptAmount: { column: 'payment_receipt_amount', index: null },
+      balanceAmount: { column: 'balance_amount', index: null },
+      paymentReceiptDate: { column: 'payment_receipt_date', index: 'idx_sort_payment_receipt_date' },
+      modeOfPayment: { column: 'mode_of_payment', index: null },
+      transactionalNumber: { column: 'transactional_number', index: null },
+      balanceAmountReceivedDate: { column: 'balance_amount_received_date', index: 'idx_sort_balance_amount_received_date' },
+      totalAmountReceivedStatus: { column: 'total_amount_received_status', index: 'idx_sort_total_amount_received_status' },
+      utrDetails: { column: 'utr_details', index: null },
+      thirdPartyCharges: { column: 'third_party_charges', index: null },
+      otherCharges: { column: 'other_charges', index: null },
+      otherChargesReason: { column: 'other_charges_reason', index: null },
+      thirdPartyName: { column: 'third_party_name', index: null },
+      thirdPartyPhone: { column: 'third_party_phone', index: null },
+      thirdPartyPaymentDate: { column: 'third_party_payment_date', index: 'idx_sort_third_party_payment_date' },
+      thirdPartyPaymentStatus: { column: 'third_party_payment_status', index: 'idx_sort_third_party_payment_status' },
+      alertToLabprocessTeam: { column: 'alert_to_labprocess_team', index: null },
+      alertToReportTeam: { column: 'alert_to_report_team', index: null },
+      alertToTechnicalLead: { column: 'alert_to_technical_lead', index: null },
+      createdAt: { column: 'created_at', index: 'idx_sort_created_at' },
+      createdBy: { column: 'created_by', index: null },
+      modifiedAt: { column: 'modified_at', index: 'idx_sort_modified_at' },
+      modifiedBy: { column: 'modified_by', index: null },
+    },
+  },
+  nutritional_management: {
+    tiebreaker: 'id',
+    columns: {
+      id: { column: 'id', index: 'PRIMARY' },
+      uniqueId: { column: 'unique_id', index: 'ux_nutritional_management_unique_id' },
+      projectId: { column: 'project_id', index: 'idx_project_id' },
+      sampleId: { column: 'sample_id', index: 'idx_sample_id' },
+      serviceName: { column: 'service_name', index: null },
+      patientClientName: { column: 'patient_client_name', index: null },
+      age: { column: 'age', index: null },
+      gender: { column: 'gender', index: null },
+      progenicsTrf: { column: 'progenics_trf', index: null },
+      questionnaireCallRecording: { column: 'questionnaire_call_recording', index: null },
+      dataAnalysisSheet: { column: 'data_analysis_sheet', index: null },
+      progenicsReport: { column: 'progenics_report', index: null },
+      nutritionChart: { column: 'nutrition_chart', index: null },
+      counsellingSessionDate: { column: 'counselling_session_date', index: 'idx_sort_counselling_session_date' },
+      furtherCounsellingRequired: { column: 'further_counselling_required', index: null },
+      counsellingStatus: { column: 'counselling_status', index: 'idx_sort_counselling_status' },
+      counsellingSessionRecording: { column: 'counselling_session_recording', index: null },
+      alertToTechnicalLead: { column: 'alert_to_technical_lead', index: null },
+      alertToReportTeam: { column: 'alert_to_report_team', index: null },
+      createdAt: { column: 'created_at', index: 'idx_sort_created_at' },
+      createdBy: { column: 'created_by', index: null },
+      modifiedAt: { column: 'modified_at', index: 'idx_sort_modified_at' },
+      modifiedBy: { column: 'modified_by', index: null },
+    },
+  },
+  process_master_sheet: {
+    tiebreaker: 'id',
+    columns: {
+      id: { column: 'id', index: 'PRIMARY' },
+      uniqueId: { column: 'unique_id', index: 'ux_process_unique_id' },
+      projectId: { column: 'project_id', index: 'idx_project_id' },
+      sampleId: { column: 'sample_id', index: 'idx_sample_id' },
+      clientId: { column: 'client_id', index: null, derived: true },
+      organisationHospital: { column: 'organisation_hospital', index: null, derived: true },
+      clinicianResearcherName: { column: 'clinician_researcher_name', index: null, derived: true },
+      speciality: { column: 'speciality', index: null },
+      clinicianResearcherEmail: { column: 'clinician_researcher_email', index: null },
+      clinicianResearcherPhone: { column: 'clinician_researcher_phone', index: null, derived: true },
+      clinicianResearcherAddress: { column: 'clinician_researcher_address', index: null },
+      patientClientName: { column: 'patient_client_name', index: null, derived: true },
+      age: { column: 'age', index: null },
+      gender: { column: 'gender', index: null },
+      patientClientEmail: { column: 'patient_client_email', index: null },
+      patientClientPhone: { column: 'patient_client_phone', index: null, derived: true },
+      patientClientAddress: { column: 'patient_client_address', index: null },
+      sampleCollectionDate: { column: 'sample_collection_date', index: null, derived: true },
+      sampleReceviedDate: { column: 'sample_recevied_date', index: null, derived: true },
+      serviceName: { column: 'service_name', index: null, derived: true },
+      sampleType: { column: 'sample_type', index: null, derived: true },
+      noOfSamples: { column: 'no_of_samples', index: null, derived: true },
+      tat: { column: 'tat', index: null },
+      salesResponsiblePerson: { column: 'sales_responsible_person', index: null, derived: true },
+      progenicsTrf: { column: 'progenics_trf', index: null, derived: true },
+      thirdPartyTrf: { column: 'third_party_trf', index: null, derived: true },
+      progenicsReport: { column: 'progenics_report', index: null },
+      sampleSentToThirdPartyDate: { column: 'sample_sent_to_third_party_date', index: null, derived: true },
+      thirdPartyName: { column: 'third_party_name', index: null, derived: true },
+      thirdPartyReport: { column: 'third_party_report', index: null, derived: true },
+      resultsRawDataReceivedFromThirdPartyDate: { column: 'results_raw_data_received_from_third_party_date', index: 'idx_sort_results_raw_data_received_from_third_party_date' },
+      logisticStatus: { column: 'logistic_status', index: 'idx_sort_logistic_status' },
+      financeStatus: { column: 'finance_status', index: null, derived: true },
+      labProcessStatus: { column: 'lab_process_status', index: null, derived: true },
+      bioinformaticsStatus: { column: 'bioinformatics_status', index: null, derived: true },
+      nutritionalManagementStatus: { column: 'nutritional_management_status', index: null, derived: true },
+      progenicsReportReleaseDate: { column: 'progenics_report_release_date', index: 'idx_sort_progenics_report_release_date' },
+      createdAt: { column: 'created_at', index: 'idx_sort_created_at' },
+      createdBy: { column: 'created_by', index: null },
+      modifiedAt: { column: 'modified_at', index: 'idx_sort_modified_at' },
+      modifiedBy: { column: 'modified_by', index: null },
+    },
+  },
+  report_management: {
+    tiebreaker: 'unique_id',
+    columns: {
+      uniqueId: { column: 'unique_id', index: 'PRIMARY' },
+      projectId: { column: 'project_id', index: null },
+      reportReleaseDate: { column: 'report_release_date', index: 'idx_sort_report_release_date' },
+      organisationHospital: { column: 'organisation_hospital', index: null },
+      clinicianResearcherName: { column: 'clinician_researcher_name', index: null },
+      clinicianResearcherEmail: { column: 'clinician_researcher_email', index: null },
+      clinicianResearcherPhone: { column: 'clinician_researcher_phone', index: null },
+      patientClientName: { column: 'patient_client_name', index: null },
+      age: { column: 'age', index: null },
+      gender: { column: 'gender', index: null },
+      patientClientEmail: { column: 'patient_client_email', index: null },
+      patientClientPhone: { column: 'patient_client_phone', index: null },
+      geneticCounselorRequired: { column: 'genetic_counselor_required', index: null },
+      nutritionalCounsellingRequired: { column: 'nutritional_counselling_required', index: null },
+      serviceName: { column: 'service_name', index: null },
+      tat: { column: 'tat', index: null },
+      sampleType: { column: 'sample_type', index: null },
+      noOfSamples: { column: 'no_of_samples', index: null },
+      sampleId: { column: 'sample_id', index: null },
+      sampleReceivedDate: { column: 'sample_received_date', index: 'idx_sort_sample_received_date' },
+      progenicsTrf: { column: 'progenics_trf', index: null },
+      approvalFromFinance: { column: 'approval_from_finance', index: null },
+      salesResponsiblePerson: { column: 'sales_responsible_person', index: null },
+      leadCreatedBy: { column: 'lead_created_by', index: null },
+      leadModified: { column: 'lead_modified', index: 'idx_sort_lead_modified' },
+      createdAt: { column: 'created_at', index: 'idx_sort_created_at' },
+    },
+  },
+};
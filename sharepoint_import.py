@@ -0,0 +1,645 @@
+# LeadLab LIMS - SharePoint workbook importer
+#
+# Streams the SharePoint exports in "sharepoint sheets/" straight into MySQL.
+# Workbooks are opened in openpyxl read-only mode and consumed row by row, so
+# memory stays bounded by the batch size rather than the workbook size. Rows
+# are written as batched multi-row upserts keyed on unique_id; with
+# --load-data, each workbook is bulk loaded through LOAD DATA LOCAL INFILE
+# into a staging table and merged with a single INSERT ... SELECT.
+#
+# Column types come from the parsed schema index (schema_index.py) and the
+# connection from the shared pool (database_config.py).
+#
+# Usage:
+#   python sharepoint_import.py                          # every mapped workbook
+#   python sharepoint_import.py Lab_Finance.xlsx         # selected workbooks
+#   python sharepoint_import.py --dry-run                # parse and count only
+#   python sharepoint_import.py --load-data              # LOAD DATA fast path (MySQL)
+#   python sharepoint_import.py --batch-size 5000
+#   python sharepoint_import.py --delta                  # only changed rows (nightly sync)
+#   python sharepoint_import.py --delta --no-delete      # report removed rows, keep them
+#
+# Delta mode keeps a sidecar index (.sharepoint_sync_index.json) of
+# (workbook, unique_id) -> row hash plus each workbook's mtime/size. Unchanged
+# workbooks are skipped without being opened; changed ones are diffed against
+# the index and only inserted, updated and deleted rows hit the database.
+
+import argparse
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import schema_index
+from database_config import get_config, get_pool, mysql_creator
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SHEETS_DIR = os.path.join(ROOT_DIR, 'sharepoint sheets')
+
+SYNC_INDEX_FILE = os.path.join(ROOT_DIR, '.sharepoint_sync_index.json')
+
+DEFAULT_BATCH_SIZE = 1000
+KEY_COLUMN = 'unique_id'
+
+# Bump when the sync index layout changes so old indexes are discarded
+SYNC_INDEX_VERSION = 1
+
+# Workbook file name -> target table
+WORKBOOKS = {
+    'Process_Master_sheet_Clinical.xlsx': 'process_master_sheet',
+    'Process_Master_sheet_Discovery.xlsx': 'process_master_sheet',
+    'Lab_Finance.xlsx': 'finance_sheet',
+    'Lab process_Clinical_Samples.xlsx': 'labprocess_clinical_sheet',
+    'Lab process_Discovery Samples.xlsx': 'labprocess_discovery_sheet',
+}
+
+# Normalised sheet header -> column, per target table. Headers are compared
+# lower-cased with whitespace (including non-breaking spaces) collapsed.
+# SharePoint bookkeeping columns (Title, Item Type, Path) are ignored.
+HEADER_MAPS = {
+    'process_master_sheet': {
+        'unique id': 'unique_id',
+        'project id': 'project_id',
+        'sample id': 'sample_id',
+        'date of sample collected': 'sample_collection_date',
+        'sample type': 'sample_type',
+        'no of samples': 'no_of_samples',
+        'organization name': 'organisation_hospital',
+        'client name': 'clinician_researcher_name',
+        'specialty': 'speciality',
+        'email address': 'clinician_researcher_email',
+        'email': 'clinician_researcher_email',
+        'phone number': 'clinician_researcher_phone',
+        'address': 'clinician_researcher_address',
+        'patient name': 'patient_client_name',
+        'age': 'age',
+        'gender': 'gender',
+        'patients mail id': 'patient_client_email',
+        'patients phone number': 'patient_client_phone',
+        'service name': 'service_name',
+        'progenics_trf': 'progenics_trf',
+        'third party_trf': 'third_party_trf',
+        'created on': 'created_at',
+        'sales or responsible person': 'sales_responsible_person',
+        'sales person': 'sales_responsible_person',
+        'report': 'progenics_report',
+        'report: third party name': 'third_party_name',
+        'report: date of sample sent to third party': 'sample_sent_to_third_party_date',
+        'report: date of report released from progenics': 'progenics_report_release_date',
+        'report: labprocess status': 'lab_process_status',
+        'report: raw data received date': 'results_raw_data_received_from_third_party_date',
+        'logistics update': 'logistic_status',
+        'finance approval': 'finance_status',
+        'labprocess update': 'lab_process_status',
+        'technical(discovery) update': 'bioinformatics_status',
+        'nutrition sheet update': 'nutritional_management_status',
+    },
+    'finance_sheet': {
+        'unique id': 'unique_id',
+        'date': 'sample_collection_date',
+        'organization name': 'organisation_hospital',
+        'client name': 'clinician_researcher_name',
+        'address': 'clinician_researcher_address',
+        'patient name': 'patient_client_name',
+        'mobile number': 'patient_client_phone',
+        'service requested': 'service_name',
+        'budget': 'budget',
+        'sales or responsible person': 'sales_responsible_person',
+        'invoice number': 'invoice_number',
+        'invoice amount': 'invoice_amount',
+        'invoice date': 'invoice_date',
+        'payment receipt amount': 'payment_receipt_amount',
+        'balance_amount': 'balance_amount',
+        'payment receipt date': 'payment_receipt_date',
+        'mode of payment': 'mode_of_payment',
+        'transactional number': 'transactional_number',
+        'balance amount received date': 'balance_amount_received_date',
+        'total amount received status': 'total_amount_received_status',
+        'phlebotomist charges': 'phlebotomist_charges',
+        'courier charges': 'sample_shipment_amount',
+        'third party charges': 'third_party_charges',
+        'other charges reason': 'other_charges_reason',
+        'third party servicer name': 'third_party_name',
+        'contact person details': 'third_party_phone',
+        'third party payment date': 'third_party_payment_date',
+        'third party payment status': 'third_party_payment_status',
+        'approve to labprocess team': 'alert_to_labprocess_team',
+        'approve to report process team': 'alert_to_report_team',
+        'created': 'created_at',
+        'modified': 'modified_at',
+    },
+    'labprocess_clinical_sheet': {
+        'unique id': 'unique_id',
+        'sample id': 'sample_id',
+        'sample type': 'sample_type',
+        'service name': 'service_name',
+        'date of sample reached': 'sample_received_date',
+        'protocol (dna extraction)': 'extraction_protocol',
+        'isolation': 'extraction_process',
+        'quality check_dna': 'extraction_quality_check',
+        'status(dna extraction)': 'extraction_qc_status',
+        'protocol 2': 'library_preparation_protocol',
+        'library preparation': 'library_preparation_process',
+        'quality check 2': 'library_preparation_quality_check',
+        'status(library preparation)': 'library_preparation_qc_status',
+        'purification protocol': 'purification_protocol',
+        'quality check of purified product': 'purification_quality_check',
+        'progenics trf': 'progenics_trf',
+    },
+    'labprocess_discovery_sheet': {
+        'unique id': 'unique_id',
+        'project id': 'project_id',
+        'client id': 'client_id',
+        'sample id': 'sample_id',
+        'no of samples': 'no_of_samples',
+        'sample type': 'sample_type',
+        'service name': 'service_name',
+        'date of sample reached': 'sample_received_date',
+        'protocol': 'extraction_protocol',
+        'isolation': 'extraction_process',
+        'quality check': 'extraction_quality_check',
+        'status': 'extraction_qc_status',
+        'protocol 2': 'library_preparation_protocol',
+        'library preparation': 'library_preparation_process',
+        'quality check 2': 'library_preparation_quality_check',
+        'status 2': 'library_preparation_qc_status',
+        'purification protocol': 'purification_protocol',
+        'quality check of purified product': 'purification_quality_check',
+        'alert to technical team': 'alert_to_technical_leadd',
+        'progenics trf': 'progenics_trf',
+    },
+}
+
+# NOT NULL columns the sheets do not carry. Used on insert only, so existing
+# values are never overwritten by the placeholder.
+INSERT_DEFAULTS = {
+    'finance_sheet': {'project_id': ''},
+}
+
+TRUE_WORDS = {'1', 'true', 'yes', 'y', 'approved', 'completed', 'done', 'received', 'paid'}
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%d.%m.%Y', '%d-%b-%Y', '%d %b %Y')
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%d-%m-%Y %H:%M', '%d/%m/%Y %H:%M')
+
+
+class HeaderError(ValueError):
+    """The workbook's header row cannot be mapped onto its table."""
+
+
+def normalize_header(header):
+    return ' '.join(str(header or '').replace('\xa0', ' ').split()).lower()
+
+
+def _parse_date(value, with_time):
+    if isinstance(value, datetime.datetime):
+        return value if with_time else value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = str(value).strip()
+    for fmt in (DATETIME_FORMATS + DATE_FORMATS) if with_time else (DATE_FORMATS + DATETIME_FORMATS):
+        try:
+            parsed = datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return parsed if with_time else parsed.date()
+    return None
+
+
+def convert_value(value, col_type):
+    """Coerce a cell value to what MySQL expects for `col_type`.
+
+    Unparseable numbers and dates become NULL rather than failing the batch.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return None
+    base = col_type.split('(')[0].split()[0]
+    if base in ('DATE',):
+        return _parse_date(value, with_time=False)
+    if base in ('DATETIME', 'TIMESTAMP'):
+        return _parse_date(value, with_time=True)
+    if base == 'TINYINT' or base in ('BOOLEAN', 'BOOL'):
+        if isinstance(value, (int, float)):
+            return 1 if value else 0
+        return 1 if str(value).strip().lower() in TRUE_WORDS else 0
+    if base in ('INT', 'INTEGER', 'BIGINT', 'SMALLINT'):
+        try:
+            return int(float(str(value).replace(',', '')))
+        except ValueError:
+            return None
+    if base == 'DECIMAL':
+        try:
+            return decimal.Decimal(re.sub(r'[^\d.\-]', '', str(value)) or 'x')
+        except decimal.InvalidOperation:
+            return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value)
+    m = re.match(r'VARCHAR\((\d+)\)', col_type)
+    if m and len(text) > int(m.group(1)):
+        text = text[:int(m.group(1))]
+    return text
+
+
+def open_rows(path):
+    """Yield raw row tuples (header first) from the first worksheet, streaming."""
+    from openpyxl import load_workbook  # optional dependency, only needed for imports
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def plan_columns(header_row, table, index):
+    """Return [(position, column, type)] for the headers we can map."""
+    header_map = HEADER_MAPS[table]
+    column_types = {name: col['type'] for name, col in schema_index.table_columns(index, table).items()}
+    plan, seen = [], set()
+    for position, header in enumerate(header_row):
+        column = header_map.get(normalize_header(header))
+        if column and column not in seen and column in column_types:
+            plan.append((position, column, column_types[column]))
+            seen.add(column)
+    if KEY_COLUMN not in seen:
+        raise HeaderError(f"No '{KEY_COLUMN}' column found in the sheet headers for {table}")
+    return plan
+
+
+def iter_records(path, table, index, stats=None):
+    """Yield (columns, values_tuple) for every row that has a unique_id."""
+    rows = open_rows(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    plan = plan_columns(header, table, index)
+    columns = [column for _, column, _ in plan]
+    key_pos = columns.index(KEY_COLUMN)
+    for row in rows:
+        values = tuple(
+            convert_value(row[position] if position < len(row) else None, col_type)
+            for position, _, col_type in plan
+        )
+        if stats is not None:
+            stats['read'] += 1
+        if values[key_pos] is None:
+            if stats is not None:
+                stats['skipped'] += 1
+            continue
+        yield columns, values
+
+
+def upsert_sql(table, columns, row_count, dialect, insert_only=()):
+    """Build a multi-row upsert keyed on unique_id for `row_count` rows."""
+    placeholder = '?' if dialect == 'sqlite' else '%s'
+    row_sql = '(' + ', '.join([placeholder] * len(columns)) + ')'
+    values_sql = ', '.join([row_sql] * row_count)
+    updates = [c for c in columns if c != KEY_COLUMN and c not in insert_only]
+    col_list = ', '.join(columns)
+    if dialect == 'sqlite':
+        update_sql = ', '.join(f'{c} = excluded.{c}' for c in updates) or f'{KEY_COLUMN} = excluded.{KEY_COLUMN}'
+        return f'INSERT INTO {table} ({col_list}) VALUES {values_sql} ON CONFLICT({KEY_COLUMN}) DO UPDATE SET {update_sql}'
+    update_sql = ', '.join(f'{c} = VALUES({c})' for c in updates) or f'{KEY_COLUMN} = {KEY_COLUMN}'
+    return f'INSERT INTO {table} ({col_list}) VALUES {values_sql} ON DUPLICATE KEY UPDATE {update_sql}'
+
+
+def _with_defaults(table, columns, records):
+    defaults = {k: v for k, v in INSERT_DEFAULTS.get(table, {}).items() if k not in columns}
+    if not defaults:
+        return columns, records, ()
+    extra = tuple(defaults.values())
+    return columns + list(defaults), [values + extra for values in records], tuple(defaults)
+
+
+def write_batch(conn, table, columns, records, dialect):
+    """Upsert `records` (list of value tuples) in one statement and commit."""
+    if not records:
+        return 0
+    columns, records, insert_only = _with_defaults(table, list(columns), records)
+    sql = upsert_sql(table, columns, len(records), dialect, insert_only)
+    params = [value for values in records for value in values]
+    cur = conn.cursor()
+    try:
+        # Pooled connections run in autocommit mode, so open the transaction explicitly
+        cur.execute('BEGIN' if dialect == 'sqlite' else 'START TRANSACTION')
+        cur.execute(sql, params)
+        cur.execute('COMMIT')
+    except Exception:
+        cur.execute('ROLLBACK')
+        raise
+    finally:
+        cur.close()
+    return len(records)
+
+
+def import_workbook(path, table, index, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, pool=None):
+    """Stream one workbook into `table`. Returns a stats dict."""
+    stats = {'read': 0, 'skipped': 0, 'written': 0, 'batches': 0}
+    pool = pool or (None if dry_run else get_pool())
+    batch, columns = [], None
+
+    def flush(conn):
+        stats['written'] += write_batch(conn, table, columns, batch, pool.dialect)
+        stats['batches'] += 1
+        batch.clear()
+
+    if dry_run:
+        for columns, values in iter_records(path, table, index, stats):
+            stats['written'] += 1
+        return stats
+
+    with pool.connection() as conn:
+        for columns, values in iter_records(path, table, index, stats):
+            batch.append(values)
+            if len(batch) >= batch_size:
+                flush(conn)
+        if batch:
+            flush(conn)
+    return stats
+
+
+def delete_batch(conn, table, keys, dialect):
+    """Delete rows whose unique_id is in `keys` in one statement and commit."""
+    if not keys:
+        return 0
+    placeholder = '?' if dialect == 'sqlite' else '%s'
+    sql = f"DELETE FROM {table} WHERE {KEY_COLUMN} IN ({', '.join([placeholder] * len(keys))})"
+    cur = conn.cursor()
+    try:
+        cur.execute('BEGIN' if dialect == 'sqlite' else 'START TRANSACTION')
+        cur.execute(sql, list(keys))
+        cur.execute('COMMIT')
+    except Exception:
+        cur.execute('ROLLBACK')
+        raise
+    finally:
+        cur.close()
+    return len(keys)
+
+
+# -- delta sync --------------------------------------------------------------
+
+def row_hash(columns, values):
+    """Stable content hash of one mapped row (column order included)."""
+    payload = json.dumps([columns, values], default=str, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def mapping_hash(table, index):
+    """Changes whenever the header map or the schema behind it changes."""
+    payload = json.dumps([HEADER_MAPS[table], INSERT_DEFAULTS.get(table), index.get('sources')], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_sync_index(path=SYNC_INDEX_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == SYNC_INDEX_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': SYNC_INDEX_VERSION, 'workbooks': {}}
+
+
+def save_sync_index(state, path=SYNC_INDEX_FILE):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def diff_workbook(path, table, index, previous, stats):
+    """Compare a workbook with its previous row hashes.
+
+    Returns (columns, upserts, deletes, hashes) where `upserts` holds value
+    tuples for new or changed rows, `deletes` the unique_ids that disappeared
+    and `hashes` the new unique_id -> hash map to persist.
+    """
+    hashes, upserts, columns = {}, {}, None
+    for columns, values in iter_records(path, table, index, stats):
+        key = str(values[columns.index(KEY_COLUMN)])
+        digest = row_hash(columns, values)
+        hashes[key] = digest
+        if previous.get(key) == digest:
+            upserts.pop(key, None)  # a later duplicate restored the stored content
+            continue
+        upserts[key] = values  # duplicates: the last occurrence wins, as in every import path
+    # Counted once per unique_id, after duplicates have settled
+    updated = sum(1 for key in upserts if key in previous)
+    stats['updated'] += updated
+    stats['inserted'] += len(upserts) - updated
+    deletes = [key for key in previous if key not in hashes]
+    return columns, list(upserts.values()), deletes, hashes
+
+
+def sync_workbook(path, table, index, state, batch_size=DEFAULT_BATCH_SIZE,
+                  dry_run=False, delete=True, pool=None):
+    """Apply only what changed in one workbook since the last delta sync.
+
+    Updates `state` in place; the caller persists it once the database
+    writes have committed.
+    """
+    stats = {'read': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'deleted': 0,
+             'written': 0, 'batches': 0, 'unchanged_file': False}
+    name = os.path.basename(path)
+    st = os.stat(path)
+    mapping = mapping_hash(table, index)
+    entry = state['workbooks'].get(name)
+    if entry and entry['mtime'] == st.st_mtime and entry['size'] == st.st_size and entry['mapping'] == mapping:
+        stats['unchanged_file'] = True
+        return stats
+
+    previous = entry['rows'] if entry and entry['mapping'] == mapping else {}
+    columns, upserts, deletes, hashes = diff_workbook(path, table, index, previous, stats)
+
+    # Another workbook feeding the same table (clinical / discovery process
+    # master) may still carry a row that vanished from this one
+    still_owned = set()
+    for other_name, other in state['workbooks'].items():
+        if other_name != name and other.get('table') == table:
+            still_owned.update(other['rows'])
+    deletes = [key for key in deletes if key not in still_owned]
+    stats['deleted'] = len(deletes) if delete else 0
+    if not delete:
+        # Keep reporting them on the next run rather than forgetting them
+        hashes.update({key: previous[key] for key in deletes})
+        stats['kept'] = len(deletes)
+
+    if not dry_run:
+        pool = pool or get_pool()
+        with pool.connection() as conn:
+            for start in range(0, len(upserts), batch_size):
+                stats['written'] += write_batch(conn, table, columns, upserts[start:start + batch_size], pool.dialect)
+                stats['batches'] += 1
+            if delete:
+                for start in range(0, len(deletes), batch_size):
+                    delete_batch(conn, table, deletes[start:start + batch_size], pool.dialect)
+                    stats['batches'] += 1
+        state['workbooks'][name] = {
+            'table': table,
+            'mtime': st.st_mtime,
+            'size': st.st_size,
+            'mapping': mapping,
+            'rows': hashes,
+        }
+    return stats
+
+
+def _tsv_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def load_data_workbook(path, table, index):
+    """Fast path: LOAD DATA LOCAL INFILE into a staging table, then merge.
+
+    Needs a MySQL server with local_infile enabled; uses its own connection
+    because the pooled ones are opened without local_infile.
+    """
+    stats = {'read': 0, 'skipped': 0, 'written': 0, 'batches': 1}
+    columns = None
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, encoding='utf-8', newline='') as tmp:
+        for columns, values in iter_records(path, table, index, stats):
+            tmp.write('\t'.join(_tsv_value(v) for v in values) + '\n')
+            stats['written'] += 1
+        tmp_path = tmp.name
+    try:
+        if columns is None:
+            return stats
+        config = get_config()
+        config['local_infile'] = True
+        config['autocommit'] = False
+        conn = mysql_creator(config)()
+        try:
+            columns_all, _, insert_only = _with_defaults(table, list(columns), [])
+            stage = f'_stage_{table}'
+            col_list = ', '.join(columns)
+            updates = ', '.join(f'{c} = VALUES({c})' for c in columns if c != KEY_COLUMN)
+            select_list = ', '.join(
+                columns + [f"'{v}'" for k, v in INSERT_DEFAULTS.get(table, {}).items() if k in insert_only]
+            )
+            cur = conn.cursor()
+            cur.execute(f'CREATE TEMPORARY TABLE {stage} LIKE {table}')
+            cur.execute(
+                # REPLACE: a unique_id listed twice keeps its last row, like the
+                # batched upsert (LOCAL alone would keep the first)
+                f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE {stage} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({col_list})",
+                (tmp_path,),
+            )
+            cur.execute(
+                f'INSERT INTO {table} ({", ".join(columns_all)}) SELECT {select_list} FROM {stage} '
+                f'ON DUPLICATE KEY UPDATE {updates or f"{KEY_COLUMN} = {KEY_COLUMN}"}'
+            )
+            cur.execute(f'DROP TEMPORARY TABLE {stage}')
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        os.unlink(tmp_path)
+    return stats
+
+
+def resolve_workbooks(names, sheets_dir):
+    """Return [(path, table)] for the requested workbooks (default: all mapped).
+
+    Bare names resolve under `sheets_dir`, so a same-named copy in the current
+    directory is never picked up by accident; pass a path (with a directory
+    part) to import a workbook from elsewhere.
+    """
+    selected = names or list(WORKBOOKS)
+    resolved = []
+    for name in selected:
+        base = os.path.basename(name)
+        if base not in WORKBOOKS:
+            raise ValueError(f"No mapping for workbook '{base}'. Mapped: {', '.join(WORKBOOKS)}")
+        path = name if base != name else os.path.join(sheets_dir, base)
+        if not os.path.exists(path):
+            raise ValueError(f"Workbook not found: {path}")
+        resolved.append((path, WORKBOOKS[base]))
+    return resolved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stream SharePoint workbooks into the LIMS database.')
+    parser.add_argument('workbooks', nargs='*', help='workbook files or names (default: all mapped workbooks)')
+    parser.add_argument('--dir', default=SHEETS_DIR, help='directory holding the SharePoint exports')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='rows per multi-row upsert')
+    parser.add_argument('--dry-run', action='store_true', help='parse and map rows without writing')
+    parser.add_argument('--load-data', action='store_true', help='use LOAD DATA LOCAL INFILE (MySQL only)')
+    parser.add_argument('--delta', action='store_true', help='only write rows changed since the last delta sync')
+    parser.add_argument('--no-delete', action='store_true', help='with --delta, report removed rows but keep them')
+    parser.add_argument('--sync-index', default=SYNC_INDEX_FILE, help='sidecar index used by --delta')
+    args = parser.parse_args(argv)
+    if args.delta and args.load_data:
+        parser.error('--delta and --load-data cannot be combined')
+
+    try:
+        workbooks = resolve_workbooks(args.workbooks, args.dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    index = schema_index.load_index()
+    total_started = time.perf_counter()
+    failed = 0
+    if args.delta:
+        state = load_sync_index(args.sync_index)
+        for path, table in workbooks:
+            started = time.perf_counter()
+            try:
+                stats = sync_workbook(path, table, index, state, args.batch_size, args.dry_run, not args.no_delete)
+            except HeaderError as e:
+                print(f"{os.path.basename(path)} -> {table}: skipped, {e}", file=sys.stderr)
+                failed += 1
+                continue
+            elapsed = time.perf_counter() - started
+            if stats['unchanged_file']:
+                print(f"{os.path.basename(path)} -> {table}: unchanged, skipped")
+                continue
+            if not args.dry_run:
+                save_sync_index(state, args.sync_index)
+            removed = f"{stats['kept']} removed (kept)" if args.no_delete else f"{stats['deleted']} deleted"
+            print(f"{os.path.basename(path)} -> {table}: {stats['read']} rows read, "
+                  f"{stats['inserted']} inserted, {stats['updated']} updated, {removed}, "
+                  f"{stats['batches']} batch(es), {elapsed:.2f}s")
+        print(f"Done in {time.perf_counter() - total_started:.2f}s")
+        return 1 if failed else 0
+
+    for path, table in workbooks:
+        started = time.perf_counter()
+        try:
+            if args.load_data and not args.dry_run:
+                stats = load_data_workbook(path, table, index)
+            else:
+                stats = import_workbook(path, table, index, args.batch_size, args.dry_run)
+        except HeaderError as e:
+            print(f"{os.path.basename(path)} -> {table}: skipped, {e}", file=sys.stderr)
+            failed += 1
+            continue
+        elapsed = time.perf_counter() - started
+        verb = 'mapped' if args.dry_run else 'upserted'
+        print(f"{os.path.basename(path)} -> {table}: {stats['read']} rows read, "
+              f"{stats['written']} {verb}, {stats['skipped']} skipped (no unique_id), "
+              f"{stats['batches']} batch(es), {elapsed:.2f}s")
+    print(f"Done in {time.perf_counter() - total_started:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# Shared fixtures for the Python maintenance scripts' tests.
+#
+# Every test runs against its own SQLite stand-in (DB_DRIVER=sqlite), built
+# with database_config.create_pool, so no MySQL server is needed.
+
+import os
+import sys
+
+import pytest
+
+# The scripts are flat modules at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database_config import create_pool  # noqa: E402
+
+
+def make_pool(path, **overrides):
+    config = {'driver': 'sqlite', 'database': str(path), 'pool_size': 2, 'max_overflow': 2,
+              'pool_timeout': 1, 'pool_recycle': 3600, 'pool_pre_ping': True}
+    config.update(overrides)
+    return create_pool(config)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db')
+    yield pool
+    pool.dispose()
+
+
+def execute(pool, *statements):
+    """Run `statements` ((sql, params) tuples or bare SQL) on one connection."""
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            for statement in statements:
+                sql, params = statement if isinstance(statement, tuple) else (statement, ())
+                cur.execute(sql, params)
+        finally:
+            cur.close()
+
+
+def query(pool, sql, params=()):
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall()
+        finally:
+            cur.close()
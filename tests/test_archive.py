@@ -0,0 +1,99 @@
+import datetime
+import os
+
+import pytest
+
+import archive
+from conftest import execute, query
+
+OLD = '2020-01-01 00:00:00'
+TABLES = ['process_master_sheet', 'finance_sheet', 'report_management']
+
+
+@pytest.fixture
+def lims(pool):
+    recent = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    execute(
+        pool,
+        "CREATE TABLE process_master_sheet (id INTEGER PRIMARY KEY, unique_id VARCHAR(255), "
+        "created_at DATETIME, modified_at DATETIME)",
+        "CREATE TABLE finance_sheet (id INTEGER PRIMARY KEY, unique_id VARCHAR(255), "
+        "total_amount_received_status TINYINT, created_at DATETIME, modified_at DATETIME)",
+        "CREATE TABLE finance_sheet_attachments (id INTEGER PRIMARY KEY, "
+        "finance_id INTEGER REFERENCES finance_sheet(id) ON DELETE CASCADE, file_name VARCHAR(255))",
+        "CREATE TABLE report_management (unique_id VARCHAR(255) PRIMARY KEY, report_release_date DATETIME)",
+        # U1 is done with; U2 is unpaid; U3's process master row was edited recently
+        ("INSERT INTO process_master_sheet VALUES (1, 'U1', ?, ?), (2, 'U2', ?, ?), (3, 'U3', ?, ?)",
+         [OLD, OLD, OLD, OLD, OLD, recent]),
+        ("INSERT INTO finance_sheet VALUES (11, 'U1', 1, ?, ?), (12, 'U2', 0, ?, ?), (13, 'U3', 1, ?, ?)",
+         [OLD, OLD, OLD, OLD, OLD, OLD]),
+        "INSERT INTO finance_sheet_attachments VALUES (101, 11, 'u1-receipt.pdf'), (102, 11, 'u1-invoice.pdf'), "
+        "(103, 12, 'u2-invoice.pdf')",
+        ("INSERT INTO report_management VALUES ('U1', ?), ('U2', ?), ('U3', ?)", [OLD, OLD, OLD]),
+    )
+    return pool
+
+
+def hot_ids(pool, table, column='unique_id'):
+    return sorted(row[0] for row in query(pool, f"SELECT {column} FROM {table}"))
+
+
+def test_dry_run_counts_only_eligible_rows(lims, tmp_path):
+    counts = archive.archive(TABLES, 365, 'segments', 10, str(tmp_path / 'archive'), dry_run=True, pool=lims)
+    assert counts == {'process_master_sheet': 1, 'finance_sheet': 1, 'report_management': 1}
+    assert hot_ids(lims, 'process_master_sheet') == ['U1', 'U2', 'U3']
+
+
+@pytest.mark.parametrize('to', ['segments', 'table'])
+def test_archive_and_restore_round_trip(lims, tmp_path, to):
+    archive_dir = str(tmp_path / 'archive')
+    before = {table: query(lims, f"SELECT * FROM {table} ORDER BY 1")
+              for table in TABLES + ['finance_sheet_attachments']}
+
+    # Chunk size 1 exercises the keyset loop across skipped candidates
+    moved = archive.archive(TABLES, 365, to, 1, archive_dir, pool=lims)
+    assert moved == {'process_master_sheet': 1, 'finance_sheet': 1, 'finance_sheet_attachments': 2,
+                     'report_management': 1}
+    assert hot_ids(lims, 'process_master_sheet') == ['U2', 'U3']
+    assert hot_ids(lims, 'finance_sheet') == ['U2', 'U3']
+    assert hot_ids(lims, 'report_management') == ['U2', 'U3']
+    assert hot_ids(lims, 'finance_sheet_attachments', 'id') == [103]
+
+    index = query(lims, f"SELECT source_table, row_key, unique_id, location FROM {archive.INDEX_TABLE} "
+                        "ORDER BY source_table, row_key")
+    assert [(t, k, u) for t, k, u, _ in index] == [
+        ('finance_sheet', '11', 'U1'),
+        ('finance_sheet_attachments', '101', 'U1'),
+        ('finance_sheet_attachments', '102', 'U1'),
+        ('process_master_sheet', '1', 'U1'),
+        ('report_management', 'U1', 'U1'),
+    ]
+    for table, _, _, location in index:
+        if to == 'table':
+            assert location == archive.archive_table(table)
+        else:
+            assert os.path.exists(os.path.join(archive_dir, location))
+
+    restored = archive.restore(['U1'], archive_dir, pool=lims)
+    assert restored == {'process_master_sheet': 1, 'finance_sheet': 1, 'finance_sheet_attachments': 2,
+                        'report_management': 1}
+    assert query(lims, f"SELECT COUNT(*) FROM {archive.INDEX_TABLE}") == [(0,)]
+    for table, rows in before.items():
+        assert query(lims, f"SELECT * FROM {table} ORDER BY 1") == rows
+    if to == 'table':
+        assert query(lims, f"SELECT COUNT(*) FROM {archive.archive_table('finance_sheet_attachments')}") == [(0,)]
+
+
+def test_sheet_rows_wait_for_their_process_master_row(lims, tmp_path):
+    moved = archive.archive(['finance_sheet'], 365, 'segments', 10, str(tmp_path / 'archive'), pool=lims)
+    assert moved == {'finance_sheet': 0}
+    assert hot_ids(lims, 'finance_sheet_attachments', 'id') == [101, 102, 103]
+
+
+def test_unhandled_foreign_keys_block_the_table(lims, tmp_path):
+    execute(lims, "CREATE TABLE finance_notes (id INTEGER PRIMARY KEY, "
+                  "finance_id INTEGER REFERENCES finance_sheet(id))")
+    moved = archive.archive(TABLES, 365, 'segments', 10, str(tmp_path / 'archive'), pool=lims)
+    assert moved['finance_sheet'] == 0
+    assert moved['process_master_sheet'] == 1
+    assert hot_ids(lims, 'finance_sheet') == ['U1', 'U2', 'U3']
@@ -0,0 +1,90 @@
+import pytest
+
+import dashboard_aggregates as dash
+from conftest import execute, query
+
+SOURCE = 'finance_sheet'
+
+
+@pytest.fixture
+def finance(pool):
+    execute(
+        pool,
+        "CREATE TABLE finance_sheet (id INTEGER PRIMARY KEY, service_name VARCHAR(255), budget DECIMAL(10,2), "
+        "invoice_amount DECIMAL(10,2), payment_receipt_amount DECIMAL(10,2), balance_amount DECIMAL(10,2), "
+        "total_amount_received_status TINYINT, created_at DATETIME, modified_at DATETIME)",
+    )
+    insert(pool, range(1, 26))
+    dash.ensure_tables(pool)
+    return pool
+
+
+def insert(pool, ids, stamp='2024-01-01 10:00:00'):
+    execute(pool, *[
+        ("INSERT INTO finance_sheet VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+         [i, ['WES', 'WGS', 'Panel'][i % 3], i * 100 + 0.5, i * 10, i * 5 if i % 2 else None, i * 5,
+          i % 4 == 0, stamp, stamp])
+        for i in ids
+    ])
+
+
+def summary(pool):
+    rows = query(pool, f"SELECT dimension, bucket, row_count, amount FROM {dash.SUMMARY_TABLE} "
+                       "WHERE source_table = ? ORDER BY dimension, bucket", [SOURCE])
+    return [(d, b, c, round(float(a), 2)) for d, b, c, a in rows]
+
+
+def test_keyset_pages_cover_every_row_once(finance):
+    seen, after = [], None
+    with finance.connection() as conn:
+        while True:
+            rows = dash.fetch_page(conn, finance.placeholder, SOURCE, after, None, 7)
+            if not rows:
+                break
+            seen += [row['id'] for row in rows]
+            after = rows[-1]['id']
+    assert seen == list(range(1, 26))
+
+    execute(finance, "UPDATE finance_sheet SET modified_at = '2024-02-01 00:00:00' WHERE id IN (3, 17)")
+    with finance.connection() as conn:
+        changed = dash.fetch_page(conn, finance.placeholder, SOURCE, 3, '2024-01-15 00:00:00', 7)
+    assert [row['id'] for row in changed] == [17]
+
+
+def test_incremental_matches_full_rebuild(finance):
+    assert dash.run_once(finance, [SOURCE], page_size=4) == {SOURCE: ('rebuild', 25)}
+
+    # Status and service moves, a new amount, and inserts after the watermark
+    execute(
+        finance,
+        "UPDATE finance_sheet SET total_amount_received_status = 1, modified_at = '2024-03-01 09:00:00' "
+        "WHERE id IN (1, 2, 3)",
+        "UPDATE finance_sheet SET service_name = 'Panel', budget = 1234.25, "
+        "modified_at = '2024-03-01 09:00:00' WHERE id = 10",
+        "UPDATE finance_sheet SET service_name = NULL, modified_at = '2024-03-01 09:00:00' WHERE id = 11",
+    )
+    insert(finance, range(26, 31), stamp='2024-03-02 12:00:00')
+
+    mode, applied = dash.run_once(finance, [SOURCE], page_size=4)[SOURCE]
+    assert (mode, applied) == ('incremental', 10)
+    incremental = summary(finance)
+
+    dash.rebuild(finance, SOURCE, 4)
+    assert summary(finance) == incremental
+    budget = sum(i * 100 + 0.5 for i in range(1, 31)) - 1000.5 + 1234.25
+    assert [row for row in incremental if row[:2] == ('total', 'rows')] == [('total', 'rows', 30, budget)]
+
+
+def test_rerun_without_changes_applies_nothing(finance):
+    dash.run_once(finance, [SOURCE], page_size=4)
+    before = summary(finance)
+    # The overlap window re-reads the newest rows; equal contributions are skipped
+    assert dash.run_once(finance, [SOURCE], page_size=4, overlap=10 ** 8) == {SOURCE: ('incremental', 0)}
+    assert summary(finance) == before
+
+
+def test_deletes_trigger_a_rebuild(finance):
+    dash.run_once(finance, [SOURCE], page_size=4)
+    execute(finance, "DELETE FROM finance_sheet WHERE id IN (5, 6)")
+    assert dash.run_once(finance, [SOURCE], page_size=4) == {SOURCE: ('rebuild', 23)}
+    assert [row[2] for row in summary(finance) if row[:2] == ('total', 'rows')] == [23]
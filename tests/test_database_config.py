@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from conftest import make_pool
+from database_config import PoolTimeoutError
+
+
+def test_checkout_times_out_when_exhausted(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db', pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with pool.connection():
+        started = time.monotonic()
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+        assert time.monotonic() - started >= 0.05
+    stats = pool.stats()
+    assert stats['timeouts'] == 1
+    assert stats['in_use'] == 0
+    assert stats['checkouts'] == 1
+
+
+def test_waiter_gets_released_connection(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db', pool_size=1, max_overflow=0, pool_timeout=2)
+    got = []
+
+    def worker():
+        with pool.connection() as conn:
+            got.append(conn)
+
+    with pool.connection() as first:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+        assert pool.stats()['waiters'] == 1
+    thread.join(2)
+    assert got == [first]
+    assert pool.stats()['created'] == 1
+
+
+def test_overflow_connections_close_on_return(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db', pool_size=1, max_overflow=1)
+    with pool.connection():
+        with pool.connection():
+            stats = pool.stats()
+            assert stats['open'] == 2
+            assert stats['in_use'] == 2
+            assert stats['overflow_in_use'] == 1
+        stats = pool.stats()
+        assert stats['open'] == 1
+        assert stats['idle'] == 0
+    stats = pool.stats()
+    assert stats['open'] == 1
+    assert stats['idle'] == 1
+    assert stats['created'] == 2
+    assert stats['checkouts'] == 2
+
+
+def test_recycle_replaces_old_connections(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db', pool_recycle=0.01)
+    with pool.connection() as conn:
+        first = conn
+    time.sleep(0.03)
+    with pool.connection() as conn:
+        assert conn is not first
+    stats = pool.stats()
+    assert stats['recycled'] == 1
+    assert stats['created'] == 2
+    assert stats['open'] == 1
+
+
+def test_pre_ping_replaces_dead_connections(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db')
+    with pool.connection() as conn:
+        conn.close()  # dies while idle, e.g. a server-side timeout
+    with pool.connection() as conn:
+        assert conn.execute('SELECT 1').fetchone() == (1,)
+    assert pool.stats()['invalidated'] == 1
+
+
+def test_stats_and_dispose(tmp_path):
+    pool = make_pool(tmp_path / 'lims.db')
+    for _ in range(3):
+        with pool.connection() as conn:
+            conn.execute('SELECT 1')
+    stats = pool.stats()
+    assert stats['checkouts'] == 3
+    assert stats['created'] == 1
+    assert stats['checkout_ms_max'] >= stats['checkout_ms_avg'] >= 0
+    assert pool.placeholder == '?'
+    pool.dispose()
+    assert pool.stats()['open'] == 0
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
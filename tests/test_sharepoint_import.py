@@ -0,0 +1,111 @@
+import pytest
+
+import sharepoint_import as sp
+from conftest import execute, query
+
+TABLE = 'finance_sheet'
+HEADER = ('Unique ID', 'Service Requested', 'Budget', 'Title')
+
+# Just the columns the test workbook maps, in schema_index's shape
+INDEX = {
+    'sources': {'database_schema.sql': 'test'},
+    'tables': {TABLE: {'columns': {
+        'id': {'type': 'INT'},
+        'unique_id': {'type': 'VARCHAR(255)'},
+        'project_id': {'type': 'VARCHAR(255)'},
+        'service_name': {'type': 'VARCHAR(255)'},
+        'budget': {'type': 'DECIMAL(10,2)'},
+    }}},
+}
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    """A Lab_Finance.xlsx stand-in whose rows come from `workbook.rows` (no openpyxl needed)."""
+    path = tmp_path / 'Lab_Finance.xlsx'
+
+    class Workbook:
+        rows = []
+
+        def save(self, rows):
+            self.rows = [HEADER] + list(rows)
+            # sync_workbook skips files whose mtime and size are unchanged
+            path.write_text(repr(self.rows))
+
+    book = Workbook()
+    book.path = str(path)
+    monkeypatch.setattr(sp, 'open_rows', lambda _path: iter(book.rows))
+    return book
+
+
+@pytest.fixture
+def finance(pool):
+    execute(pool, "CREATE TABLE finance_sheet (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                  "unique_id VARCHAR(255) NOT NULL UNIQUE, project_id VARCHAR(255) NOT NULL, "
+                  "service_name VARCHAR(255), budget DECIMAL(10,2))")
+    return pool
+
+
+def rows(pool):
+    return {uid: (service, budget) for uid, service, budget in
+            query(pool, "SELECT unique_id, service_name, budget FROM finance_sheet")}
+
+
+def sync(book, pool, state, **kwargs):
+    return sp.sync_workbook(book.path, TABLE, INDEX, state, batch_size=2, pool=pool, **kwargs)
+
+
+def test_delta_sync_writes_only_changes(workbook, finance):
+    state = {'version': sp.SYNC_INDEX_VERSION, 'workbooks': {}}
+    workbook.save([('U1', 'WES', '100'), ('U2', 'WGS', '200'), (None, 'orphan', '5'), ('U3', 'Panel', '300')])
+    stats = sync(workbook, finance, state)
+    assert (stats['read'], stats['skipped'], stats['inserted'], stats['updated']) == (4, 1, 3, 0)
+    assert stats['written'] == 3
+    assert rows(finance) == {'U1': ('WES', 100), 'U2': ('WGS', 200), 'U3': ('Panel', 300)}
+
+    # U1 unchanged, U2 edited, U3 gone, U4 new and listed twice (the last copy wins)
+    workbook.save([('U1', 'WES', '100'), ('U2', 'WGS', '250.50'), ('U4', 'draft', '1'), ('U4', 'WES', '400')])
+    stats = sync(workbook, finance, state)
+    assert (stats['inserted'], stats['updated'], stats['deleted'], stats['written']) == (1, 1, 1, 2)
+    assert rows(finance) == {'U1': ('WES', 100), 'U2': ('WGS', 250.5), 'U4': ('WES', 400)}
+    assert query(finance, "SELECT project_id FROM finance_sheet WHERE unique_id = 'U4'") == [('',)]
+
+    stats = sync(workbook, finance, state)
+    assert stats['unchanged_file'] is True
+    assert stats['written'] == 0
+
+
+def test_duplicate_that_restores_stored_content_is_not_written(workbook, finance):
+    state = {'version': sp.SYNC_INDEX_VERSION, 'workbooks': {}}
+    workbook.save([('U1', 'WES', '100')])
+    sync(workbook, finance, state)
+
+    workbook.save([('U1', 'WGS', '100'), ('U1', 'WES', '100')])
+    stats = sync(workbook, finance, state)
+    assert (stats['inserted'], stats['updated'], stats['written']) == (0, 0, 0)
+    assert rows(finance) == {'U1': ('WES', 100)}
+
+
+def test_no_delete_keeps_rows_and_reports_them_again(workbook, finance):
+    state = {'version': sp.SYNC_INDEX_VERSION, 'workbooks': {}}
+    workbook.save([('U1', 'WES', '100'), ('U2', 'WGS', '200')])
+    sync(workbook, finance, state)
+
+    workbook.save([('U1', 'WES', '100')])
+    stats = sync(workbook, finance, state, delete=False)
+    assert (stats['deleted'], stats['kept']) == (0, 1)
+    assert set(rows(finance)) == {'U1', 'U2'}
+
+    workbook.save([('U1', 'WES', '100'), ('U3', 'Panel', '300')])
+    stats = sync(workbook, finance, state)
+    assert (stats['inserted'], stats['deleted']) == (1, 1)
+    assert set(rows(finance)) == {'U1', 'U3'}
+
+
+def test_dry_run_leaves_database_and_state_alone(workbook, finance):
+    state = {'version': sp.SYNC_INDEX_VERSION, 'workbooks': {}}
+    workbook.save([('U1', 'WES', '100')])
+    stats = sync(workbook, finance, state, dry_run=True)
+    assert stats['inserted'] == 1
+    assert rows(finance) == {}
+    assert state['workbooks'] == {}
@@ -0,0 +1,336 @@
+# LeadLab LIMS - WES report batch renderer
+#
+# Fills the hand-edited WES report template
+# ("WES report code/wes_report/WES Report New modified fully working OCT-11.html")
+# from report_management + bioinformatics_sheet_clinical and writes one HTML
+# file per report, instead of typing every field into the editor by hand.
+#
+#   - The template is compiled once into literal chunks and field slots (the
+#     contenteditable elements, matched by id); rendering is a join.
+#   - The Progenics logo is read and inlined as a data: URI once, so reports
+#     open without the /wes_report/Images path.
+#   - Report rows are read in keyset pages (ORDER BY unique_id) through
+#     database_config.py and rendered on a process pool.
+#   - Each output is keyed on a hash of the template and the row's field
+#     values; unchanged reports are skipped on the next run
+#     (.wes_report_render_cache.json).
+#
+# Usage:
+#   python wes_report_render.py                         # all WES reports -> reports/wes/
+#   python wes_report_render.py --unique-id PG-001 PG-002
+#   python wes_report_render.py --service ''            # every report_management row
+#   python wes_report_render.py --static                # drop scripts / editing for release
+#   python wes_report_render.py --force --jobs 8
+
+import argparse
+import base64
+import datetime
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(ROOT_DIR, 'WES report code', 'wes_report')
+TEMPLATE_FILE = os.path.join(TEMPLATE_DIR, 'WES Report New modified fully working OCT-11.html')
+LOGO_FILE = os.path.join(TEMPLATE_DIR, 'Images', 'Blue logo progenics.png')
+OUTPUT_DIR = os.path.join(ROOT_DIR, 'reports', 'wes')
+CACHE_FILE = os.path.join(ROOT_DIR, '.wes_report_render_cache.json')
+
+REPORT_TABLE = 'report_management'
+BIOINFO_TABLE = 'bioinformatics_sheet_clinical'
+KEY_COLUMN = 'unique_id'
+
+# Template element id -> (table, column). report_management is the source of
+# record for patient details; bioinformatics fills the analysis sections.
+FIELDS = {
+    'dna_test_performed': (REPORT_TABLE, 'service_name'),
+    'sample_id': (REPORT_TABLE, 'sample_id'),
+    'sample_clinical': (REPORT_TABLE, 'clinician_researcher_name'),
+    'sample_patient': (REPORT_TABLE, 'patient_client_name'),
+    'sample_type': (REPORT_TABLE, 'sample_type'),
+    'sample_age': (REPORT_TABLE, 'age'),
+    'sample_gender': (REPORT_TABLE, 'gender'),
+    'sample_receipt': (REPORT_TABLE, 'sample_received_date'),
+    'sample_report': (REPORT_TABLE, 'report_release_date'),
+    'clinical_info': (REPORT_TABLE, 'gc_case_summary'),
+    'test_methodology': (BIOINFO_TABLE, 'database_tools_information'),
+}
+# Fall back to the bioinformatics row when report_management is blank
+FALLBACKS = {
+    'sample_id': 'sample_id',
+    'sample_clinical': 'clinician_researcher_name',
+    'sample_patient': 'patient_client_name',
+    'sample_age': 'age',
+    'sample_gender': 'gender',
+}
+
+LOGO_SRC_RE = re.compile(r'(src\s*=\s*")[^"]*Images/Blue logo progenics\.png(")')
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script>\s*', re.I | re.S)
+EDITABLE_RE = re.compile(r'\s+contenteditable\s*=\s*"true"', re.I)
+DATE_FORMAT = '%d-%m-%Y'
+
+_logo_cache = {}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def logo_data_uri(path=LOGO_FILE):
+    """Return the logo as a data: URI, reading and encoding it only once."""
+    if path not in _logo_cache:
+        with open(path, 'rb') as f:
+            _logo_cache[path] = 'data:image/png;base64,' + base64.b64encode(f.read()).decode('ascii')
+    return _logo_cache[path]
+
+
+class CompiledTemplate:
+    """The report template split at its field slots.
+
+    parts[i] precedes slot[i]; the last part closes the document. Instances
+    are plain data so they pickle cheaply into pool workers.
+    """
+
+    def __init__(self, parts, slots, digest):
+        self.parts = parts
+        self.slots = slots
+        self.digest = digest
+
+    def render(self, values):
+        out = []
+        for part, slot in zip(self.parts, self.slots):
+            out.append(part)
+            out.append(values.get(slot, ''))
+        out.append(self.parts[-1])
+        return ''.join(out)
+
+
+def compile_template(path=TEMPLATE_FILE, static=False, fields=FIELDS):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    source = LOGO_SRC_RE.sub(lambda m: m.group(1) + logo_data_uri() + m.group(2), source)
+    if static:
+        source = EDITABLE_RE.sub('', SCRIPT_RE.sub('', source))
+
+    # Every slot is the (empty) body of the element carrying the field id;
+    # values go right after the opening tag
+    openings = []
+    for field in fields:
+        match = re.search(r'<\w+\b[^>]*\bid\s*=\s*"' + re.escape(field) + r'"[^>]*>', source)
+        if not match:
+            raise ValueError(f"Template has no element with id '{field}'")
+        openings.append((match.end(), field))
+    openings.sort()
+
+    parts, slots, pos = [], [], 0
+    for end, field in openings:
+        parts.append(source[pos:end])
+        slots.append(field)
+        pos = end
+    parts.append(source[pos:])
+    return CompiledTemplate(parts, slots, content_hash(source.encode('utf-8')))
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime(DATE_FORMAT)
+    text = str(value).strip()
+    return html.escape(text).replace('\r\n', '\n').replace('\n', '<br>')
+
+
+def field_values(report, bioinfo):
+    """Rendered HTML for every template slot of one report."""
+    rows = {REPORT_TABLE: report, BIOINFO_TABLE: bioinfo or {}}
+    values = {}
+    for field, (table, column) in FIELDS.items():
+        value = format_value(rows[table].get(column))
+        if not value and field in FALLBACKS and bioinfo:
+            value = format_value(bioinfo.get(FALLBACKS[field]))
+        values[field] = value
+    return values
+
+
+def report_hash(template, values):
+    payload = json.dumps(values, sort_keys=True).encode('utf-8')
+    return content_hash(template.digest.encode('ascii') + payload)
+
+
+def output_path(out_dir, unique_id):
+    safe = re.sub(r'[^\w.-]+', '_', str(unique_id)).strip('._') or 'report'
+    return os.path.join(out_dir, f'{safe}.html')
+
+
+# -- data access -----------------------------------------------------------------
+
+def fetch_report_page(conn, placeholder, after, limit, service, unique_ids):
+    where, params = [], []
+    if after is not None:
+        where.append(f'{KEY_COLUMN} > {placeholder}')
+        params.append(after)
+    if service:
+        where.append(f'service_name LIKE {placeholder}')
+        params.append(f'%{service}%')
+    if unique_ids:
+        where.append(f"{KEY_COLUMN} IN ({', '.join([placeholder] * len(unique_ids))})")
+        params.extend(unique_ids)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ''
+    columns = sorted({col for table, col in FIELDS.values() if table == REPORT_TABLE} | {KEY_COLUMN})
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {', '.join(columns)} FROM {REPORT_TABLE} {where_sql} ORDER BY {KEY_COLUMN} LIMIT {int(limit)}",
+            params,
+        )
+        names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def fetch_bioinfo(conn, placeholder, unique_ids):
+    """Latest bioinformatics_sheet_clinical row per unique_id."""
+    if not unique_ids:
+        return {}
+    columns = sorted({col for table, col in FIELDS.values() if table == BIOINFO_TABLE}
+                     | set(FALLBACKS.values()) | {KEY_COLUMN})
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {', '.join(columns)} FROM {BIOINFO_TABLE} "
+            f"WHERE {KEY_COLUMN} IN ({', '.join([placeholder] * len(unique_ids))}) ORDER BY id",
+            list(unique_ids),
+        )
+        names = [d[0] for d in cur.description]
+        # Ascending id, so the newest row per unique_id wins
+        return {row[KEY_COLUMN]: row for row in (dict(zip(names, r)) for r in cur.fetchall())}
+    finally:
+        cur.close()
+
+
+def iter_reports(page_size, service, unique_ids):
+    """Yield pages of (report, bioinfo) pairs in unique_id order."""
+    from database_config import get_pool
+
+    pool = get_pool()
+    after = None
+    while True:
+        with pool.connection() as conn:
+            page = fetch_report_page(conn, pool.placeholder, after, page_size, service, unique_ids)
+            if not page:
+                return
+            bioinfo = fetch_bioinfo(conn, pool.placeholder, [r[KEY_COLUMN] for r in page])
+        yield [(r, bioinfo.get(r[KEY_COLUMN])) for r in page]
+        if len(page) < page_size:
+            return
+        after = page[-1][KEY_COLUMN]
+
+
+# -- rendering -------------------------------------------------------------------
+
+_worker_template = None
+
+
+def _init_worker(template):
+    global _worker_template
+    _worker_template = template
+
+
+def render_report(unique_id, values, path):
+    """Write one report (in a pool worker). Returns (unique_id, path)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(_worker_template.render(values))
+    os.replace(tmp_path, path)
+    return unique_id, path
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    tmp_path = CACHE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def run(out_dir=OUTPUT_DIR, service='WES', unique_ids=None, page_size=500, jobs=None,
+        force=False, static=False):
+    """Render every matching report. Returns (rendered, unchanged, elapsed seconds)."""
+    started = time.perf_counter()
+    template = compile_template(static=static)
+    os.makedirs(out_dir, exist_ok=True)
+    cache = load_cache()
+    rendered = unchanged = 0
+    workers = jobs or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(template,)) as pool:
+        pending = {}
+
+        def drain(block_until):
+            nonlocal rendered
+            while len(pending) > block_until:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    digest = pending.pop(future)
+                    unique_id, path = future.result()
+                    cache[unique_id] = {'hash': digest, 'file': os.path.relpath(path, ROOT_DIR)}
+                    rendered += 1
+
+        for page in iter_reports(page_size, service, unique_ids):
+            for report, bioinfo in page:
+                unique_id = report[KEY_COLUMN]
+                values = field_values(report, bioinfo)
+                digest = report_hash(template, values)
+                path = output_path(out_dir, unique_id)
+                entry = cache.get(unique_id)
+                if not force and entry and entry['hash'] == digest and os.path.exists(path):
+                    unchanged += 1
+                    continue
+                pending[pool.submit(render_report, unique_id, values, path)] = digest
+            # Keep the pool fed while the next page is fetched, without
+            # holding a whole table of rendered values in memory
+            drain(workers * 4)
+        drain(0)
+
+    save_cache(cache)
+    return rendered, unchanged, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render WES reports from report_management rows.')
+    parser.add_argument('--out', default=OUTPUT_DIR, help='output directory for <unique_id>.html files')
+    parser.add_argument('--service', default='WES',
+                        help="only rows whose service_name contains this text ('' for all)")
+    parser.add_argument('--unique-id', nargs='+', help='render only these unique_ids')
+    parser.add_argument('--page-size', type=int, default=500, help='rows per keyset page')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='ignore the render cache')
+    parser.add_argument('--static', action='store_true', help='strip scripts and contenteditable from the output')
+    args = parser.parse_args(argv)
+
+    try:
+        rendered, unchanged, elapsed = run(args.out, args.service, args.unique_id, args.page_size,
+                                           args.jobs, args.force, args.static)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    print(f"{rendered} report(s) rendered, {unchanged} unchanged in {elapsed:.2f}s -> "
+          f"{os.path.relpath(args.out, ROOT_DIR)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())